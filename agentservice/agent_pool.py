@@ -0,0 +1,180 @@
+import asyncio
+import functools
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Set, Tuple, TypeVar
+
+if TYPE_CHECKING:
+    from azure.ai.projects import AIProjectClient
+
+T = TypeVar("T")
+
+
+@dataclass
+class PoolStats:
+    agents_created: int = 0
+    agents_reused: int = 0
+    threads_created: int = 0
+    threads_deleted: int = 0
+    # Runs that took an empty thread created ahead of time, or continued a conversation thread.
+    threads_ready: int = 0
+
+
+@dataclass
+class AgentSession:
+    """An agent of the pool and the thread it runs on, see `AgentPool.session`."""
+
+    pool: "AgentPool"
+    agent_id: str
+    thread_id: str
+
+    async def run(self, content: str) -> Any:
+        """Adds `content` as a user message to the thread and runs the agent on it until the run finished."""
+        agents = self.pool.project_client.agents
+        await self.pool.call(agents.create_message, thread_id=self.thread_id, role="user", content=content)
+        return await self.pool.call(agents.create_and_process_run, thread_id=self.thread_id, assistant_id=self.agent_id)
+
+
+class AgentPool:
+    """Reuses the agents and threads of the Azure AI Agent Service across tool calls.
+
+    An agent is created once for every signature of model, name, instructions, tools and headers and deleted on
+    `close`. Every session runs on an empty thread, which the pool creates ahead of time and deletes in the background
+    after the session, so creating and deleting threads is off the path of the call. A session with a `conversation` key
+    continues the thread of the previous session with the same key instead.
+
+    All calls of the synchronous project client run in `max_workers` worker threads of the pool, so they don't block
+    the event loop. They wait for the service, so there can be more of them than cores.
+    """
+
+    def __init__(self, project_client: "AIProjectClient", spare_threads: int = 2, max_workers: int = 16):
+        self.project_client = project_client
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent_pool")
+        self.stats = PoolStats()
+        self._spare_threads = spare_threads
+        self._agents: Dict[Tuple[str, str, str, str], str] = {}
+        self._agent_locks: Dict[Tuple[str, str, str, str], asyncio.Lock] = {}
+        self._spare: List[str] = []
+        self._pending_spare = 0
+        self._conversations: Dict[str, str] = {}
+        self._conversation_locks: Dict[str, asyncio.Lock] = {}
+        self._tasks: Set[asyncio.Task[Any]] = set()
+
+    async def call(self, method: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Calls a blocking method of the project client in a worker thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+
+    async def agent(
+        self,
+        model: str,
+        instructions: str,
+        tools: Sequence[Any] = (),
+        name: str = "agent",
+        tool_resources: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """The id of the agent with this model, name, instructions, tools and headers, created on first use."""
+        key = (model, name, instructions, _signature(tools, tool_resources, headers))
+        lock = self._agent_locks.setdefault(key, asyncio.Lock())
+        # Concurrent first calls with the same signature wait for one agent instead of creating one each.
+        async with lock:
+            if key in self._agents:
+                self.stats.agents_reused += 1
+                return self._agents[key]
+            kwargs: Dict[str, Any] = {"model": model, "name": name, "instructions": instructions, "tools": list(tools)}
+            if tool_resources is not None:
+                kwargs["tool_resources"] = tool_resources
+            if headers is not None:
+                kwargs["headers"] = headers
+            agent = await self.call(self.project_client.agents.create_agent, **kwargs)
+            self.stats.agents_created += 1
+            self._agents[key] = agent.id
+            return agent.id
+
+    @asynccontextmanager
+    async def session(
+        self,
+        model: str,
+        instructions: str,
+        tools: Sequence[Any] = (),
+        name: str = "agent",
+        tool_resources: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        conversation: Optional[str] = None,
+    ) -> AsyncIterator[AgentSession]:
+        agent_id = await self.agent(model, instructions, tools, name, tool_resources, headers)
+        if conversation is None:
+            thread_id = await self._take_thread()
+            try:
+                yield AgentSession(self, agent_id, thread_id)
+            finally:
+                self._spawn(self._delete_thread(thread_id))
+            return
+        # A thread can only have one active run, so the sessions of a conversation take turns.
+        async with self._conversation_locks.setdefault(conversation, asyncio.Lock()):
+            if conversation not in self._conversations:
+                self._conversations[conversation] = await self._take_thread()
+            else:
+                self.stats.threads_ready += 1
+            yield AgentSession(self, agent_id, self._conversations[conversation])
+
+    async def close(self):
+        """Waits for the background work and deletes all agents and threads of the pool."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        agents = self.project_client.agents
+        thread_ids = self._spare + list(self._conversations.values())
+        await asyncio.gather(
+            *(self.call(agents.delete_agent, agent_id) for agent_id in self._agents.values()),
+            *(self._delete_thread(thread_id) for thread_id in thread_ids),
+            return_exceptions=True,
+        )
+        self._agents.clear()
+        self._spare.clear()
+        self._conversations.clear()
+        self._executor.shutdown(wait=False)
+
+    async def _take_thread(self) -> str:
+        if self._spare:
+            self.stats.threads_ready += 1
+            thread_id = self._spare.pop()
+        else:
+            thread_id = await self._create_thread()
+        self._refill()
+        return thread_id
+
+    def _refill(self):
+        while len(self._spare) + self._pending_spare < self._spare_threads:
+            self._pending_spare += 1
+            self._spawn(self._create_spare_thread())
+
+    async def _create_spare_thread(self):
+        try:
+            self._spare.append(await self._create_thread())
+        finally:
+            self._pending_spare -= 1
+
+    async def _create_thread(self) -> str:
+        thread = await self.call(self.project_client.agents.create_thread)
+        self.stats.threads_created += 1
+        return thread.id
+
+    async def _delete_thread(self, thread_id: str):
+        await self.call(self.project_client.agents.delete_thread, thread_id)
+        self.stats.threads_deleted += 1
+
+    def _spawn(self, coroutine: Any):
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+def _signature(tools: Sequence[Any], tool_resources: Optional[Any], headers: Optional[Dict[str, str]]) -> str:
+    # The tool definitions of the SDK are mappings, but not dicts, so they are converted to json with as_dict.
+    def to_json(value: Any) -> Any:
+        return value.as_dict() if hasattr(value, "as_dict") else dict(value) if hasattr(value, "keys") else str(value)
+
+    return json.dumps([list(tools), tool_resources, headers], default=to_json, sort_keys=True)
@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+import itertools
+import threading
+import time
+from types import SimpleNamespace
+from typing import Awaitable, Callable, List
+
+from agent_pool import AgentPool
+from rich.console import Console
+from rich.table import Table
+
+INSTRUCTIONS = "You are a web search agent."
+TOOLS = [{"type": "bing_grounding", "bing_grounding": {"connections": [{"connection_id": "bing"}]}}]
+
+
+class StubAgentsOperations:
+    """Blocks for `latency` seconds per request, like the synchronous SDK waiting for the service."""
+
+    def __init__(self, latency: float, run_latency: float):
+        self._latency = latency
+        self._run_latency = run_latency
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def _request(self, seconds: float, prefix: str) -> SimpleNamespace:
+        time.sleep(seconds)
+        with self._lock:
+            self.requests += 1
+            return SimpleNamespace(id=f"{prefix}_{next(self._ids)}", status="completed")
+
+    def create_agent(self, **kwargs): return self._request(self._latency, "asst")
+    def delete_agent(self, agent_id): return self._request(self._latency, "asst")
+    def create_thread(self, **kwargs): return self._request(self._latency, "thread")
+    def delete_thread(self, thread_id): return self._request(self._latency, "thread")
+    def create_message(self, **kwargs): return self._request(self._latency, "msg")
+    def create_and_process_run(self, **kwargs): return self._request(self._run_latency, "run")
+
+    def list_messages(self, **kwargs):
+        self._request(self._latency, "msg")
+        return {"data": [{"content": [{"text": {"value": "Result"}}]}]}
+
+
+class StubProjectClient:
+    def __init__(self, latency: float, run_latency: float):
+        self.agents = StubAgentsOperations(latency, run_latency)
+
+
+def lifecycle_call(project_client: StubProjectClient) -> Callable[[str], Awaitable[str]]:
+    """The tool call as it was: every call creates and deletes its agent, with blocking calls on the event loop."""
+
+    async def web_ai_agent(query: str) -> str:
+        agents = project_client.agents
+        agent = agents.create_agent(model="gpt-4", name="my-assistant", instructions=INSTRUCTIONS, tools=TOOLS)
+        thread = agents.create_thread()
+        agents.create_message(thread_id=thread.id, role="user", content=query)
+        agents.create_and_process_run(thread_id=thread.id, assistant_id=agent.id)
+        agents.delete_agent(agent.id)
+        messages = agents.list_messages(thread_id=thread.id)
+        return messages["data"][0]["content"][0]["text"]["value"]
+
+    return web_ai_agent
+
+
+def pooled_call(pool: AgentPool) -> Callable[[str], Awaitable[str]]:
+    async def web_ai_agent(query: str) -> str:
+        async with pool.session(model="gpt-4", name="my-assistant", instructions=INSTRUCTIONS, tools=TOOLS) as session:
+            await session.run(query)
+            messages = await pool.call(pool.project_client.agents.list_messages, thread_id=session.thread_id)
+        return messages["data"][0]["content"][0]["text"]["value"]
+
+    return web_ai_agent
+
+
+async def timed(call: Callable[[str], Awaitable[str]], query: str) -> float:
+    start = time.perf_counter()
+    await call(query)
+    return time.perf_counter() - start
+
+
+async def measure(call: Callable[[str], Awaitable[str]], calls: int, concurrency: int) -> tuple[float, List[float]]:
+    start = time.perf_counter()
+    seconds: List[float] = []
+    for batch in range(0, calls, concurrency):
+        size = min(concurrency, calls - batch)
+        seconds.extend(await asyncio.gather(*(timed(call, f"Question {batch + i}") for i in range(size))))
+        # Leave time between the tool calls of the conversation, like the model would.
+        await asyncio.sleep(0.05)
+    return time.perf_counter() - start, seconds
+
+
+async def main(calls: int, concurrency: int, latency: float, run_latency: float) -> None:
+    table = Table(title=f"{calls} tool calls, {latency * 1000:.0f} ms per request, {run_latency * 1000:.0f} ms per run")
+    for column in ["Agent", "Concurrent calls", "Mean call (ms)", "Max call (ms)", "Total (s)", "Requests"]:
+        table.add_column(column, justify="right")
+    for name in ["per call", "pool"]:
+        for parallel in [1, concurrency]:
+            project_client = StubProjectClient(latency, run_latency)
+            pool = AgentPool(project_client, spare_threads=parallel)  # type: ignore[arg-type]
+            call = lifecycle_call(project_client) if name == "per call" else pooled_call(pool)
+            total, seconds = await measure(call, calls, parallel)
+            await pool.close()
+            table.add_row(
+                name,
+                str(parallel),
+                f"{sum(seconds) / len(seconds) * 1000:.0f}",
+                f"{max(seconds) * 1000:.0f}",
+                f"{total:.2f}",
+                str(project_client.agents.requests),
+            )
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Azure AI Agent Service tool calls against a stub project client.")
+    parser.add_argument("--calls", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per request of the stub project client.")
+    parser.add_argument("--run-latency", type=float, default=0.3, help="Seconds per run of the stub project client.")
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.concurrency, args.latency, args.run_latency))
@@ -12,6 +12,8 @@ from azure.ai.projects.models import CodeInterpreterTool
 from azure.ai.projects import AIProjectClient
 from azure.ai.projects.models import BingGroundingTool
 
+from agent_pool import AgentPool
+
 dotenv.load_dotenv()
 
 # Create the token provider
@@ -28,59 +30,46 @@ az_model_client = AzureOpenAIChatCompletionClient(
 
 conn_id = None
 
-with AIProjectClient.from_connection_string(
+project_client = AIProjectClient.from_connection_string(
     credential=DefaultAzureCredential(),
     conn_str=os.environ["PROJECT_CONNECTION_STRING"],
-) as project_client:
-    
-    bing_connection = project_client.connections.get(
-        connection_name='bing',
-    )
+)
+
+bing_connection = project_client.connections.get(
+    connection_name='bing',
+)
+
+conn_id = bing_connection.id
 
-    conn_id = bing_connection.id
+# The remote agents and threads are reused across the tool calls instead of being created for every call.
+agent_pool = AgentPool(project_client)
 
 async def web_ai_agent(query: str) -> str:
     print("This is Bing for Azure AI Agent Service .......")
     bing = BingGroundingTool(connection_id=conn_id)
-    with project_client:
-        agent = project_client.agents.create_agent(
-            model="gpt-4",
-            name="my-assistant",
-            instructions="""        
-                You are a web search agent.
-                Your only tool is search_tool - use it to find information.
-                    You make only one search call at a time.
-                    Once you have the results, you never do calculations based on them.
-                """,
-                tools=bing.definitions,
-                headers={"x-ms-enable-preview": "true"}
-            )
-        print(f"Created agent, ID: {agent.id}")
-
-        # Create thread for communication
-        thread = project_client.agents.create_thread()
-        print(f"Created thread, ID: {thread.id}")
-
-        # Create message to thread
-        message = project_client.agents.create_message(
-            thread_id=thread.id,
-            role="user",
-            content=query,
-        )
-        print(f"SMS: {message}")
-        # Create and process agent run in thread with tools
-        run = project_client.agents.create_and_process_run(thread_id=thread.id, assistant_id=agent.id)
+    async with agent_pool.session(
+        model="gpt-4",
+        name="my-assistant",
+        instructions="""        
+            You are a web search agent.
+            Your only tool is search_tool - use it to find information.
+                You make only one search call at a time.
+                Once you have the results, you never do calculations based on them.
+            """,
+        tools=bing.definitions,
+        headers={"x-ms-enable-preview": "true"},
+    ) as session:
+        print(f"Using agent {session.agent_id} on thread {session.thread_id}")
+
+        # Create message to thread and process agent run in thread with tools
+        run = await session.run(query)
         print(f"Run finished with status: {run.status}")
 
         if run.status == "failed":
             print(f"Run failed: {run.last_error}")
 
-        # Delete the assistant when done
-        project_client.agents.delete_agent(agent.id)
-        print("Deleted agent")
-
         # Fetch and log all messages
-        messages = project_client.agents.list_messages(thread_id=thread.id)
+        messages = await agent_pool.call(project_client.agents.list_messages, thread_id=session.thread_id)
         print("Messages:"+ messages["data"][0]["content"][0]["text"]["value"])
     return messages["data"][0]["content"][0]["text"]["value"]
 
@@ -90,21 +79,16 @@ async def save_blog_agent(blog_content: str) -> str:
 
 
     code_interpreter = CodeInterpreterTool()
-        
-    agent = project_client.agents.create_agent(
+
+    async with agent_pool.session(
             model="gpt-4o-mini",
             name="my-agent",
             instructions="You are helpful agent",
             tools=code_interpreter.definitions,
             # tool_resources=code_interpreter.resources,
-    )
-
-    thread = project_client.agents.create_thread()
-
-    message = project_client.agents.create_message(
-            thread_id=thread.id,
-            role="user",
-            content="""
+    ) as session:
+        # create and execute a run
+        run = await session.run("""
         
                     You are my Python programming assistant. Generate code,save """+ blog_content +
                     
@@ -114,45 +98,27 @@ async def save_blog_agent(blog_content: str) -> str:
                     .Save blog content to blog-{YYMMDDHHMMSS}.md
 
                     .give me the download this file link
-                """,
-    )
-    # create and execute a run
-    run = project_client.agents.create_and_process_run(thread_id=thread.id, assistant_id=agent.id)
-    print(f"Run finished with status: {run.status}")
+                """)
+        print(f"Run finished with status: {run.status}")
 
-    if run.status == "failed":
+        if run.status == "failed":
             # Check if you got "Rate limit is exceeded.", then you want to get more quota
-        print(f"Run failed: {run.last_error}")
-
-        # # delete the original file from the agent to free up space (note: this does not delete your version of the file)
-        # project_client.agents.delete_file(file.id)
-        # print("Deleted file")
+            print(f"Run failed: {run.last_error}")
 
         # print the messages from the agent
-    messages = project_client.agents.get_messages(thread_id=thread.id)
-    print(f"Messages: {messages}")
+        messages = await agent_pool.call(project_client.agents.get_messages, thread_id=session.thread_id)
+        print(f"Messages: {messages}")
 
         # get the most recent message from the assistant
-    last_msg = messages.get_last_text_message_by_sender("assistant")
-    if last_msg:
-        print(f"Last Message: {last_msg.text.value}")
-
-        # print(f"File: {messages.file_path_annotations}")
-
-
-    for file_path_annotation in messages.file_path_annotations:
-
-        file_name = os.path.basename(file_path_annotation.text)
-
-        project_client.agents.save_file(file_id=file_path_annotation.file_path.file_id, file_name=file_name,target_dir="./blog")
-        
-
-    project_client.agents.delete_agent(agent.id)
-    print("Deleted agent")
+        last_msg = messages.get_last_text_message_by_sender("assistant")
+        if last_msg:
+            print(f"Last Message: {last_msg.text.value}")
 
+        for file_path_annotation in messages.file_path_annotations:
 
-        # project_client.close()
+            file_name = os.path.basename(file_path_annotation.text)
 
+            await agent_pool.call(project_client.agents.save_file, file_id=file_path_annotation.file_path.file_id, file_name=file_name,target_dir="./blog")
 
     return "Saved"
    
@@ -193,8 +159,9 @@ reflection_team = RoundRobinGroupChat([bing_search_agent, write_agent,save_blog_
 
 async def assistant_run() -> None:
 
-    await Console(
-        reflection_team.run_stream(task="""
+    try:
+        await Console(
+            reflection_team.run_stream(task="""
 
                         I am writing a blog about machine learning. Search for the following 3 questions and write a Chinese blog based on the search results ,save it
                         
@@ -204,6 +171,9 @@ async def assistant_run() -> None:
                                 
 
         """)
-    ) 
+        ) 
+    finally:
+        # Delete the remote agents and threads of the pool, also when the team fails.
+        await agent_pool.close()
 
 asyncio.run(assistant_run())
\ No newline at end of file
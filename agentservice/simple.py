@@ -11,6 +11,8 @@ from azure.identity import DefaultAzureCredential, get_bearer_token_provider
 from azure.ai.projects import AIProjectClient
 from azure.ai.projects.models import BingGroundingTool
 
+from agent_pool import AgentPool
+
 dotenv.load_dotenv()
 
 # Create the token provider
@@ -28,45 +30,29 @@ az_model_client = AzureOpenAIChatCompletionClient(
 async def web_ai_agent(query: str) -> str:
     print("This is Bing for Azure AI Agent Service .......")
     bing = BingGroundingTool(connection_id=conn_id)
-    with project_client:
-        agent = project_client.agents.create_agent(
-            model=os.getenv("AZURE_OPENAI_COMPLETION_DEPLOYMENT_NAME"),
-            name="my-assistant",
-            instructions="""        
-                You are a web search agent.
-                Your only tool is search_tool - use it to find information.
-                    You make only one search call at a time.
-                    Once you have the results, you never do calculations based on them.
-                """,
-                tools=bing.definitions,
-                headers={"x-ms-enable-preview": "true"}
-            )
-        print(f"Created agent, ID: {agent.id}")
-
-        # Create thread for communication
-        thread = project_client.agents.create_thread()
-        print(f"Created thread, ID: {thread.id}")
-
-        # Create message to thread
-        message = project_client.agents.create_message(
-            thread_id=thread.id,
-            role="user",
-            content=query,
-        )
-        print(f"SMS: {message}")
-        # Create and process agent run in thread with tools
-        run = project_client.agents.create_and_process_run(thread_id=thread.id, assistant_id=agent.id)
+    async with agent_pool.session(
+        model=os.getenv("AZURE_OPENAI_COMPLETION_DEPLOYMENT_NAME"),
+        name="my-assistant",
+        instructions="""        
+            You are a web search agent.
+            Your only tool is search_tool - use it to find information.
+                You make only one search call at a time.
+                Once you have the results, you never do calculations based on them.
+            """,
+        tools=bing.definitions,
+        headers={"x-ms-enable-preview": "true"},
+    ) as session:
+        print(f"Using agent {session.agent_id} on thread {session.thread_id}")
+
+        # Create message to thread and process agent run in thread with tools
+        run = await session.run(query)
         print(f"Run finished with status: {run.status}")
 
         if run.status == "failed":
             print(f"Run failed: {run.last_error}")
 
-        # Delete the assistant when done
-        project_client.agents.delete_agent(agent.id)
-        print("Deleted agent")
-
         # Fetch and log all messages
-        messages = project_client.agents.list_messages(thread_id=thread.id)
+        messages = await agent_pool.call(project_client.agents.list_messages, thread_id=session.thread_id)
         print("Messages:"+ messages["data"][0]["content"][0]["text"]["value"])
     return messages["data"][0]["content"][0]["text"]["value"]
 
@@ -82,6 +68,9 @@ bing_connection = project_client.connections.get(
 )
 
 conn_id = bing_connection.id
+
+# The remote agent is created on the first tool call and reused by the following ones.
+agent_pool = AgentPool(project_client)
         
 bing_search_agent = AssistantAgent(
     name="assistant",
@@ -93,11 +82,15 @@ bing_search_agent = AssistantAgent(
 bing = BingGroundingTool(connection_id=conn_id)
 
 async def assistant_run() -> None:
-    response = await bing_search_agent.on_messages(
-            [TextMessage(content="Tell me something about autogen on azure", source="user")],
-            cancellation_token=CancellationToken(),
-    )
-#     print(response.inner_messages)
-    print(response.chat_message)
+    try:
+        response = await bing_search_agent.on_messages(
+                [TextMessage(content="Tell me something about autogen on azure", source="user")],
+                cancellation_token=CancellationToken(),
+        )
+        # print(response.inner_messages)
+        print(response.chat_message)
+    finally:
+        # Delete the remote agent and threads of the pool, also when the agent fails.
+        await agent_pool.close()
 
 asyncio.run(assistant_run())
\ No newline at end of file
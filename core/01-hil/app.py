@@ -4,22 +4,19 @@ import dotenv
 import os
 import datetime
 import json
-from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Mapping, Optional
 
 from autogen_core import (
-    AgentId,
     CancellationToken,
+    DefaultInterventionHandler,
     DefaultTopicId,
     FunctionCall,
     MessageContext,
-    RoutedAgent,
     SingleThreadedAgentRuntime,
     message_handler,
     type_subscription,
 )
-from autogen_core.base.intervention import DefaultInterventionHandler
 from autogen_core.model_context import BufferedChatCompletionContext
 from autogen_core.models import (
     AssistantMessage,
@@ -29,6 +26,11 @@ from autogen_core.models import (
 )
 from autogen_core.tools import BaseTool
 from common.types import TextMessage
+from common.agents import ToolRegistry
+from common.clients import model_clients
+from common.console import AsyncStdinReader
+from common.persistence import SqliteStateStore
+from common.sessions import InMemoryStateStore, Session, SessionManager, StatefulAgent
 from common.utils import get_chat_completion_client_from_envs
 from pydantic import BaseModel, Field
 
@@ -55,22 +57,8 @@ class TerminateMessage:
     content: str
 
 
-class MockPersistence:
-    def __init__(self):
-        self._content: Mapping[str, Any] = {}
-
-    def load_content(self) -> Mapping[str, Any]:
-        return self._content
-
-    def save_content(self, content: Mapping[str, Any]) -> None:
-        self._content = content
-
-
-state_persister = MockPersistence()
-
-
 @type_subscription("scheduling_assistant_conversation")
-class SlowUserProxyAgent(RoutedAgent):
+class SlowUserProxyAgent(StatefulAgent):
     def __init__(
         self,
         name: str,
@@ -89,12 +77,12 @@ class SlowUserProxyAgent(RoutedAgent):
 
     async def save_state(self) -> Mapping[str, Any]:
         state_to_save = {
-            "memory": self._model_context.save_state(),
+            "memory": await self._model_context.save_state(),
         }
         return state_to_save
 
     async def load_state(self, state: Mapping[str, Any]) -> None:
-        self._model_context.load_state({**state["memory"], "messages": [m for m in state["memory"]["messages"]]})
+        await self._model_context.load_state({**state["memory"], "messages": [m for m in state["memory"]["messages"]]})
 
 
 class ScheduleMeetingInput(BaseModel):
@@ -122,7 +110,7 @@ class ScheduleMeetingTool(BaseTool[ScheduleMeetingInput, ScheduleMeetingOutput])
 
 
 @type_subscription("scheduling_assistant_conversation")
-class SchedulingAssistantAgent(RoutedAgent):
+class SchedulingAssistantAgent(StatefulAgent):
     def __init__(
         self,
         name: str,
@@ -139,6 +127,7 @@ class SchedulingAssistantAgent(RoutedAgent):
         )
         self._name = name
         self._model_client = model_client
+        self._tools = ToolRegistry([ScheduleMeetingTool()])
         self._system_messages = [
             SystemMessage(
                 content=f"""
@@ -154,14 +143,13 @@ Today's date is {datetime.datetime.now().strftime("%Y-%m-%d")}
     async def handle_message(self, message: UserTextMessage, ctx: MessageContext) -> None:
         await self._model_context.add_message(UserMessage(content=message.content, source=message.source))
 
-        tools = [ScheduleMeetingTool()]
         response = await self._model_client.create(
-            self._system_messages + (await self._model_context.get_messages()), tools=tools
+            self._system_messages + (await self._model_context.get_messages()), tools=self._tools.schemas
         )
 
         if isinstance(response.content, list) and all(isinstance(item, FunctionCall) for item in response.content):
             for call in response.content:
-                tool = next((tool for tool in tools if tool.name == call.name), None)
+                tool = self._tools.get(call.name)
                 if tool is None:
                     raise ValueError(f"Tool not found: {call.name}")
                 arguments = json.loads(call.arguments)
@@ -180,22 +168,25 @@ Today's date is {datetime.datetime.now().strftime("%Y-%m-%d")}
 
     async def save_state(self) -> Mapping[str, Any]:
         return {
-            "memory": self._model_context.save_state(),
+            "memory": await self._model_context.save_state(),
         }
 
     async def load_state(self, state: Mapping[str, Any]) -> None:
-        self._model_context.load_state({**state["memory"], "messages": [m for m in state["memory"]["messages"]]})
+        await self._model_context.load_state({**state["memory"], "messages": [m for m in state["memory"]["messages"]]})
 
 
 class NeedsUserInputHandler(DefaultInterventionHandler):
     def __init__(self):
         self.question_for_user: GetSlowUserMessage | None = None
 
-    async def on_publish(self, message: Any, *, sender: AgentId | None) -> Any:
+    async def on_publish(self, message: Any, *, message_context: MessageContext) -> Any:
         if isinstance(message, GetSlowUserMessage):
             self.question_for_user = message
         return message
 
+    def reset(self) -> None:
+        self.question_for_user = None
+
     @property
     def needs_user_input(self) -> bool:
         return self.question_for_user is not None
@@ -211,11 +202,14 @@ class TerminationHandler(DefaultInterventionHandler):
     def __init__(self):
         self.terminateMessage: TerminateMessage | None = None
 
-    async def on_publish(self, message: Any, *, sender: AgentId | None) -> Any:
+    async def on_publish(self, message: Any, *, message_context: MessageContext) -> Any:
         if isinstance(message, TerminateMessage):
             self.terminateMessage = message
         return message
 
+    def reset(self) -> None:
+        self.terminateMessage = None
+
     @property
     def is_terminated(self) -> bool:
         return self.terminateMessage is not None
@@ -227,92 +221,129 @@ class TerminationHandler(DefaultInterventionHandler):
         return self.terminateMessage.content
 
 
-async def main(latest_user_input: Optional[str] = None) -> None | str:
-    """
-    Asynchronous function that serves as the entry point of the program.
-    This function initializes the necessary components for the program and registers the user and scheduling assistant agents.
-    If a user input is provided, it loads the state (from some persistent layer) and publishes the user input message to
-    the scheduling assistant. Otherwise, it adds an initial message to the scheduling assistant's history and publishes it
-    to the message queue. The program then starts running and stops when either the termination handler is triggered
-    or user input is needed. Finally, it saves the state and returns the user input needed if any.
+@dataclass
+class TurnHandlers:
+    termination_handler: TerminationHandler
+    needs_user_input_handler: NeedsUserInputHandler
 
-    Args:
-        latest_user_input (Optional[str]): The latest user input. Defaults to None.
+    def reset(self) -> None:
+        self.termination_handler.reset()
+        self.needs_user_input_handler.reset()
 
-    Returns:
-        None or str: The user input needed if the program requires user input, otherwise None.
-    """
-    global state_persister
 
-    termination_handler = TerminationHandler()
-    needs_user_input_handler = NeedsUserInputHandler()
-    runtime = SingleThreadedAgentRuntime(intervention_handlers=[needs_user_input_handler, termination_handler])
+initial_schedule_assistant_message = AssistantTextMessage(
+    content="Hi! How can I help you? I can help schedule meetings", source="User"
+)
 
-    await SlowUserProxyAgent.register(runtime, "User", lambda: SlowUserProxyAgent("User", "I am a user"))
 
-    initial_schedule_assistant_message = AssistantTextMessage(
-        content="Hi! How can I help you? I can help schedule meetings", source="User"
+async def create_session(session_id: str, model_client: ChatCompletionClient | None = None) -> Session[TurnHandlers]:
+    """Creates the runtime of a session and registers the user and scheduling assistant agents."""
+    handlers = TurnHandlers(TerminationHandler(), NeedsUserInputHandler())
+    runtime = SingleThreadedAgentRuntime(
+        intervention_handlers=[handlers.needs_user_input_handler, handlers.termination_handler]
     )
+
+    await SlowUserProxyAgent.register(runtime, "User", lambda: SlowUserProxyAgent("User", "I am a user"))
     await SchedulingAssistantAgent.register(
         runtime,
         "SchedulingAssistant",
         lambda: SchedulingAssistantAgent(
             "SchedulingAssistant",
             description="AI that helps you schedule meetings",
-            model_client=get_chat_completion_client_from_envs(model="gpt-4o-mini"),
+            model_client=model_client or get_chat_completion_client_from_envs(model="gpt-4o-mini"),
             initial_message=initial_schedule_assistant_message,
         ),
     )
+    return Session(session_id, runtime, handlers)
+
+
+# Sessions of imports of this module, like the benchmarks, stay in memory. Run as a script, they are stored on disk.
+session_manager: SessionManager[TurnHandlers] = SessionManager(create_session, InMemoryStateStore())
+
+
+async def main(latest_user_input: Optional[str] = None, session_id: str = "default") -> None | str:
+    """
+    Asynchronous function that runs one turn of a session.
+    It takes the runtime of the session from the session manager, which keeps recently used sessions warm and
+    otherwise creates the runtime and loads the state of its agents (from some persistent layer). If a user input is
+    provided, it publishes the user input message to the scheduling assistant. Otherwise, it publishes the initial
+    message of the scheduling assistant. The runtime then runs until either the termination handler is triggered
+    or user input is needed. Finally, the session manager saves the state of the agents that changed, and the
+    user input needed is returned if any.
+
+    Args:
+        latest_user_input (Optional[str]): The latest user input. Defaults to None.
+        session_id (str): The session of the turn. Defaults to "default".
+
+    Returns:
+        None or str: The user input needed if the program requires user input, otherwise None.
+    """
+    async with session_manager.turn(session_id) as session:
+        return await run_turn(session, latest_user_input)
+
+
+async def run_turn(session: Session[TurnHandlers], latest_user_input: Optional[str] = None) -> None | str:
+    """Runs one turn on the runtime of `session` and returns the user input needed if any."""
+    runtime = session.runtime
+    handlers = session.context
+    handlers.reset()
 
     if latest_user_input is not None:
         runtime_initiation_message = UserTextMessage(content=latest_user_input, source="User")
     else:
         runtime_initiation_message = initial_schedule_assistant_message
-    state = state_persister.load_content()
-
-    if state:
-        await runtime.load_state(state)
     await runtime.publish_message(
         runtime_initiation_message,
         DefaultTopicId("scheduling_assistant_conversation"),
     )
 
     runtime.start()
-    await runtime.stop_when(lambda: termination_handler.is_terminated or needs_user_input_handler.needs_user_input)
+    # The turn ends with a question for the user or a termination that no agent handles, so the runtime becomes idle
+    # right after either handler is triggered. Unlike `stop_when`, this does not poll the handlers every second.
+    await runtime.stop_when_idle()
 
     user_input_needed = None
-    if needs_user_input_handler.user_input_content is not None:
-        user_input_needed = needs_user_input_handler.user_input_content
-    elif termination_handler.is_terminated:
-        print("Terminated - ", termination_handler.termination_msg)
-
-    state_to_persist = await runtime.save_state()
-    state_persister.save_content(state_to_persist)
+    if handlers.needs_user_input_handler.user_input_content is not None:
+        user_input_needed = handlers.needs_user_input_handler.user_input_content
+    elif handlers.termination_handler.is_terminated:
+        print("Terminated - ", handlers.termination_handler.termination_msg)
 
     return user_input_needed
 
 
+stdin_reader = AsyncStdinReader()
+
+
 async def ainput(prompt: str = "") -> str:
-    with ThreadPoolExecutor(1, "AsyncInput") as executor:
-        return await asyncio.get_event_loop().run_in_executor(executor, input, prompt)
+    return await stdin_reader.readline(prompt)
 
 
 if __name__ == "__main__":
+    # Keep the sessions across restarts, the agents then continue with their stored state. The state of a turn is
+    # saved while the user reads the question and types the answer.
+    state_store = SqliteStateStore(os.getenv("SESSION_STATE_PATH", "session_state.sqlite"))
+    session_manager = SessionManager(create_session, state_store, background_saves=True)
 
-    def get_user_input(question_for_user: str):
+    async def get_user_input(question_for_user: str) -> str:
         print("--------------------------QUESTION_FOR_USER--------------------------")
         print(question_for_user)
         print("---------------------------------------------------------------------")
-        user_input = input("Enter your input: ")
-        return user_input
-
-    async def run_main(question_for_user: str | None = None):
-        if question_for_user:
-            user_input = get_user_input(question_for_user)
-        else:
-            user_input = None
-        user_input_needed = await main(user_input)
-        if user_input_needed:
-            await run_main(user_input_needed)
-
-    asyncio.run(run_main())
\ No newline at end of file
+        return await ainput("Enter your input: ")
+
+    async def run_session(session_id: str = "default"):
+        # The runtime of the session stays warm across the turns, the model client and its connections are shared.
+        try:
+            user_input_needed = await main(None, session_id)
+            while user_input_needed:
+                try:
+                    user_input = await get_user_input(user_input_needed)
+                except EOFError:
+                    break
+                user_input_needed = await main(user_input, session_id)
+        finally:
+            stdin_reader.close()
+            await session_manager.close()
+            await state_store.close()
+            await model_clients.aclose()
+
+    asyncio.run(run_session())
\ No newline at end of file
@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import functools
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+from app import TurnHandlers, create_session, run_turn
+from common.fakes import StubChatCompletionClient
+from common.persistence import SqliteStateStore
+from common.sessions import SessionManager
+from rich.console import Console
+from rich.table import Table
+
+SESSION_ID = "session-0"
+
+
+def user_input(turn: int) -> str | None:
+    return None if turn == 0 else f"Meet Alice, message {turn}."
+
+
+def model_client() -> StubChatCompletionClient:
+    return StubChatCompletionClient(lambda _: "Which date and time should the meeting have?")
+
+
+async def measure(turns: int, compact_every: int) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as directory:
+        store = SqliteStateStore(os.path.join(directory, "state.sqlite"), compact_every=compact_every)
+        manager: SessionManager[TurnHandlers] = SessionManager(
+            functools.partial(create_session, model_client=model_client()), store
+        )
+        written: List[int] = []
+        latencies: List[float] = []
+        for turn in range(turns):
+            bytes_before = store.bytes_written
+            start = time.perf_counter()
+            async with manager.turn(SESSION_ID) as session:
+                await run_turn(session, user_input(turn))
+            latencies.append(time.perf_counter() - start)
+            written.append(store.bytes_written - bytes_before)
+        await manager.close()
+        await store.close()
+    return {
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "first_bytes": sum(written[:10]) / 10,
+        "last_bytes": sum(written[-10:]) / 10,
+        "total_kb": sum(written) / 1024,
+    }
+
+
+async def main(turns: int, compact_every: int) -> None:
+    table = Table(title=f"{turns} turns of one session in SQLite, no model latency")
+    table.add_column("Saves")
+    table.add_column("Mean turn (ms)", justify="right")
+    table.add_column("Bytes/turn, first 10", justify="right")
+    table.add_column("Bytes/turn, last 10", justify="right")
+    table.add_column("Written (KB)", justify="right")
+    # A snapshot on every save writes the whole state, like saving `runtime.save_state()` every turn.
+    for name, every in [("full state", 1), (f"deltas, compacted every {compact_every}", compact_every)]:
+        result = await measure(turns, every)
+        table.add_row(
+            name,
+            f"{result['mean_ms']:.2f}",
+            f"{result['first_bytes']:.0f}",
+            f"{result['last_bytes']:.0f}",
+            f"{result['total_kb']:.0f}",
+        )
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the size of the incremental state persistence.")
+    parser.add_argument("--turns", type=int, default=300)
+    parser.add_argument("--compact-every", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.compact_every))
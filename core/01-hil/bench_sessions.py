@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import functools
+import time
+from typing import List
+
+from app import TurnHandlers, create_session, run_turn
+from common.fakes import StubChatCompletionClient
+from common.sessions import InMemoryStateStore, SessionManager
+from rich.console import Console
+from rich.table import Table
+
+
+async def run(max_sessions: int, sessions: int, turns: int) -> tuple[List[float], SessionManager[TurnHandlers]]:
+    """Runs `turns` turns of every session, round robin, and returns the seconds of every turn."""
+    model_client = StubChatCompletionClient(lambda _: "Which date and time should the meeting have?")
+    manager: SessionManager[TurnHandlers] = SessionManager(
+        functools.partial(create_session, model_client=model_client), InMemoryStateStore(), max_sessions=max_sessions
+    )
+    latencies: List[float] = []
+    for turn in range(turns):
+        for session_id in range(sessions):
+            start = time.perf_counter()
+            async with manager.turn(f"session-{session_id}") as session:
+                await run_turn(session, None if turn == 0 else f"Meet Alice, message {turn}.")
+            latencies.append(time.perf_counter() - start)
+    await manager.close()
+    return latencies, manager
+
+
+async def main(sessions: int, turns: int) -> None:
+    table = Table(title=f"{sessions} sessions with {turns} turns each, no model latency")
+    table.add_column("Sessions")
+    table.add_column("Mean (ms)", justify="right")
+    table.add_column("First 10 turns (ms)", justify="right")
+    table.add_column("Last 10 turns (ms)", justify="right")
+    table.add_column("Agent states saved", justify="right")
+    # Cold keeps no session in memory, every turn creates the runtime and loads the state, as before.
+    for name, max_sessions in [("cold", 0), ("warm", sessions)]:
+        latencies, manager = await run(max_sessions, sessions, turns)
+        head, tail = latencies[: 10 * sessions], latencies[-10 * sessions :]
+        table.add_row(
+            name,
+            f"{sum(latencies) / len(latencies) * 1000:.2f}",
+            f"{sum(head) / len(head) * 1000:.2f}",
+            f"{sum(tail) / len(tail) * 1000:.2f}",
+            str(manager.stats.agents_saved),
+        )
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the per-turn overhead of warm and cold sessions.")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.sessions, args.turns))
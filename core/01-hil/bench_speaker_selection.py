@@ -0,0 +1,109 @@
+import argparse
+import asyncio
+import re
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from autogen_core import AgentId, AgentMetadata, AgentProxy
+from autogen_core.model_context import UnboundedChatCompletionContext
+from autogen_core.models import ChatCompletionClient, SystemMessage, UserMessage
+from common.fakes import StubChatCompletionClient
+from common.patterns import SpeakerSelector
+from rich.console import Console
+from rich.table import Table
+
+
+class RemoteAgentProxy(AgentProxy):
+    """An agent proxy whose metadata takes a round trip of `latency` seconds, like one of a distributed runtime."""
+
+    def __init__(self, agent: AgentId, description: str, latency: float) -> None:
+        self._agent = agent
+        self._description = description
+        self._latency = latency
+
+    @property
+    def metadata(self) -> Awaitable[AgentMetadata]:
+        return self._metadata()
+
+    async def _metadata(self) -> AgentMetadata:
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        return AgentMetadata(type=self._agent.type, key=self._agent.key, description=self._description)
+
+
+async def select_speaker_before(
+    context: UnboundedChatCompletionContext, client: ChatCompletionClient, agents: List[AgentProxy]
+) -> int:
+    """The selection as before: metadata awaited per use, and one regular expression per agent and response."""
+    history = "\n".join(f"{msg.source}: {msg.content}" for msg in await context.get_messages())  # type: ignore
+    roles = "\n".join(
+        [f"{(await agent.metadata)['type']}: {(await agent.metadata)['description']}".strip() for agent in agents]
+    )
+    participants = str([(await agent.metadata)["type"] for agent in agents])
+    prompt = f"The following roles are available:\n{roles}.\n{history}\nSelect the next role from {participants}."
+    response = await client.create(messages=[SystemMessage(content=prompt)])
+    assert isinstance(response.content, str)
+    mentions: Dict[str, int] = {}
+    for agent in agents:
+        name = (await agent.metadata)["type"]
+        regex = (
+            r"(?<=\W)("
+            + re.escape(name)
+            + r"|"
+            + re.escape(name.replace("_", " "))
+            + r"|"
+            + re.escape(name.replace("_", r"\_"))
+            + r")(?=\W)"
+        )
+        count = len(re.findall(regex, f" {response.content} "))
+        if count > 0:
+            mentions[name] = count
+    assert len(mentions) == 1, mentions
+    agent_name = list(mentions.keys())[0]
+    for i, agent in enumerate(agents):
+        if (await agent.metadata)["type"] == agent_name:
+            return i
+    raise AssertionError(agent_name)
+
+
+async def measure(select: Callable[[], Awaitable[object]], selections: int) -> float:
+    """Mean milliseconds of `select`."""
+    start = time.perf_counter()
+    for _ in range(selections):
+        await select()
+    return (time.perf_counter() - start) / selections * 1000
+
+
+async def main(num_participants: int, selections: int, latency_ms: float) -> None:
+    # Mention the last participant, the worst case of a linear search.
+    speaker = f"specialist_{num_participants - 1}"
+    client = StubChatCompletionClient(lambda _: f"The next role is {speaker.replace('_', ' ')}.")
+    context = UnboundedChatCompletionContext()
+    for i in range(10):
+        await context.add_message(UserMessage(content=f"Message {i} about the plan.", source=f"specialist_{i}"))
+
+    table = Table(title=f"Speaker selection among {num_participants} participants, mean of {selections} selections")
+    table.add_column("Metadata round trip (ms)", justify="right")
+    table.add_column("Before (ms)", justify="right")
+    table.add_column("SpeakerSelector (ms)", justify="right")
+    for latency in [0.0, latency_ms / 1000]:
+        proxies: List[AgentProxy] = [
+            RemoteAgentProxy(AgentId(f"specialist_{i}", "default"), f"Knows about topic {i}.", latency)
+            for i in range(num_participants)
+        ]
+        candidates = [proxy.id for proxy in proxies]
+        selector = SpeakerSelector(proxies)
+        assert await selector.select(context, client, candidates) == AgentId(speaker, "default")
+        before = await measure(lambda: select_speaker_before(context, client, proxies), selections)
+        after = await measure(lambda: selector.select(context, client, candidates), selections)
+        table.add_row(f"{latency * 1000:.1f}", f"{before:.3f}", f"{after:.3f}")
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the overhead of selecting the next speaker of a group chat.")
+    parser.add_argument("--participants", type=int, default=50)
+    parser.add_argument("--selections", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=1.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.participants, args.selections, args.latency_ms))
@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from dataclasses import asdict
+from typing import Dict, List, Sequence, Tuple
+
+from autogen_core import AgentId, AgentProxy, MessageContext, RoutedAgent, SingleThreadedAgentRuntime, message_handler
+from autogen_core.model_context import UnboundedChatCompletionContext
+from autogen_core.models import LLMMessage, UserMessage
+from common.fakes import StubChatCompletionClient
+from common.patterns import SelectionTiers, SpeakerDecision, SpeakerSelector
+from common.types import TextMessage
+from rich.console import Console
+from rich.table import Table
+
+PARTICIPANTS: Dict[str, str] = {
+    "planner": "Breaks the project down into tasks, milestones and a schedule.",
+    "coder": "Writes and fixes Python code, implements functions and classes.",
+    "tester": "Writes unit tests, runs the test suite and reports failing tests.",
+    "reviewer": "Reviews pull requests for readability, naming and style.",
+    "designer": "Designs the user interface, layouts, colors and icons.",
+    "data_analyst": "Analyzes data, builds charts and computes statistics and metrics.",
+    "security_expert": "Finds vulnerabilities, checks authentication, secrets and encryption.",
+    "writer": "Writes documentation, release notes and the user guide.",
+}
+
+# The messages of the chat and the speaker the model selects after each of them.
+TURNS: List[Tuple[str, str]] = [
+    ("Let's plan the milestones for the next release.", "planner"),
+    ("@coder please implement the export function.", "coder"),
+    ("The export function is implemented, we need unit tests for it.", "tester"),
+    ("Three tests are failing in the test suite.", "coder"),
+    ("@reviewer can you look at the pull request?", "reviewer"),
+    ("The layout of the settings page needs new icons and colors.", "designer"),
+    ("How many users opened the page last week? A chart would help.", "data_analyst"),
+    ("Are the API secrets and the authentication safe?", "security_expert"),
+    ("We need release notes and an update of the user guide.", "writer"),
+    ("What do you all think, are we done?", "planner"),
+    ("Good point, but what comes next?", "planner"),
+    ("@security_expert check the encryption of the backups.", "security_expert"),
+    ("The naming in this pull request is hard to read.", "reviewer"),
+    ("Compute the statistics of the response times.", "data_analyst"),
+    ("Hmm, not sure about that.", "coder"),
+    ("Fix the bug in the Python class.", "coder"),
+]
+
+
+class Specialist(RoutedAgent):
+    @message_handler
+    async def on_text(self, message: TextMessage, ctx: MessageContext) -> None:
+        pass
+
+
+def baseline(messages: Sequence[LLMMessage]) -> str:
+    """The model: it selects the speaker of the last message of the chat in `TURNS`."""
+    prompt = str(messages[-1].content)
+    last = prompt.rsplit("\n\n", 2)[-2].splitlines()[-1]
+    return next(speaker for text, speaker in TURNS if last.endswith(text))
+
+
+async def run(tiers: SelectionTiers | None, turns: int, model_latency: float) -> Tuple[float, List[SpeakerDecision]]:
+    runtime = SingleThreadedAgentRuntime()
+    for name, description in PARTICIPANTS.items():
+        await Specialist.register(runtime, name, lambda description=description: Specialist(description))
+    runtime.start()
+    proxies = [AgentProxy(AgentId(name, "default"), runtime) for name in PARTICIPANTS]
+    candidates = [proxy.id for proxy in proxies]
+    selector = SpeakerSelector(proxies, tiers)
+    client = StubChatCompletionClient(baseline, latency=model_latency)
+    context = UnboundedChatCompletionContext()
+    decisions: List[SpeakerDecision] = []
+    start = time.perf_counter()
+    for i in range(turns):
+        text, _ = TURNS[i % len(TURNS)]
+        await context.add_message(UserMessage(content=text, source="user"))
+        decisions.append(await selector.decide(context, client, candidates, text))
+    elapsed = time.perf_counter() - start
+    await runtime.stop()
+    return elapsed / turns, decisions
+
+
+async def main(turns: int, model_latency: float, log: str | None) -> None:
+    table = Table(title=f"Speaker selection of {turns} turns among {len(PARTICIPANTS)} participants")
+    for column in ["Selector", "Turn (ms)", "Model calls per turn", "Agreement with the model"]:
+        table.add_column(column, justify="right")
+    tier_table = Table(title="Selections by tier")
+    for column in ["Tier", "Selections", "Agreement with the model"]:
+        tier_table.add_column(column, justify="right")
+    for name, tiers in [("model only", None), ("tiers", SelectionTiers())]:
+        turn_s, decisions = await run(tiers, turns, model_latency)
+        # Offline evaluation: compare every logged decision with the speaker the model selects.
+        agree = [decision.speaker == TURNS[i % len(TURNS)][1] for i, decision in enumerate(decisions)]
+        model_calls = sum(decision.tier == "model" for decision in decisions)
+        table.add_row(name, f"{turn_s * 1000:.1f}", f"{model_calls / turns:.2f}", f"{sum(agree) / turns:.0%}")
+        if tiers is not None:
+            by_tier = Counter(decision.tier for decision in decisions)
+            for tier, count in by_tier.items():
+                agreed = sum(a for a, decision in zip(agree, decisions) if decision.tier == tier)
+                tier_table.add_row(tier, str(count), f"{agreed / count:.0%}")
+            if log:
+                with open(log, "w") as file:
+                    for decision in decisions:
+                        file.write(json.dumps(asdict(decision)) + "\n")
+    Console().print(table)
+    Console().print(tier_table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the tiered speaker selection against the model only.")
+    parser.add_argument("--turns", type=int, default=32)
+    parser.add_argument("--model-latency", type=float, default=0.3)
+    parser.add_argument("--log", help="Write the decisions of the tiered selector to this JSON lines file.")
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.model_latency, args.log))
@@ -0,0 +1,142 @@
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+from autogen_core import AgentId, FunctionCall, MessageContext, RoutedAgent, SingleThreadedAgentRuntime, message_handler
+from autogen_core.model_context import BufferedChatCompletionContext
+from autogen_core.models import FunctionExecutionResultMessage
+from autogen_core.tools import FunctionTool
+from common.agents import ApprovalRule, ChatCompletionAgent, ToolApprovalPolicy
+from common.fakes import StubChatCompletionClient
+from common.types import (
+    FunctionCallMessage,
+    ToolApprovalBatchRequest,
+    ToolApprovalBatchResponse,
+    ToolApprovalRequest,
+    ToolApprovalResponse,
+)
+from rich.console import Console
+from rich.table import Table
+
+
+async def lookup_calendar(person: str) -> str:
+    return f"{person} is free on Friday."
+
+
+async def schedule_meeting(recipient: str, date: str, time: str) -> str:
+    return f"Meeting with {recipient} on {date} at {time}."
+
+
+class HumanApprover(RoutedAgent):
+    """Answers approval requests like a person: one prompt at a time, each taking `prompt_seconds`."""
+
+    def __init__(self, prompt_seconds: float, prompts: List[float]) -> None:
+        super().__init__("Approves tool calls.")
+        self._prompt_seconds = prompt_seconds
+        self._prompt = asyncio.Lock()
+        self._prompts = prompts
+
+    async def _ask(self) -> None:
+        async with self._prompt:
+            await asyncio.sleep(self._prompt_seconds)
+            self._prompts.append(time.perf_counter())
+
+    @message_handler
+    async def on_request(self, message: ToolApprovalRequest, ctx: MessageContext) -> ToolApprovalResponse:
+        await self._ask()
+        return ToolApprovalResponse(tool_call_id=message.tool_call.id, approved=True, reason="Looks good.")
+
+    @message_handler
+    async def on_batch_request(
+        self, message: ToolApprovalBatchRequest, ctx: MessageContext
+    ) -> ToolApprovalBatchResponse:
+        await self._ask()
+        return ToolApprovalBatchResponse(
+            responses=[
+                ToolApprovalResponse(tool_call_id=call.id, approved=True, reason="Looks good.")
+                for call in message.tool_calls
+            ]
+        )
+
+
+def turn_calls(lookups: int, meetings: int) -> List[FunctionCall]:
+    calls = [
+        FunctionCall(id=f"lookup-{i}", name="lookup_calendar", arguments=json.dumps({"person": f"Person {i}"}))
+        for i in range(lookups)
+    ]
+    calls += [
+        FunctionCall(
+            id=f"meeting-{i}",
+            name="schedule_meeting",
+            arguments=json.dumps({"recipient": f"Person {i}", "date": "2025-01-10", "time": "10:00"}),
+        )
+        for i in range(meetings)
+    ]
+    return calls
+
+
+async def run(mode: str, calls: List[FunctionCall], turns: int, prompt_seconds: float) -> Dict[str, float]:
+    runtime = SingleThreadedAgentRuntime()
+    prompts: List[float] = []
+    await HumanApprover.register(runtime, "approver", lambda: HumanApprover(prompt_seconds, prompts))
+    policy = ToolApprovalPolicy([ApprovalRule(tool="lookup_*")]) if mode == "batch with policy" else None
+    await ChatCompletionAgent.register(
+        runtime,
+        "assistant",
+        lambda: ChatCompletionAgent(
+            description="Schedules meetings.",
+            system_messages=[],
+            model_context=BufferedChatCompletionContext(buffer_size=5),
+            model_client=StubChatCompletionClient(lambda _: ""),
+            tools=[
+                FunctionTool(lookup_calendar, description="Looks up the calendar of a person."),
+                FunctionTool(schedule_meeting, description="Schedules a meeting."),
+            ],
+            # The per-call mode asks the approver itself, as the agent did before.
+            tool_approver=None if mode == "one request per call" else AgentId("approver", "default"),
+            tool_approval_policy=policy,
+        ),
+    )
+    runtime.start()
+    start = time.perf_counter()
+    for _ in range(turns):
+        if mode == "one request per call":
+            await asyncio.gather(
+                *(
+                    runtime.send_message(ToolApprovalRequest(tool_call=call), AgentId("approver", "default"))
+                    for call in calls
+                )
+            )
+        result = await runtime.send_message(
+            FunctionCallMessage(content=calls, source="assistant"), AgentId("assistant", "default")
+        )
+        assert isinstance(result, FunctionExecutionResultMessage)
+        assert all(not item.content.startswith("Error") for item in result.content), result
+    elapsed = time.perf_counter() - start
+    await runtime.stop()
+    return {"turn_s": elapsed / turns, "prompts": len(prompts) / turns}
+
+
+async def main(lookups: int, meetings: int, turns: int, prompt_seconds: float) -> None:
+    calls = turn_calls(lookups, meetings)
+    table = Table(title=f"{turns} turns of the same {len(calls)} tool calls, {prompt_seconds}s per approval prompt")
+    table.add_column("Approval")
+    table.add_column("Prompts per turn", justify="right")
+    table.add_column("Turn (s)", justify="right")
+    for mode in ["one request per call", "batch", "batch with policy"]:
+        result = await run(mode, calls, turns, prompt_seconds)
+        table.add_row(mode, f"{result['prompts']:.1f}", f"{result['turn_s']:.2f}")
+    Console().print(table)
+    Console().print("The policy approves lookup_* and caches the approver's decisions of the other calls.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched tool approval against one request per call.")
+    parser.add_argument("--lookups", type=int, default=3)
+    parser.add_argument("--meetings", type=int, default=2)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--prompt-seconds", type=float, default=0.2)
+    args = parser.parse_args()
+    asyncio.run(main(args.lookups, args.meetings, args.turns, args.prompt_seconds))
@@ -0,0 +1,168 @@
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from autogen_core import AgentId, CancellationToken, FunctionCall, SingleThreadedAgentRuntime
+from autogen_core.model_context import UnboundedChatCompletionContext
+from autogen_core.models import CreateResult, FunctionExecutionResultMessage, LLMMessage, UserMessage
+from autogen_core.tools import FunctionTool, Tool, ToolSchema
+from common.agents import ChatCompletionAgent, ToolLoopBudget, ToolLoopIteration
+from common.fakes import StubChatCompletionClient
+from common.types import FunctionCallMessage, RespondNow, TextMessage
+from rich.console import Console
+from rich.table import Table
+
+
+class ToolCallingClient(StubChatCompletionClient):
+    """Answers with `calls_per_round` tool calls until the request has `rounds` tool results since the user message."""
+
+    def __init__(self, rounds: int, calls_per_round: int, latency: float) -> None:
+        super().__init__(lambda _: "Done.", latency=latency)
+        self._rounds = rounds
+        self._calls_per_round = calls_per_round
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        last_user = max(i for i, message in enumerate(messages) if isinstance(message, UserMessage))
+        rounds = sum(isinstance(message, FunctionExecutionResultMessage) for message in messages[last_user:])
+        if rounds >= self._rounds:
+            return await super().create(messages)
+        await asyncio.sleep(self._latency)
+        result = self._result(messages, "")
+        result.content = [
+            FunctionCall(id=f"call-{rounds}-{i}", name="lookup_calendar", arguments='{"person": "Alice"}')
+            for i in range(self._calls_per_round)
+        ]
+        return result
+
+
+class RemoteChatCompletionContext(UnboundedChatCompletionContext):
+    """A model context whose messages are kept in a remote store, every read and write takes `latency` seconds."""
+
+    def __init__(self, latency: float) -> None:
+        super().__init__()
+        self._latency = latency
+
+    async def add_message(self, message: LLMMessage) -> None:
+        await asyncio.sleep(self._latency)
+        await super().add_message(message)
+
+    async def get_messages(self) -> List[LLMMessage]:
+        await asyncio.sleep(self._latency)
+        return await super().get_messages()
+
+
+async def run(
+    pipelined: bool,
+    budget: ToolLoopBudget,
+    turns: int,
+    rounds: int,
+    calls_per_round: int,
+    model_latency: float,
+    tool_latency: float,
+    context_latency: float,
+) -> Dict[str, Any]:
+    async def lookup_calendar(person: str) -> str:
+        await asyncio.sleep(tool_latency)
+        return f"{person} is free on Friday."
+
+    runtime = SingleThreadedAgentRuntime()
+    agents: List[ChatCompletionAgent] = []
+
+    def create_agent() -> ChatCompletionAgent:
+        agent = ChatCompletionAgent(
+            description="Schedules meetings.",
+            system_messages=[],
+            model_context=RemoteChatCompletionContext(context_latency),
+            model_client=ToolCallingClient(rounds, calls_per_round, model_latency),
+            tools=[FunctionTool(lookup_calendar, description="Looks up the calendar of a person.")],
+            tool_loop_budget=budget,
+            pipelined_tool_loop=pipelined,
+        )
+        agents.append(agent)
+        return agent
+
+    await ChatCompletionAgent.register(runtime, "assistant", create_agent)
+    runtime.start()
+    recipient = AgentId("assistant", "default")
+    latencies: List[float] = []
+    iterations: List[ToolLoopIteration] = []
+    for i in range(turns):
+        start = time.perf_counter()
+        await runtime.send_message(TextMessage(content=f"Schedule meeting {i}.", source="user"), recipient)
+        result = await runtime.send_message(RespondNow(), recipient)
+        latencies.append(time.perf_counter() - start)
+        assert isinstance(result, (TextMessage, FunctionCallMessage))
+        iterations = list(agents[0].tool_loop_iterations)
+    await runtime.stop()
+    return {"turn_s": sum(latencies) / turns, "iterations": iterations, "result": type(result).__name__}
+
+
+async def main(
+    turns: int, rounds: int, calls_per_round: int, model_latency: float, tool_latency: float, context_latency: float
+) -> None:
+    table = Table(
+        title=f"{rounds} rounds of {calls_per_round} tool calls per turn, model {model_latency}s, "
+        f"tools {tool_latency}s, context reads and writes {context_latency}s"
+    )
+    table.add_column("Tool loop")
+    table.add_column("Turn (s)", justify="right")
+    table.add_column("Model requests", justify="right")
+    table.add_column("Result")
+    modes = [
+        ("sequential", False, ToolLoopBudget()),
+        ("pipelined", True, ToolLoopBudget()),
+        ("pipelined, at most 2 rounds", True, ToolLoopBudget(max_iterations=2)),
+    ]
+    last_iterations: List[ToolLoopIteration] = []
+    for name, pipelined, budget in modes:
+        result = await run(
+            pipelined, budget, turns, rounds, calls_per_round, model_latency, tool_latency, context_latency
+        )
+        table.add_row(name, f"{result['turn_s']:.2f}", str(len(result["iterations"])), result["result"])
+        if name == "pipelined":
+            last_iterations = result["iterations"]
+    Console().print(table)
+
+    iterations_table = Table(title="Iterations of the last pipelined turn")
+    for column in ["Iteration", "Model (ms)", "Tool calls", "Tools (ms)", "Context, overlapped (ms)", "Tokens"]:
+        iterations_table.add_column(column, justify="right")
+    for iteration in last_iterations:
+        iterations_table.add_row(
+            str(iteration.index),
+            f"{iteration.model_seconds * 1000:.0f}",
+            str(iteration.tool_calls),
+            f"{iteration.tools_seconds * 1000:.0f}",
+            f"{iteration.prepare_seconds * 1000:.0f}",
+            str(iteration.prompt_tokens + iteration.completion_tokens),
+        )
+    Console().print(iterations_table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the sequential and the pipelined tool loop.")
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--calls-per-round", type=int, default=2)
+    parser.add_argument("--model-latency", type=float, default=0.1)
+    parser.add_argument("--tool-latency", type=float, default=0.1)
+    parser.add_argument("--context-latency", type=float, default=0.03)
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            args.turns,
+            args.rounds,
+            args.calls_per_round,
+            args.model_latency,
+            args.tool_latency,
+            args.context_latency,
+        )
+    )
@@ -0,0 +1,86 @@
+import argparse
+import time
+from typing import Callable, List, Sequence
+
+from autogen_core import CancellationToken
+from autogen_core.tools import BaseTool, Tool
+from autogen_ext.models.openai._openai_client import convert_tools
+from common.agents import ToolRegistry
+from pydantic import BaseModel, Field, create_model
+from rich.console import Console
+from rich.table import Table
+
+
+class ToolResult(BaseModel):
+    text: str
+
+
+class FakeTool(BaseTool[BaseModel, ToolResult]):
+    def __init__(self, index: int) -> None:
+        # Every tool has its own argument model, like real tools, so no schema is shared.
+        args_type = create_model(
+            f"Tool{index}Args",
+            person=(str, Field(description="Name of the person")),
+            date=(str, Field(description="Date of the meeting")),
+            duration_minutes=(int, Field(default=30, description="Length of the meeting")),
+        )
+        super().__init__(args_type, ToolResult, f"tool_{index}", f"Fake tool number {index}.")
+
+    async def run(self, args: BaseModel, cancellation_token: CancellationToken) -> ToolResult:
+        return ToolResult(text="done")
+
+
+def measure(turn: Callable[[], None], turns: int) -> float:
+    """Mean milliseconds of `turn`."""
+    start = time.perf_counter()
+    for _ in range(turns):
+        turn()
+    return (time.perf_counter() - start) / turns * 1000
+
+
+def main(num_tools: int, calls_per_turn: int, turns: int) -> None:
+    tools: List[Tool] = [FakeTool(i) for i in range(num_tools)]
+    # The model calls the most recently registered tools, the worst case of a linear search.
+    called = [tool.name for tool in tools[-calls_per_turn:]]
+
+    def list_turn() -> None:
+        # As before: the model client reads `Tool.schema` of every tool, and every call searches the list.
+        convert_tools(tools)
+        for name in called:
+            next(t for t in tools if t.name == name)
+
+    registry = ToolRegistry(tools)
+
+    def registry_turn() -> None:
+        convert_tools(registry.schemas)
+        for name in called:
+            registry.get(name)
+
+    spare = FakeTool(num_tools)
+
+    def hot_swap_turn() -> None:
+        # Adding and removing a tool rebuilds only that tool's schema.
+        registry.add(spare)
+        registry_turn()
+        registry.remove(spare.name)
+
+    table = Table(title=f"{num_tools} registered tools, {calls_per_turn} tool calls per turn")
+    table.add_column("Tools")
+    table.add_column("Per turn (ms)", justify="right")
+    rows: Sequence[tuple[str, Callable[[], None]]] = [
+        ("list", list_turn),
+        ("registry", registry_turn),
+        ("registry, one tool added and removed", hot_swap_turn),
+    ]
+    for name, turn in rows:
+        table.add_row(name, f"{measure(turn, turns):.2f}")
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the per-turn tool overhead with many registered tools.")
+    parser.add_argument("--tools", type=int, default=200)
+    parser.add_argument("--calls-per-turn", type=int, default=3)
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+    main(args.tools, args.calls_per_turn, args.turns)
@@ -0,0 +1,139 @@
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+from autogen_core import AgentId, CancellationToken, FunctionCall, SingleThreadedAgentRuntime
+from autogen_core.model_context import BufferedChatCompletionContext
+from autogen_core.models import FunctionExecutionResultMessage
+from autogen_core.tools import BaseTool, FunctionTool, Tool
+from common.agents import ChatCompletionAgent, ToolExecutor, ToolPolicy
+from common.fakes import StubChatCompletionClient
+from common.types import FunctionCallMessage
+from pydantic import BaseModel
+from rich.console import Console
+from rich.table import Table
+
+
+async def lookup_calendar(person: str) -> str:
+    await asyncio.sleep(0.05)
+    return f"{person} is free on Friday."
+
+
+async def search_rooms(person: str) -> str:
+    await asyncio.sleep(1.0)
+    return "Room 42"
+
+
+def count_primes(person: str) -> str:
+    # About 50 ms of pure Python work.
+    limit = 25_000
+    primes = sum(1 for n in range(2, limit) if all(n % d for d in range(2, int(n**0.5) + 1)))
+    return f"{primes} primes"
+
+
+class PersonArgs(BaseModel):
+    person: str
+
+
+class PersonResult(BaseModel):
+    text: str
+
+
+class ReadAddressBookTool(BaseTool[PersonArgs, PersonResult]):
+    """A tool that blocks the event loop, like one that uses a synchronous client in `run`."""
+
+    def __init__(self) -> None:
+        super().__init__(PersonArgs, PersonResult, "read_address_book", "Reads the address book of a person.")
+
+    async def run(self, args: PersonArgs, cancellation_token: CancellationToken) -> PersonResult:
+        time.sleep(0.05)
+        return PersonResult(text=f"{args.person}@example.com")
+
+
+TOOLS: List[Tool] = [
+    FunctionTool(lookup_calendar, description="Looks up the calendar of a person."),
+    FunctionTool(search_rooms, description="Searches a free meeting room."),
+    FunctionTool(count_primes, description="A CPU-bound tool."),
+    ReadAddressBookTool(),
+]
+
+POLICIES: Dict[str, ToolPolicy] = {
+    "lookup_calendar": ToolPolicy(max_concurrency=4),
+    "search_rooms": ToolPolicy(timeout_seconds=0.2),
+    "count_primes": ToolPolicy(offload="process"),
+    "read_address_book": ToolPolicy(offload="thread"),
+}
+
+
+async def run(executor: ToolExecutor, calls_per_tool: int, turns: int) -> Dict[str, float]:
+    runtime = SingleThreadedAgentRuntime()
+    await ChatCompletionAgent.register(
+        runtime,
+        "assistant",
+        lambda: ChatCompletionAgent(
+            description="Schedules meetings.",
+            system_messages=[],
+            model_context=BufferedChatCompletionContext(buffer_size=5),
+            model_client=StubChatCompletionClient(lambda _: ""),
+            tools=TOOLS,
+            tool_executor=executor,
+        ),
+    )
+    runtime.start()
+    calls = [
+        FunctionCall(id=f"{tool.name}-{i}", name=tool.name, arguments='{"person": "Alice"}')
+        for tool in TOOLS
+        for i in range(calls_per_tool)
+    ]
+    max_lag = 0.0
+    stop = asyncio.Event()
+
+    async def heartbeat() -> None:
+        # How late the event loop wakes up a task that sleeps 5 ms, everything else in the runtime waits as long.
+        nonlocal max_lag
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            max_lag = max(max_lag, time.perf_counter() - start - 0.005)
+
+    monitor = asyncio.create_task(heartbeat())
+    latencies: List[float] = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        result = await runtime.send_message(
+            FunctionCallMessage(content=calls, source="assistant"), AgentId("assistant", "default")
+        )
+        latencies.append(time.perf_counter() - start)
+        assert isinstance(result, FunctionExecutionResultMessage) and len(result.content) == len(calls)
+    stop.set()
+    await monitor
+    await runtime.stop()
+    executor.close()
+    return {"mean_s": sum(latencies) / len(latencies), "max_lag_ms": max_lag * 1000}
+
+
+async def main(calls_per_tool: int, turns: int) -> None:
+    table = Table(title=f"{turns} turns with {calls_per_tool} calls of each of {len(TOOLS)} tools")
+    table.add_column("Executor")
+    table.add_column("Turn (s)", justify="right")
+    table.add_column("Max event loop lag (ms)", justify="right")
+    for name, executor in [("on the event loop", ToolExecutor()), ("with policies", ToolExecutor(POLICIES))]:
+        result = await run(executor, calls_per_tool, turns)
+        table.add_row(name, f"{result['mean_s']:.2f}", f"{result['max_lag_ms']:.0f}")
+    Console().print(table)
+    Console().print(
+        "Policies: "
+        + ", ".join(
+            f"{name} (limit {policy.max_concurrency}, timeout {policy.timeout_seconds}, offload {policy.offload})"
+            for name, policy in POLICIES.items()
+        )
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent tool execution with mixed fake tools.")
+    parser.add_argument("--calls-per-tool", type=int, default=4)
+    parser.add_argument("--turns", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls_per_tool, args.turns))
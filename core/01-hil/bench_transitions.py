@@ -0,0 +1,68 @@
+import argparse
+import random
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from autogen_core import AgentId
+from common.patterns import TransitionGraph
+from rich.console import Console
+from rich.table import Table
+
+
+def candidates_before(
+    participants: List[AgentId], transitions: Dict[AgentId, List[AgentId]], source: str
+) -> Tuple[int | None, Sequence[AgentId]]:
+    """The lookup of `GroupChatManager.on_new_message` as before: a linear search and a nested membership test."""
+    last_speaker_index = next((i for i, p in enumerate(participants) if p.type == source), None)
+    if last_speaker_index is not None:
+        last_speaker = participants[last_speaker_index]
+        if transitions.get(last_speaker) is not None:
+            return last_speaker_index, [c for c in participants if c in transitions[last_speaker]]
+        return last_speaker_index, participants
+    return last_speaker_index, participants
+
+
+def measure(lookup: Callable[[str], object], sources: List[str]) -> float:
+    """Mean microseconds of `lookup` per message."""
+    start = time.perf_counter()
+    for source in sources:
+        lookup(source)
+    return (time.perf_counter() - start) / len(sources) * 1e6
+
+
+def main(sizes: List[int], successors: int, messages: int, dot: str | None) -> None:
+    rng = random.Random(0)
+    table = Table(title=f"Candidates of the next speaker, {successors} allowed successors per participant")
+    for column in ["Participants", "Before (µs per message)", "TransitionGraph (µs per message)", "Compile (ms)"]:
+        table.add_column(column, justify="right")
+    for size in sizes:
+        participants = [AgentId(f"agent_{i}", "default") for i in range(size)]
+        # Every other participant has transitions, the others can be followed by everyone.
+        transitions = {
+            p: rng.sample(participants, min(successors, size)) for i, p in enumerate(participants) if i % 2 == 0
+        }
+        sources = [rng.choice(participants).type for _ in range(messages)]
+        start = time.perf_counter()
+        graph = TransitionGraph(participants, transitions)
+        compile_ms = (time.perf_counter() - start) * 1000
+        for source in sources[:100]:
+            assert list(graph.candidates(source)) == list(candidates_before(participants, transitions, source)[1])
+        before = measure(lambda source: candidates_before(participants, transitions, source), sources)
+        after = measure(lambda source: (graph.index(source), graph.candidates(source)), sources)
+        table.add_row(str(size), f"{before:.1f}", f"{after:.2f}", f"{compile_ms:.1f}")
+        problems = graph.validate()
+        if dot:
+            with open(dot, "w") as file:
+                file.write(graph.to_dot())
+    Console().print(table)
+    Console().print(f"Validation of the largest graph: {len(problems)} participants can not be reached.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the candidate lookup of the group chat manager.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--successors", type=int, default=10)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--dot", help="Write the largest transition graph to this DOT file.")
+    args = parser.parse_args()
+    main(args.sizes, args.successors, args.messages, args.dot)
@@ -1,5 +1,17 @@
 from ._chat_completion_agent import ChatCompletionAgent
+from ._tool_approval import ApprovalRule, ToolApprovalPolicy
+from ._tool_executor import ToolExecutor, ToolPolicy, iterate_as_completed
+from ._tool_loop import ToolLoopBudget, ToolLoopIteration
+from ._tool_registry import ToolRegistry
 
 __all__ = [
+    "ApprovalRule",
     "ChatCompletionAgent",
-]
\ No newline at end of file
+    "ToolApprovalPolicy",
+    "ToolExecutor",
+    "ToolLoopBudget",
+    "ToolLoopIteration",
+    "ToolPolicy",
+    "ToolRegistry",
+    "iterate_as_completed",
+]
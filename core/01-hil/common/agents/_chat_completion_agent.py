@@ -1,6 +1,7 @@
 import asyncio
 import json
-from typing import Any, Coroutine, Dict, List, Mapping, Sequence, Tuple
+import time
+from typing import Any, Coroutine, Dict, List, Mapping, Sequence, Tuple, cast
 
 from autogen_core import (
     AgentId,
@@ -31,9 +32,14 @@ from ..types import (
     RespondNow,
     ResponseFormat,
     TextMessage,
-    ToolApprovalRequest,
+    ToolApprovalBatchRequest,
+    ToolApprovalBatchResponse,
     ToolApprovalResponse,
 )
+from ._tool_approval import ToolApprovalPolicy
+from ._tool_executor import ToolExecutor, iterate_as_completed
+from ._tool_loop import ToolLoopBudget, ToolLoopIteration
+from ._tool_registry import ToolRegistry
 
 
 class ChatCompletionAgent(RoutedAgent):
@@ -48,17 +54,39 @@ class ChatCompletionAgent(RoutedAgent):
             and retrieving ChatCompletion messages.
         model_client (ChatCompletionClient): The client to use for the
             ChatCompletion API.
-        tools (Sequence[Tool], optional): The tools used by the agent. Defaults
-            to []. If no tools are provided, the agent cannot handle tool calls.
-            If tools are provided, and the response from the model is a list of
-            tool calls, the agent will call itselfs with the tool calls until it
-            gets a response that is not a list of tool calls, and then use that
-            response as the final response.
+        tools (Sequence[Tool] | ToolRegistry, optional): The tools used by the
+            agent. Defaults to []. Pass a `ToolRegistry` to add or remove tools
+            while the agent runs. If no tools are provided, the agent cannot
+            handle tool calls. If tools are provided, and the response from the
+            model is a list of tool calls, the agent will execute the tool calls
+            and ask the model again until it gets a response that is not a list
+            of tool calls, and then use that response as the final response.
         tool_approver (Agent | None, optional): The agent that approves tool
             calls. Defaults to None. If no tool approver is provided, the agent
             will execute the tools without approval. If a tool approver is
-            provided, the agent will send a request to the tool approver before
-            executing the tools.
+            provided, the agent will send one request with all tool calls of a
+            response to the tool approver before executing the tools.
+        tool_approval_policy (ToolApprovalPolicy | None, optional): Rules that
+            approve or reject tool calls locally, and a cache of the decisions.
+            Defaults to None. Only calls the policy does not decide are sent to
+            the tool approver; without a tool approver, they are executed.
+        tool_executor (ToolExecutor | None, optional): Runs the tool calls
+            within the concurrency limits, deadlines and offloading of their
+            `ToolPolicy`. Defaults to None, a new executor that runs every tool
+            on the event loop without limits. Share an executor between agents
+            to share the limits.
+        tool_loop_budget (ToolLoopBudget | None, optional): The maximum
+            iterations and tokens of the tool loop of one response. Defaults to
+            None, no limits. When the budget is used up, the agent returns the
+            pending tool calls as a `FunctionCallMessage`, and adds them to the
+            model context with results that say they were not executed.
+        pipelined_tool_loop (bool, optional): Whether to add the messages of
+            the tool loop to the model context while the tools execute and the
+            model handles the next request, instead of in between. Defaults to
+            False. The requests of a pipelined loop are the messages of the
+            first request plus the messages added since, without fetching the
+            model context again, so a buffered context is trimmed only at the
+            next response.
     """
 
     def __init__(
@@ -67,16 +95,30 @@ class ChatCompletionAgent(RoutedAgent):
         system_messages: List[SystemMessage],
         model_context: ChatCompletionContext,
         model_client: ChatCompletionClient,
-        tools: Sequence[Tool] = [],
+        tools: Sequence[Tool] | ToolRegistry = [],
         tool_approver: AgentId | None = None,
+        tool_approval_policy: ToolApprovalPolicy | None = None,
+        tool_executor: ToolExecutor | None = None,
+        tool_loop_budget: ToolLoopBudget | None = None,
+        pipelined_tool_loop: bool = False,
     ) -> None:
         super().__init__(description)
         self._description = description
         self._system_messages = system_messages
         self._client = model_client
         self._model_context = model_context
-        self._tools = tools
+        self._tools = tools if isinstance(tools, ToolRegistry) else ToolRegistry(tools)
         self._tool_approver = tool_approver
+        self._tool_approval_policy = tool_approval_policy
+        self._tool_executor = tool_executor or ToolExecutor()
+        self._tool_loop_budget = tool_loop_budget or ToolLoopBudget()
+        self._pipelined_tool_loop = pipelined_tool_loop
+        self._tool_loop_iterations: List[ToolLoopIteration] = []
+
+    @property
+    def tool_loop_iterations(self) -> Sequence[ToolLoopIteration]:
+        """The iterations of the tool loop of the last response, with their timing."""
+        return self._tool_loop_iterations
 
     @message_handler()
     async def on_text_message(self, message: TextMessage, ctx: MessageContext) -> None:
@@ -124,14 +166,20 @@ class ChatCompletionAgent(RoutedAgent):
     ) -> FunctionExecutionResultMessage:
         """Handle a tool call message. This method executes the tools and
         returns the results."""
+        return await self._execute_function_calls(message.content, ctx.cancellation_token)
+
+    async def _execute_function_calls(
+        self,
+        function_calls: List[FunctionCall],
+        cancellation_token: CancellationToken,
+    ) -> FunctionExecutionResultMessage:
         if len(self._tools) == 0:
             raise ValueError("No tools available")
 
-        # Execute the tool calls.
+        # Parse the arguments.
         results: List[FunctionExecutionResult] = []
-        execution_futures: List[Coroutine[Any, Any, Tuple[str, str]]] = []
-        for function_call in message.content:
-            # Parse the arguments.
+        parsed_calls: List[Tuple[FunctionCall, Dict[str, Any]]] = []
+        for function_call in function_calls:
             try:
                 arguments = json.loads(function_call.arguments)
             except json.JSONDecodeError:
@@ -142,21 +190,25 @@ class ChatCompletionAgent(RoutedAgent):
                     )
                 )
                 continue
-            # Execute the function.
-            future = self._execute_function(
+            parsed_calls.append((function_call, arguments))
+
+        # Get the approval of all calls at once.
+        approvals = await self._approve([function_call for function_call, _ in parsed_calls], cancellation_token)
+
+        # Execute the tool calls.
+        execution_futures: List[Coroutine[Any, Any, Tuple[str, str]]] = [
+            self._execute_function(
                 function_call.name,
                 arguments,
                 function_call.id,
-                cancellation_token=ctx.cancellation_token,
+                cancellation_token=cancellation_token,
+                approval=approvals.get(function_call.id),
             )
-            # Append the async result.
-            execution_futures.append(future)
-        if execution_futures:
-            # Wait for all async results.
-            execution_results = await asyncio.gather(*execution_futures)
-            # Add the results.
-            for execution_result, call_id in execution_results:
-                results.append(FunctionExecutionResult(content=execution_result, call_id=call_id))
+            for function_call, arguments in parsed_calls
+        ]
+        # Add the results in the order the calls complete.
+        async for execution_result, call_id in iterate_as_completed(execution_futures):
+            results.append(FunctionExecutionResult(content=execution_result, call_id=call_id))
 
         # Create a tool call result message.
         tool_call_result_msg = FunctionExecutionResultMessage(content=results)
@@ -169,41 +221,80 @@ class ChatCompletionAgent(RoutedAgent):
         response_format: ResponseFormat,
         ctx: MessageContext,
     ) -> TextMessage | FunctionCallMessage:
-        # Get a response from the model.
-        response = await self._client.create(
-            self._system_messages + (await self._model_context.get_messages()),
-            tools=self._tools,
-            json_output=response_format == ResponseFormat.json_object,
-        )
-        # Add the response to the chat messages context.
-        await self._model_context.add_message(AssistantMessage(content=response.content, source=self.metadata["type"]))
-
-        # If the agent has function executor, and the response is a list of
-        # tool calls, iterate with itself until we get a response that is not a
-        # list of tool calls.
-        while (
-            len(self._tools) > 0
-            and isinstance(response.content, list)
-            and all(isinstance(x, FunctionCall) for x in response.content)
-        ):
-            # Send a function call message to itself.
-            response = await self.send_message(
-                message=FunctionCallMessage(content=response.content, source=self.metadata["type"]),
-                recipient=self.id,
-                cancellation_token=ctx.cancellation_token,
-            )
-            if not isinstance(response, FunctionExecutionResultMessage):
-                raise RuntimeError(f"Expect FunctionExecutionResultMessage but got {response}.")
-            await self._model_context.add_message(response)
-            # Make an assistant message from the response.
-            response = await self._client.create(
-                self._system_messages + (await self._model_context.get_messages()),
-                tools=self._tools,
-                json_output=response_format == ResponseFormat.json_object,
-            )
-            await self._model_context.add_message(
-                AssistantMessage(content=response.content, source=self.metadata["type"])
-            )
+        json_output = response_format == ResponseFormat.json_object
+        iterations: List[ToolLoopIteration] = []
+        self._tool_loop_iterations = iterations
+        tokens = 0
+        # In the pipelined loop, the tool results are added to the context while the model handles the next request.
+        pending_add: asyncio.Future[None] | None = None
+        messages = self._system_messages + (await self._model_context.get_messages())
+        try:
+            while True:
+                # Get a response from the model.
+                start = time.perf_counter()
+                response = await self._client.create(messages, tools=self._tools.schemas, json_output=json_output)
+                iteration = ToolLoopIteration(
+                    index=len(iterations),
+                    model_seconds=time.perf_counter() - start,
+                    prompt_tokens=response.usage.prompt_tokens,
+                    completion_tokens=response.usage.completion_tokens,
+                )
+                iterations.append(iteration)
+                tokens += response.usage.prompt_tokens + response.usage.completion_tokens
+                if pending_add is not None:
+                    await pending_add
+                    pending_add = None
+                assistant_message = AssistantMessage(content=response.content, source=self.metadata["type"])
+
+                # If the agent has tools, and the response is a list of tool
+                # calls, execute them and ask the model again until we get a
+                # response that is not a list of tool calls or the budget is
+                # used up. The tools are called directly, not through a message
+                # to the agent itself.
+                if (
+                    len(self._tools) == 0
+                    or not isinstance(response.content, list)
+                    or not all(isinstance(x, FunctionCall) for x in response.content)
+                ):
+                    # Add the response to the chat messages context.
+                    await self._model_context.add_message(assistant_message)
+                    break
+                if self._tool_loop_budget.exhausted(iteration.index, tokens):
+                    # The model API expects a result for every tool call, so the calls are added with results that
+                    # say they were not executed, and the context stays valid for the next request.
+                    await self._model_context.add_message(assistant_message)
+                    await self._model_context.add_message(_not_executed(cast(List[FunctionCall], response.content)))
+                    break
+                function_calls = cast(List[FunctionCall], response.content)
+                iteration.tool_calls = len(function_calls)
+                start = time.perf_counter()
+                if self._pipelined_tool_loop:
+                    # Execute the tools while the response is added to the context.
+                    execution = asyncio.ensure_future(
+                        self._execute_function_calls(function_calls, ctx.cancellation_token)
+                    )
+                    try:
+                        await self._model_context.add_message(assistant_message)
+                    except BaseException:
+                        execution.cancel()
+                        raise
+                    messages = [*messages, assistant_message]
+                    iteration.prepare_seconds = time.perf_counter() - start
+                    result_message = await execution
+                    iteration.tools_seconds = time.perf_counter() - start
+                    messages.append(result_message)
+                    pending_add = asyncio.ensure_future(self._model_context.add_message(result_message))
+                else:
+                    await self._model_context.add_message(assistant_message)
+                    result_message = await self._execute_function_calls(function_calls, ctx.cancellation_token)
+                    iteration.tools_seconds = time.perf_counter() - start
+                    start = time.perf_counter()
+                    await self._model_context.add_message(result_message)
+                    messages = self._system_messages + (await self._model_context.get_messages())
+                    iteration.prepare_seconds = time.perf_counter() - start
+        finally:
+            if pending_add is not None:
+                await pending_add
 
         final_response: Message
         if isinstance(response.content, str):
@@ -217,47 +308,80 @@ class ChatCompletionAgent(RoutedAgent):
 
         return final_response
 
+    async def _approve(
+        self,
+        function_calls: List[FunctionCall],
+        cancellation_token: CancellationToken,
+    ) -> Dict[str, ToolApprovalResponse]:
+        # Decide the calls of known tools with the policy first.
+        approvals: Dict[str, ToolApprovalResponse] = {}
+        undecided: List[FunctionCall] = []
+        for function_call in function_calls:
+            if function_call.name not in self._tools:
+                continue
+            approval = self._tool_approval_policy.decide(function_call) if self._tool_approval_policy else None
+            if approval is not None:
+                approvals[function_call.id] = approval
+            elif self._tool_approver is not None:
+                undecided.append(function_call)
+        if not undecided:
+            return approvals
+
+        # Send one approval request for the remaining calls.
+        approval_response = await self.send_message(
+            message=ToolApprovalBatchRequest(tool_calls=undecided),
+            recipient=self._tool_approver,  # type: ignore
+            cancellation_token=cancellation_token,
+        )
+        if not isinstance(approval_response, ToolApprovalBatchResponse):
+            raise ValueError(f"Expecting {ToolApprovalBatchResponse.__name__}, received: {type(approval_response)}")
+        responses = {response.tool_call_id: response for response in approval_response.responses}
+        for function_call in undecided:
+            approval = responses.get(function_call.id)
+            if approval is None:
+                approval = ToolApprovalResponse(
+                    tool_call_id=function_call.id, approved=False, reason="The tool approver did not decide."
+                )
+            elif self._tool_approval_policy is not None:
+                self._tool_approval_policy.remember(function_call, approval)
+            approvals[function_call.id] = approval
+        return approvals
+
     async def _execute_function(
         self,
         name: str,
         args: Dict[str, Any],
         call_id: str,
         cancellation_token: CancellationToken,
+        approval: ToolApprovalResponse | None = None,
     ) -> Tuple[str, str]:
         # Find tool
-        tool = next((t for t in self._tools if t.name == name), None)
+        tool = self._tools.get(name)
         if tool is None:
             return (f"Error: tool {name} not found.", call_id)
 
-        # Check if the tool needs approval
-        if self._tool_approver is not None:
-            # Send a tool approval request.
-            approval_request = ToolApprovalRequest(
-                tool_call=FunctionCall(id=call_id, arguments=json.dumps(args), name=name)
-            )
-            approval_response = await self.send_message(
-                message=approval_request,
-                recipient=self._tool_approver,
-                cancellation_token=cancellation_token,
-            )
-            if not isinstance(approval_response, ToolApprovalResponse):
-                raise ValueError(f"Expecting {ToolApprovalResponse.__name__}, received: {type(approval_response)}")
-            if not approval_response.approved:
-                return (f"Error: tool {name} approved, reason: {approval_response.reason}", call_id)
+        # Check if the tool call was rejected
+        if approval is not None and not approval.approved:
+            return (f"Error: tool {name} not approved, reason: {approval.reason}", call_id)
 
-        try:
-            result = await tool.run_json(args, cancellation_token)
-            result_as_str = tool.return_value_as_string(result)
-        except Exception as e:
-            result_as_str = f"Error: {str(e)}"
-        return (result_as_str, call_id)
+        result = await self._tool_executor.execute(tool, args, call_id, cancellation_token)
+        return (result.content, call_id)
 
     async def save_state(self) -> Mapping[str, Any]:
         return {
-            "memory": self._model_context.save_state(),
+            "memory": await self._model_context.save_state(),
             "system_messages": self._system_messages,
         }
 
     async def load_state(self, state: Mapping[str, Any]) -> None:
-        self._model_context.load_state(state["memory"])
-        self._system_messages = state["system_messages"]
\ No newline at end of file
+        await self._model_context.load_state(state["memory"])
+        self._system_messages = state["system_messages"]
+
+
+def _not_executed(function_calls: List[FunctionCall]) -> FunctionExecutionResultMessage:
+    return FunctionExecutionResultMessage(
+        content=[
+            FunctionExecutionResult(content="Error: not executed, the tool budget is exhausted.", call_id=call.id)
+            for call in function_calls
+        ]
+    )
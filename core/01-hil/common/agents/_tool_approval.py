@@ -0,0 +1,94 @@
+import fnmatch
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Sequence, Tuple
+
+from autogen_core import FunctionCall
+
+from ..types import ToolApprovalResponse
+
+
+@dataclass
+class ApprovalRule:
+    """A rule of a `ToolApprovalPolicy`.
+
+    Args:
+        tool (str): The tools the rule applies to, a shell-style pattern like "schedule_*".
+        arguments (Mapping[str, str], optional): A regular expression per argument that the argument, as a string,
+            must fully match. Defaults to {}, any arguments.
+        approve (bool, optional): Whether matching calls are approved or rejected. Defaults to True.
+        reason (str, optional): The reason given for the decision. Defaults to "".
+    """
+
+    tool: str
+    arguments: Mapping[str, str] = field(default_factory=dict)
+    approve: bool = True
+    reason: str = ""
+
+    def __post_init__(self) -> None:
+        self._patterns = {name: re.compile(pattern) for name, pattern in self.arguments.items()}
+
+    def matches(self, name: str, arguments: Mapping[str, Any]) -> bool:
+        if not fnmatch.fnmatchcase(name, self.tool):
+            return False
+        return all(
+            argument in arguments and pattern.fullmatch(str(arguments[argument])) is not None
+            for argument, pattern in self._patterns.items()
+        )
+
+
+class ToolApprovalPolicy:
+    """Decides tool calls locally, before they are sent to the tool approver.
+
+    The first matching rule decides a call. Decisions, also those of the tool approver, are cached by tool name and
+    a hash of the arguments, so a call that was decided once is not asked again.
+
+    Args:
+        rules (Sequence[ApprovalRule], optional): The rules, in order. Defaults to ().
+        max_cached (int, optional): Decisions kept in the cache. Defaults to 1024.
+    """
+
+    def __init__(self, rules: Sequence[ApprovalRule] = (), max_cached: int = 1024) -> None:
+        self._rules = list(rules)
+        self._max_cached = max_cached
+        self._decisions: OrderedDict[Tuple[str, str], Tuple[bool, str]] = OrderedDict()
+
+    @staticmethod
+    def _key(call: FunctionCall) -> Tuple[str, str]:
+        try:
+            canonical = json.dumps(json.loads(call.arguments), sort_keys=True, separators=(",", ":"))
+        except json.JSONDecodeError:
+            canonical = call.arguments
+        return call.name, hashlib.sha256(canonical.encode()).hexdigest()
+
+    def decide(self, call: FunctionCall) -> ToolApprovalResponse | None:
+        """The decision of `call`, or None if the tool approver has to decide."""
+        key = self._key(call)
+        decision = self._decisions.get(key)
+        if decision is None:
+            try:
+                arguments: Dict[str, Any] = json.loads(call.arguments)
+            except json.JSONDecodeError:
+                return None
+            rule = next((rule for rule in self._rules if rule.matches(call.name, arguments)), None)
+            if rule is None:
+                return None
+            decision = (rule.approve, rule.reason or f"Matched the rule for {rule.tool}.")
+            self._remember(key, decision)
+        else:
+            self._decisions.move_to_end(key)
+        approved, reason = decision
+        return ToolApprovalResponse(tool_call_id=call.id, approved=approved, reason=reason)
+
+    def remember(self, call: FunctionCall, response: ToolApprovalResponse) -> None:
+        """Caches the decision of the tool approver for `call`."""
+        self._remember(self._key(call), (response.approved, response.reason))
+
+    def _remember(self, key: Tuple[str, str], decision: Tuple[bool, str]) -> None:
+        self._decisions[key] = decision
+        self._decisions.move_to_end(key)
+        if len(self._decisions) > self._max_cached:
+            self._decisions.popitem(last=False)
@@ -0,0 +1,185 @@
+import asyncio
+import contextlib
+import functools
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterable, Literal, Mapping, Set, TypeVar
+
+from autogen_core import CancellationToken
+from autogen_core.models import FunctionExecutionResult
+from autogen_core.tools import FunctionTool, Tool
+
+T = TypeVar("T")
+
+
+@dataclass
+class ToolPolicy:
+    """How the `ToolExecutor` runs the calls of a tool.
+
+    Args:
+        max_concurrency (int | None, optional): Calls of the tool running at the same time, across all agents that
+            share the executor. Defaults to None, no limit.
+        timeout_seconds (float | None, optional): The deadline of a call, including the time it waits for a slot.
+            Defaults to None, no deadline.
+        offload (Literal["none", "thread", "process"], optional): Where the tool runs. "none" runs it on the event
+            loop, for async tools. "thread" runs it on the event loop of a thread pool worker, for tools that block.
+            "process" runs the function of a synchronous `FunctionTool` in the process pool, for CPU-bound tools; its
+            function and arguments must be picklable. Defaults to "none".
+    """
+
+    max_concurrency: int | None = None
+    timeout_seconds: float | None = None
+    offload: Literal["none", "thread", "process"] = "none"
+
+
+_worker = threading.local()
+
+
+def _create_worker_loop() -> None:
+    _worker.loop = asyncio.new_event_loop()
+
+
+def _run_in_worker_loop(tool: Tool, args: Mapping[str, Any]) -> Any:
+    # Every worker thread keeps one event loop for all its calls, instead of creating and closing one per call. A
+    # token of the calling loop cannot cancel futures of this one, the call runs until it returns.
+    return _worker.loop.run_until_complete(tool.run_json(args, CancellationToken()))
+
+
+class _LinkedTokens:
+    """The tokens of the running calls of one caller's token, cancelled with it.
+
+    The caller's token gets one callback for all calls made with it, since a callback cannot be removed from a token
+    when its call completes."""
+
+    def __init__(self) -> None:
+        self.tokens: Set[CancellationToken] = set()
+
+    def cancel(self) -> None:
+        for token in list(self.tokens):
+            token.cancel()
+
+
+async def iterate_as_completed(awaitables: Iterable[Awaitable[T]]) -> AsyncIterator[T]:
+    """Yields the results of `awaitables` in the order they complete.
+
+    The awaitables that did not complete yet are cancelled if the iteration stops early."""
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        for next_completed in asyncio.as_completed(tasks):
+            yield await next_completed
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class ToolExecutor:
+    """Runs tool calls concurrently, each tool within the limits of its `ToolPolicy`.
+
+    Calls that fail, time out or are not allowed by their policy return an error result instead of raising, like
+    the model expects. Only the cancellation of the caller's `CancellationToken` is raised. Share one executor
+    between agents to share the concurrency limits of their tools.
+
+    Args:
+        policies (Mapping[str, ToolPolicy], optional): The policy of each tool by name. Defaults to {}.
+        default_policy (ToolPolicy, optional): The policy of the other tools. Defaults to ToolPolicy().
+        max_threads (int | None, optional): Workers of the thread pool. Defaults to None, the default of
+            `ThreadPoolExecutor`.
+        max_processes (int | None, optional): Workers of the process pool. Defaults to None, the number of CPUs.
+    """
+
+    def __init__(
+        self,
+        policies: Mapping[str, ToolPolicy] = {},
+        default_policy: ToolPolicy = ToolPolicy(),
+        max_threads: int | None = None,
+        max_processes: int | None = None,
+    ) -> None:
+        self._policies: Dict[str, ToolPolicy] = dict(policies)
+        self._default_policy = default_policy
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._max_threads = max_threads
+        self._max_processes = max_processes
+        self._threads: ThreadPoolExecutor | None = None
+        self._processes: ProcessPoolExecutor | None = None
+        self._linked: weakref.WeakKeyDictionary[CancellationToken, _LinkedTokens] = weakref.WeakKeyDictionary()
+
+    def policy(self, name: str) -> ToolPolicy:
+        return self._policies.get(name, self._default_policy)
+
+    def set_policy(self, name: str, policy: ToolPolicy) -> None:
+        """Sets the policy of a tool, calls that already run keep the previous one."""
+        self._policies[name] = policy
+        self._semaphores.pop(name, None)
+
+    def _slot(self, name: str, policy: ToolPolicy) -> contextlib.AbstractAsyncContextManager[Any]:
+        if policy.max_concurrency is None:
+            return contextlib.nullcontext()
+        if name not in self._semaphores:
+            self._semaphores[name] = asyncio.Semaphore(policy.max_concurrency)
+        return self._semaphores[name]
+
+    async def _run(self, tool: Tool, args: Mapping[str, Any], policy: ToolPolicy, token: CancellationToken) -> Any:
+        async with self._slot(tool.name, policy):
+            loop = asyncio.get_running_loop()
+            if policy.offload == "thread":
+                if self._threads is None:
+                    self._threads = ThreadPoolExecutor(
+                        self._max_threads, thread_name_prefix="ToolExecutor", initializer=_create_worker_loop
+                    )
+                return await loop.run_in_executor(self._threads, _run_in_worker_loop, tool, args)
+            if policy.offload == "process":
+                func = getattr(tool, "_func", None)
+                if not isinstance(tool, FunctionTool) or func is None or asyncio.iscoroutinefunction(func):
+                    raise ValueError(f"Only synchronous function tools can run in a process, {tool.name} cannot.")
+                if self._processes is None:
+                    self._processes = ProcessPoolExecutor(self._max_processes)
+                arguments = tool.args_type().model_validate(args).model_dump()
+                return await loop.run_in_executor(self._processes, functools.partial(func, **arguments))
+            return await tool.run_json(args, token)
+
+    async def execute(
+        self,
+        tool: Tool,
+        args: Mapping[str, Any],
+        call_id: str,
+        cancellation_token: CancellationToken,
+    ) -> FunctionExecutionResult:
+        """Runs one call of `tool` and returns its result, or the error, as the model expects it."""
+        policy = self.policy(tool.name)
+        # The tool gets its own token, so that its deadline cancels it without cancelling the caller.
+        token = CancellationToken()
+        linked = self._link(cancellation_token)
+        linked.tokens.add(token)
+        if cancellation_token.is_cancelled():
+            token.cancel()
+        task = asyncio.ensure_future(self._run(tool, args, policy, token))
+        token.link_future(task)
+        try:
+            result = await asyncio.wait_for(task, policy.timeout_seconds)
+            content = tool.return_value_as_string(result)
+        except asyncio.TimeoutError:
+            token.cancel()
+            content = f"Error: tool {tool.name} timed out after {policy.timeout_seconds} seconds."
+        except Exception as e:
+            content = f"Error: {str(e)}"
+        finally:
+            linked.tokens.discard(token)
+        return FunctionExecutionResult(content=content, call_id=call_id)
+
+    def _link(self, cancellation_token: CancellationToken) -> _LinkedTokens:
+        linked = self._linked.get(cancellation_token)
+        if linked is None:
+            linked = self._linked[cancellation_token] = _LinkedTokens()
+            cancellation_token.add_callback(linked.cancel)
+        return linked
+
+    def close(self) -> None:
+        """Shuts down the thread and process pools, without waiting for running calls."""
+        if self._threads is not None:
+            self._threads.shutdown(wait=False, cancel_futures=True)
+            self._threads = None
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
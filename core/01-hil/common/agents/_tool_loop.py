@@ -0,0 +1,47 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class ToolLoopBudget:
+    """Limits of the tool loop of a `ChatCompletionAgent`.
+
+    When the budget is used up and the model still answers with tool calls, the agent stops iterating and returns the
+    tool calls as a `FunctionCallMessage`.
+
+    Args:
+        max_iterations (int | None, optional): Rounds of tool calls executed per response. Defaults to None, no limit.
+        max_tokens (int | None, optional): Prompt and completion tokens of all model requests of a response, as
+            reported by the model client. Defaults to None, no limit.
+    """
+
+    max_iterations: int | None = None
+    max_tokens: int | None = None
+
+    def exhausted(self, iterations: int, tokens: int) -> bool:
+        if self.max_iterations is not None and iterations >= self.max_iterations:
+            return True
+        return self.max_tokens is not None and tokens >= self.max_tokens
+
+
+@dataclass
+class ToolLoopIteration:
+    """Timing of one model request of the tool loop and of the tool calls it returned.
+
+    Args:
+        index (int): The iteration, 0 for the first model request of a response.
+        model_seconds (float): Time of the model request.
+        tool_calls (int): Tool calls returned by the model, 0 for the final response.
+        tools_seconds (float): Time from the model response until all tool results were in.
+        prepare_seconds (float): Time to add the messages to the model context and to build the next request. In the
+            pipelined loop, this runs while the tools execute.
+        prompt_tokens (int): Prompt tokens of the model request.
+        completion_tokens (int): Completion tokens of the model request.
+    """
+
+    index: int
+    model_seconds: float
+    tool_calls: int = 0
+    tools_seconds: float = 0.0
+    prepare_seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
@@ -0,0 +1,58 @@
+from typing import Dict, Iterable, Iterator, Sequence
+
+from autogen_core.tools import Tool, ToolSchema
+
+
+class ToolRegistry:
+    """The tools of an agent, indexed by name, with their schemas built once.
+
+    `Tool.schema` derives the JSON schema from the argument model on every access, and model clients read it for
+    every tool on every request. The registry keeps the schemas and passes them to the model client instead. Tools
+    can be added and removed while the agent runs, the next request sees the change.
+
+    Args:
+        tools (Iterable[Tool], optional): The initial tools. Defaults to ().
+    """
+
+    def __init__(self, tools: Iterable[Tool] = ()) -> None:
+        self._tools: Dict[str, Tool] = {}
+        self._schemas: Dict[str, ToolSchema] = {}
+        self._schema_list: Sequence[ToolSchema] | None = None
+        for tool in tools:
+            self.add(tool)
+
+    def add(self, tool: Tool) -> None:
+        """Adds `tool`, or replaces the tool of the same name."""
+        self._tools[tool.name] = tool
+        self._schemas[tool.name] = tool.schema
+        self._schema_list = None
+
+    def remove(self, name: str) -> Tool:
+        """Removes the tool `name` and returns it.
+
+        Raises:
+            KeyError: If there is no tool of that name.
+        """
+        tool = self._tools.pop(name)
+        del self._schemas[name]
+        self._schema_list = None
+        return tool
+
+    def get(self, name: str) -> Tool | None:
+        return self._tools.get(name)
+
+    @property
+    def schemas(self) -> Sequence[ToolSchema]:
+        """The schemas of all tools, to pass as `tools` to `ChatCompletionClient.create`."""
+        if self._schema_list is None:
+            self._schema_list = tuple(self._schemas.values())
+        return self._schema_list
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._tools
+
+    def __iter__(self) -> Iterator[Tool]:
+        return iter(self._tools.values())
+
+    def __len__(self) -> int:
+        return len(self._tools)
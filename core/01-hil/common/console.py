@@ -0,0 +1,85 @@
+import asyncio
+import os
+import sys
+import threading
+from typing import List, TextIO
+
+
+class AsyncStdinReader:
+    """Reads lines from stdin without blocking the event loop.
+
+    If the event loop can watch the file descriptor of stdin, it is read whenever input is available. Otherwise, for
+    example on Windows or for a regular file, one long-lived daemon thread reads the lines. Other tasks, like saving
+    the state of the last turn, keep running while the user thinks about the answer.
+
+    Args:
+        stdin (TextIO, optional): The input to read. Defaults to `sys.stdin`.
+    """
+
+    def __init__(self, stdin: TextIO = sys.stdin) -> None:
+        self._stdin = stdin
+        self._lines: asyncio.Queue[str] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._fd: int | None = None
+        self._buffer = b""
+        self._thread: threading.Thread | None = None
+
+    def _start(self) -> asyncio.Queue[str]:
+        if self._lines is not None:
+            return self._lines
+        self._lines = asyncio.Queue()
+        self._loop = asyncio.get_running_loop()
+        try:
+            fd = self._stdin.fileno()
+            self._loop.add_reader(fd, self._on_readable)
+            self._fd = fd
+        except (AttributeError, OSError, ValueError, NotImplementedError):
+            self._thread = threading.Thread(target=self._read_lines, name="AsyncStdinReader", daemon=True)
+            self._thread.start()
+        return self._lines
+
+    def _on_readable(self) -> None:
+        assert self._fd is not None and self._lines is not None
+        data = os.read(self._fd, 4096)
+        if not data:
+            # End of input: hand out the unterminated last line, then the empty string, like `readline`.
+            self._loop.remove_reader(self._fd)  # type: ignore
+            self._fd = None
+            if self._buffer:
+                self._lines.put_nowait(self._buffer.decode())
+            self._lines.put_nowait("")
+            return
+        lines: List[bytes] = (self._buffer + data).split(b"\n")
+        self._buffer = lines.pop()
+        for line in lines:
+            self._lines.put_nowait(line.decode() + "\n")
+
+    def _read_lines(self) -> None:
+        assert self._loop is not None and self._lines is not None
+        while True:
+            line = self._stdin.readline()
+            self._loop.call_soon_threadsafe(self._lines.put_nowait, line)
+            if not line:
+                return
+
+    async def readline(self, prompt: str = "") -> str:
+        """Prints `prompt` and returns the next line without its line break, like `input`.
+
+        Raises:
+            EOFError: If stdin is closed.
+        """
+        lines = self._start()
+        if prompt:
+            print(prompt, end="", flush=True)
+        line = await lines.get()
+        if not line:
+            # Later calls see the end of input as well.
+            lines.put_nowait("")
+            raise EOFError
+        return line.rstrip("\r\n")
+
+    def close(self) -> None:
+        """Stops watching stdin. A reader thread, if any, ends with the process."""
+        if self._fd is not None and self._loop is not None:
+            self._loop.remove_reader(self._fd)
+            self._fd = None
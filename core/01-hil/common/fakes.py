@@ -0,0 +1,105 @@
+import asyncio
+import re
+from typing import Any, AsyncGenerator, Callable, Mapping, Optional, Sequence, Union
+
+from autogen_core import CancellationToken
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    LLMMessage,
+    ModelCapabilities,  # type: ignore
+    ModelInfo,
+    RequestUsage,
+)
+from autogen_core.tools import Tool, ToolSchema
+
+
+class StubChatCompletionClient(ChatCompletionClient):
+    """A local stand-in for a model client used by the benchmarks of this example.
+
+    Args:
+        responder (Callable[[Sequence[LLMMessage]], str]): Produces the completion text for a request.
+        latency (float, optional): Seconds until the first token of a completion. Defaults to 0.0.
+        token_latency (float, optional): Seconds between two streamed tokens. `create` waits for all tokens of the
+            completion before returning. Defaults to 0.0.
+    """
+
+    def __init__(
+        self,
+        responder: Callable[[Sequence[LLMMessage]], str],
+        latency: float = 0.0,
+        token_latency: float = 0.0,
+    ) -> None:
+        self._responder = responder
+        self._latency = latency
+        self._token_latency = token_latency
+        self._total_usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+        self.num_calls = 0
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        content = self._responder(messages)
+        tokens = _split_tokens(content)
+        if self._latency or self._token_latency:
+            await asyncio.sleep(self._latency + self._token_latency * len(tokens))
+        return self._result(messages, content)
+
+    def _result(self, messages: Sequence[LLMMessage], content: str) -> CreateResult:
+        self.num_calls += 1
+        usage = RequestUsage(prompt_tokens=self.count_tokens(messages), completion_tokens=len(content) // 4)
+        self._total_usage = RequestUsage(
+            prompt_tokens=self._total_usage.prompt_tokens + usage.prompt_tokens,
+            completion_tokens=self._total_usage.completion_tokens + usage.completion_tokens,
+        )
+        return CreateResult(finish_reason="stop", content=content, usage=usage, cached=False)
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        content = self._responder(messages)
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        for i, token in enumerate(_split_tokens(content)):
+            if i and self._token_latency:
+                await asyncio.sleep(self._token_latency)
+            yield token
+        yield self._result(messages, content)
+
+    def actual_usage(self) -> RequestUsage:
+        return self._total_usage
+
+    def total_usage(self) -> RequestUsage:
+        return self._total_usage
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        # Roughly four characters per token, which keeps the stub O(1) per message.
+        return sum(len(str(message.content)) for message in messages) // 4
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return 0
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore
+        return self.model_info  # type: ignore
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return ModelInfo(vision=False, function_calling=False, json_output=False, family="unknown")
+
+
+def _split_tokens(content: str) -> list[str]:
+    # Words with their trailing whitespace, so that the streamed tokens add up to the content.
+    return re.findall(r"\s*\S+\s*", content) if content.strip() else [content]
@@ -1,3 +1,5 @@
 from ._group_chat_manager import GroupChatManager
+from ._speaker_selector import Participant, SelectionTiers, SpeakerDecision, SpeakerSelector
+from ._transition_graph import TransitionGraph
 
-__all__ = ["GroupChatManager"]
\ No newline at end of file
+__all__ = ["GroupChatManager", "Participant", "SelectionTiers", "SpeakerDecision", "SpeakerSelector", "TransitionGraph"]
@@ -1,5 +1,6 @@
 import logging
-from typing import Any, Callable, List, Mapping
+import time
+from typing import Any, Callable, List, Literal, Mapping
 
 from autogen_core import AgentId, AgentProxy, MessageContext, RoutedAgent, message_handler
 from autogen_core.model_context import ChatCompletionContext
@@ -11,7 +12,8 @@ from ..types import (
     Reset,
     TextMessage,
 )
-from ._group_chat_utils import select_speaker
+from ._speaker_selector import SelectionTiers, SpeakerDecision, SpeakerSelector
+from ._transition_graph import TransitionGraph
 
 logger = logging.getLogger("autogen_core.events")
 
@@ -38,6 +40,11 @@ class GroupChatManager(RoutedAgent):
             If no model client is provided, a transition must have a single value.
         on_message_received (Callable[[TextMessage], None], optional): A custom handler to call when a message is received.
             Defaults to None.
+        selection_tiers (SelectionTiers, optional): The tiers that select the next speaker from the last message
+            locally, by an @mention or by the similarity to the participant descriptions, before the model is asked.
+            Defaults to None, the model selects every speaker with more than one candidate.
+        on_speaker_selected (Callable[[SpeakerDecision], None], optional): A custom handler to call with every
+            selection and the tier that made it, to log the selections. Defaults to None.
     """
 
     def __init__(
@@ -49,35 +56,30 @@ class GroupChatManager(RoutedAgent):
         termination_word: str = "TERMINATE",
         transitions: Mapping[AgentId, List[AgentId]] = {},
         on_message_received: Callable[[TextMessage | MultiModalMessage], None] | None = None,
+        selection_tiers: SelectionTiers | None = None,
+        on_speaker_selected: Callable[[SpeakerDecision], None] | None = None,
     ):
         super().__init__(description)
         self._model_context = model_context
         self._client = model_client
         self._participants = participants
         self._participant_proxies = dict((p, AgentProxy(p, self.runtime)) for p in participants)
+        self._speaker_selector = SpeakerSelector(list(self._participant_proxies.values()), selection_tiers)
         self._termination_word = termination_word
-        for key, value in transitions.items():
-            if not value:
-                # Make sure no empty transitions are provided.
-                raise ValueError(f"Empty transition list provided for {key.type}.")
-            if key not in participants:
-                # Make sure all keys are in the list of participants.
-                raise ValueError(f"Transition key {key.type} not found in participants.")
-            for v in value:
-                if v not in participants:
-                    # Make sure all values are in the list of participants.
-                    raise ValueError(f"Transition value {v.type} not found in participants.")
-            if self._client is None:
-                # Make sure there is only one transition for each key if no model client is provided.
-                if len(value) > 1:
-                    raise ValueError(f"Multiple transitions provided for {key.type} but no model client is provided.")
-        self._tranistions = transitions
+        self._transition_graph = TransitionGraph(participants, transitions, single_successor=model_client is None)
         self._on_message_received = on_message_received
+        self._on_speaker_selected = on_speaker_selected
+
+    @property
+    def transition_graph(self) -> TransitionGraph:
+        """The compiled transitions, to validate them or to export them with `TransitionGraph.to_dot`."""
+        return self._transition_graph
 
     @message_handler()
     async def on_reset(self, message: Reset, ctx: MessageContext) -> None:
-        """Handle a reset message. This method clears the memory."""
+        """Handle a reset message. This method clears the memory and the metadata of the participants."""
         await self._model_context.clear()
+        self._speaker_selector.invalidate()
 
     @message_handler()
     async def on_new_message(self, message: TextMessage | MultiModalMessage, ctx: MessageContext) -> None:
@@ -97,21 +99,24 @@ class GroupChatManager(RoutedAgent):
 
         # Get the last speaker.
         last_speaker_name = message.source
-        last_speaker_index = next((i for i, p in enumerate(self._participants) if p.type == last_speaker_name), None)
-
-        # Get the candidates for the next speaker.
+        last_speaker_index = self._transition_graph.index(last_speaker_name)
         if last_speaker_index is not None:
             logger.debug(f"Last speaker: {last_speaker_name}")
-            last_speaker = self._participants[last_speaker_index]
-            if self._tranistions.get(last_speaker) is not None:
-                candidates = [c for c in self._participants if c in self._tranistions[last_speaker]]
-            else:
-                candidates = self._participants
-        else:
-            candidates = self._participants
-        logger.debug(f"Group chat manager next speaker candidates: {[c.type for c in candidates]}")
+
+        # Get the candidates for the next speaker.
+        candidates = self._transition_graph.candidates(last_speaker_name)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Group chat manager next speaker candidates: {[c.type for c in candidates]}")
 
         # Select speaker.
+        start = time.perf_counter()
+        text = (
+            message.content
+            if isinstance(message, TextMessage)
+            else " ".join(c for c in message.content if isinstance(c, str))
+        )
+        decision: SpeakerDecision | None = None
+        local_tier: Literal["transition", "round_robin"] = "transition"
         if len(candidates) == 0:
             speaker = None
         elif len(candidates) == 1:
@@ -120,22 +125,37 @@ class GroupChatManager(RoutedAgent):
             # More than one candidate, select the next speaker.
             if self._client is None:
                 # If no model client is provided, candidates must be the list of participants.
-                assert candidates == self._participants
+                assert not self._transition_graph.has_transitions(last_speaker_name)
                 # If no model client is provided, select the next speaker from the list of participants.
                 if last_speaker_index is not None:
-                    next_speaker_index = (last_speaker_index + 1) % len(self._participants)
-                    speaker = self._participants[next_speaker_index]
+                    speaker = self._transition_graph.next_in_order(last_speaker_name)
                 else:
                     # If no last speaker, select the first speaker.
                     speaker = candidates[0]
+                local_tier = "round_robin"
             else:
-                # If a model client is provided, select the speaker based on the transitions and the model.
-                speaker_index = await select_speaker(
-                    self._model_context, self._client, [self._participant_proxies[c] for c in candidates]
-                )
-                speaker = candidates[speaker_index]
-
-        logger.debug(f"Group chat manager selected speaker: {speaker.type if speaker is not None else None}")
+                # If a model client is provided, select the speaker based on the transitions, the selection tiers
+                # and the model.
+                decision = await self._speaker_selector.decide(self._model_context, self._client, candidates, text)
+                speaker_index = self._transition_graph.index(decision.speaker)
+                assert speaker_index is not None
+                speaker = self._transition_graph.participants[speaker_index]
+
+        if speaker is not None and decision is None and self._on_speaker_selected is not None:
+            decision = SpeakerDecision(
+                tier=local_tier,
+                speaker=speaker.type,
+                candidates=[c.type for c in candidates],
+                message=text,
+                seconds=time.perf_counter() - start,
+            )
+
+        logger.debug(
+            f"Group chat manager selected speaker: {speaker.type if speaker is not None else None}"
+            + (f" by {decision.tier if decision is not None else local_tier}" if speaker is not None else "")
+        )
+        if decision is not None and self._on_speaker_selected is not None:
+            self._on_speaker_selected(decision)
 
         if speaker is not None:
             # Send the message to the selected speaker to ask it to publish a response.
@@ -143,10 +163,11 @@ class GroupChatManager(RoutedAgent):
 
     async def save_state(self) -> Mapping[str, Any]:
         return {
-            "chat_history": self._model_context.save_state(),
+            "chat_history": await self._model_context.save_state(),
             "termination_word": self._termination_word,
         }
 
     async def load_state(self, state: Mapping[str, Any]) -> None:
-        self._model_context.load_state(state["chat_history"])
-        self._termination_word = state["termination_word"]
\ No newline at end of file
+        await self._model_context.load_state(state["chat_history"])
+        self._termination_word = state["termination_word"]
+        self._speaker_selector.invalidate()
\ No newline at end of file
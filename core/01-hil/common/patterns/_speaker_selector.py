@@ -0,0 +1,305 @@
+import asyncio
+import math
+import re
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Literal, Sequence, Tuple
+
+from autogen_core import AgentId, AgentProxy
+from autogen_core.model_context import ChatCompletionContext
+from autogen_core.models import ChatCompletionClient, SystemMessage, UserMessage
+
+
+@dataclass(frozen=True)
+class Participant:
+    """The resolved metadata of a group chat participant."""
+
+    id: AgentId
+    type: str
+    description: str
+
+
+@dataclass
+class SelectionTiers:
+    """The local tiers of a `SpeakerSelector`, tried in order before the model is asked.
+
+    Args:
+        mentions (bool, optional): Select the candidate that the last message @mentions, if it @mentions exactly one
+            candidate. Defaults to True.
+        min_similarity (float | None, optional): Select the candidate whose name and description are the most similar
+            to the last message, by the cosine similarity of hashed bag-of-words vectors, if the similarity is at
+            least this. Defaults to 0.2. None disables the similarity tier.
+        min_margin (float, optional): The similarity of the selected candidate must also exceed the one of the next
+            candidate by this much. Defaults to 0.1.
+        dimensions (int, optional): The hash buckets of the bag-of-words vectors. Defaults to 4096.
+    """
+
+    mentions: bool = True
+    min_similarity: float | None = 0.2
+    min_margin: float = 0.1
+    dimensions: int = 4096
+
+
+@dataclass
+class SpeakerDecision:
+    """A decision of the speaker selection of a group chat, logged to compare the tiers with the model offline.
+
+    Args:
+        tier (str): What decided: the only allowed transition, the round robin without model client, an @mention,
+            the similarity to a participant or the model.
+        speaker (str): The type of the selected speaker.
+        candidates (List[str]): The types of the candidates.
+        message (str): The text of the last message.
+        score (float | None, optional): The similarity of the speaker for the similarity tier. Defaults to None.
+        seconds (float, optional): The time of the selection. Defaults to 0.0.
+    """
+
+    tier: Literal["transition", "round_robin", "mention", "similarity", "model"]
+    speaker: str
+    candidates: List[str]
+    message: str
+    score: float | None = None
+    seconds: float = 0.0
+
+
+_STOP_WORDS = frozenset(
+    "a an and are as at be by can do for from has have i in is it me of on or so that the this to was we what when "
+    "which who will with you your".split()
+)
+
+
+def _embed(text: str, dimensions: int) -> Counter[int]:
+    """The hashed bag of words of `text`."""
+    return Counter(
+        zlib.crc32(token.encode()) % dimensions
+        for token in re.findall(r"[a-z0-9]+", text.lower())
+        if token not in _STOP_WORDS
+    )
+
+
+@dataclass
+class _Resolved:
+    participants: List[Participant]
+    index: Dict[AgentId, int]
+    pattern: re.Pattern[str]
+    at_pattern: re.Pattern[str]
+    mention_index: Dict[str, int]
+    # Words that describe many participants tell little about which one to select.
+    idf: Dict[int, float]
+    # The unit vectors of the names and descriptions of the participants, weighted by idf.
+    vectors: List[Dict[int, float]]
+    # The roles and the list of names in the prompt, by the indices of the candidates.
+    prompts: Dict[Tuple[int, ...], Tuple[str, str]] = field(default_factory=dict)
+
+    @classmethod
+    def create(cls, participants: List[Participant], dimensions: int) -> "_Resolved":
+        # Every name also matches with underscores as spaces and as escaped underscores, like `mentioned_agents`.
+        mention_index: Dict[str, int] = {}
+        for i, participant in enumerate(participants):
+            name = participant.type
+            for variant in (name, name.replace("_", " "), name.replace("_", r"\_")):
+                mention_index.setdefault(variant, i)
+        # Longer names first, so that a name is not matched as a part of a longer one.
+        alternatives = "|".join(re.escape(variant) for variant in sorted(mention_index, key=len, reverse=True))
+        bags = [
+            _embed(f"{participant.type.replace('_', ' ')} {participant.description}", dimensions)
+            for participant in participants
+        ]
+        document_frequency = Counter(bucket for bag in bags for bucket in bag)
+        idf = {
+            bucket: math.log((1 + len(participants)) / (1 + frequency)) + 1
+            for bucket, frequency in document_frequency.items()
+        }
+        return cls(
+            participants=participants,
+            index={participant.id: i for i, participant in enumerate(participants)},
+            pattern=re.compile(r"(?<=\W)(" + alternatives + r")(?=\W)"),
+            at_pattern=re.compile(r"(?<![\w@])@(" + alternatives + r")(?=\W)"),
+            mention_index=mention_index,
+            idf=idf,
+            vectors=[_normalize({bucket: count * idf[bucket] for bucket, count in bag.items()}) for bag in bags],
+        )
+
+    def similarities(self, message: str, indices: Sequence[int], dimensions: int) -> List[Tuple[float, int]]:
+        """The cosine similarities of `message` and the participants of `indices`, the most similar first."""
+        bag = _embed(message, dimensions)
+        vector = _normalize({bucket: count * self.idf[bucket] for bucket, count in bag.items() if bucket in self.idf})
+        scores = [
+            (sum(weight * self.vectors[i].get(bucket, 0.0) for bucket, weight in vector.items()), i) for i in indices
+        ]
+        return sorted(scores, key=lambda score: score[0], reverse=True)
+
+
+def _normalize(vector: Dict[int, float]) -> Dict[int, float]:
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    return {bucket: weight / norm for bucket, weight in vector.items()} if norm else {}
+
+
+class SpeakerSelector:
+    """Selects the next speaker of a group chat with a ChatCompletion client.
+
+    With `tiers`, the selector first tries to select the speaker locally from the last message: by an @mention, then
+    by the similarity of the message to the names and descriptions of the candidates. Only if neither is conclusive,
+    it asks the model.
+
+    The metadata of the participants is resolved once, with concurrent round trips, and kept until `invalidate` is
+    called. The mentions of all participants are found in one pass over the model response with a single precompiled
+    regular expression. Unlike `mentioned_agents`, a name that is part of a longer mentioned name is not counted.
+
+    Args:
+        participants (Sequence[AgentProxy]): The participants of the group chat.
+        tiers (SelectionTiers | None, optional): The local tiers. Defaults to None, the model selects every speaker.
+    """
+
+    def __init__(self, participants: Sequence[AgentProxy], tiers: SelectionTiers | None = None) -> None:
+        self._proxies = list(participants)
+        self._tiers = tiers
+        self._dimensions = tiers.dimensions if tiers is not None else SelectionTiers.dimensions
+        self._lock = asyncio.Lock()
+        self._resolved: _Resolved | None = None
+
+    def invalidate(self) -> None:
+        """Drops the resolved metadata, the next selection resolves it again."""
+        self._resolved = None
+
+    async def _resolve(self) -> _Resolved:
+        resolved = self._resolved
+        if resolved is not None:
+            return resolved
+        async with self._lock:
+            if self._resolved is None:
+                metadata = await asyncio.gather(*(proxy.metadata for proxy in self._proxies))
+                self._resolved = _Resolved.create(
+                    [
+                        Participant(id=proxy.id, type=data["type"], description=data["description"])
+                        for proxy, data in zip(self._proxies, metadata, strict=True)
+                    ],
+                    self._dimensions,
+                )
+            return self._resolved
+
+    async def participants(self) -> Sequence[Participant]:
+        """The resolved participants, in the order given."""
+        return (await self._resolve()).participants
+
+    async def mentions(self, message_content: str) -> Dict[str, int]:
+        """Counts the number of times each participant is mentioned in `message_content`, by type."""
+        return self._mentions(await self._resolve(), message_content)
+
+    @staticmethod
+    def _mentions(resolved: _Resolved, message_content: str) -> Dict[str, int]:
+        mentions: Dict[str, int] = {}
+        # Pad the message to help with matching.
+        for match in resolved.pattern.finditer(f" {message_content} "):
+            name = resolved.participants[resolved.mention_index[match.group(1)]].type
+            mentions[name] = mentions.get(name, 0) + 1
+        return mentions
+
+    async def select(
+        self,
+        context: ChatCompletionContext,
+        client: ChatCompletionClient,
+        candidates: Sequence[AgentId],
+        message: str = "",
+    ) -> AgentId:
+        """Selects the next speaker from `candidates`, which must be participants."""
+        decision = await self.decide(context, client, candidates, message)
+        return next(candidate for candidate in candidates if candidate.type == decision.speaker)
+
+    async def decide(
+        self,
+        context: ChatCompletionContext,
+        client: ChatCompletionClient,
+        candidates: Sequence[AgentId],
+        message: str = "",
+    ) -> SpeakerDecision:
+        """Selects the next speaker from `candidates` after `message`, and tells which tier decided.
+
+        Args:
+            context (ChatCompletionContext): The chat history, for the model.
+            client (ChatCompletionClient): The model client.
+            candidates (Sequence[AgentId]): The candidates, which must be participants.
+            message (str, optional): The text of the last message, for the local tiers. Defaults to "".
+        """
+        start = time.perf_counter()
+        resolved = await self._resolve()
+        participants = resolved.participants
+        indices = tuple(resolved.index[candidate] for candidate in candidates)
+
+        def decision(
+            tier: Literal["mention", "similarity", "model"], index: int, score: float | None = None
+        ) -> SpeakerDecision:
+            return SpeakerDecision(
+                tier=tier,
+                speaker=participants[index].type,
+                candidates=[participants[i].type for i in indices],
+                message=message,
+                score=score,
+                seconds=time.perf_counter() - start,
+            )
+
+        tiers = self._tiers
+        if tiers is not None and message:
+            if tiers.mentions:
+                # Pad the message to help with matching.
+                mentioned = {
+                    resolved.mention_index[match.group(1)] for match in resolved.at_pattern.finditer(f" {message} ")
+                }.intersection(indices)
+                if len(mentioned) == 1:
+                    return decision("mention", mentioned.pop())
+            if tiers.min_similarity is not None:
+                scores = resolved.similarities(message, indices, self._dimensions)
+                best, index = scores[0]
+                runner_up = scores[1][0] if len(scores) > 1 else 0.0
+                if best >= tiers.min_similarity and best - runner_up >= tiers.min_margin:
+                    return decision("similarity", index, best)
+
+        index = await self._select_with_model(resolved, context, client, indices)
+        return decision("model", index)
+
+    async def _select_with_model(
+        self,
+        resolved: _Resolved,
+        context: ChatCompletionContext,
+        client: ChatCompletionClient,
+        indices: Tuple[int, ...],
+    ) -> int:
+        # TODO: Handle multi-modal messages.
+        participants = resolved.participants
+
+        # Construct formated current message history.
+        history_messages: List[str] = []
+        for msg in await context.get_messages():
+            assert isinstance(msg, UserMessage) and isinstance(msg.content, str)
+            history_messages.append(f"{msg.source}: {msg.content}")
+        history = "\n".join(history_messages)
+
+        # Construct agent roles and the agent list, once per set of candidates.
+        prompt_parts = resolved.prompts.get(indices)
+        if prompt_parts is None:
+            roles = "\n".join(f"{participants[i].type}: {participants[i].description}".strip() for i in indices)
+            prompt_parts = resolved.prompts[indices] = (roles, str([participants[i].type for i in indices]))
+        roles, names = prompt_parts
+
+        # Select the next speaker.
+        select_speaker_prompt = f"""You are in a role play game. The following roles are available:
+{roles}.
+Read the following conversation. Then select the next role from {names} to play. Only return the role.
+
+{history}
+
+Read the above conversation. Then select the next role from {names} to play. Only return the role.
+"""
+        response = await client.create(messages=[SystemMessage(content=select_speaker_prompt)])
+        assert isinstance(response.content, str)
+        candidate_indices = {participants[i].type: i for i in indices}
+        mentions = {
+            name: count
+            for name, count in self._mentions(resolved, response.content).items()
+            if name in candidate_indices
+        }
+        if len(mentions) != 1:
+            raise ValueError(f"Expected exactly one agent to be mentioned, but got {mentions}")
+        return candidate_indices[next(iter(mentions))]
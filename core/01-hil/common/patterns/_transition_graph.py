@@ -0,0 +1,122 @@
+from collections import deque
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+from autogen_core import AgentId
+
+
+class TransitionGraph:
+    """The allowed transitions between the speakers of a group chat, compiled once.
+
+    The candidates of every speaker and the next speaker in the order of the participants are precomputed, so that
+    looking them up for a message takes constant time, however many participants the chat has.
+
+    Args:
+        participants (Sequence[AgentId]): The participants, in order.
+        transitions (Mapping[AgentId, List[AgentId]], optional): The agents that can follow each agent. Defaults to
+            {}. If a transition is not provided for an agent, the candidates are all participants.
+        single_successor (bool, optional): Whether every transition must have a single value, as without a model
+            client to choose between several. Defaults to False.
+
+    Raises:
+        ValueError: If a transition is empty, names an agent that is not a participant, or has several values
+            although `single_successor` is set.
+    """
+
+    def __init__(
+        self,
+        participants: Sequence[AgentId],
+        transitions: Mapping[AgentId, List[AgentId]] = {},
+        single_successor: bool = False,
+    ) -> None:
+        self._participants: Tuple[AgentId, ...] = tuple(participants)
+        participant_set = set(self._participants)
+        for key, value in transitions.items():
+            if not value:
+                # Make sure no empty transitions are provided.
+                raise ValueError(f"Empty transition list provided for {key.type}.")
+            if key not in participant_set:
+                # Make sure all keys are in the list of participants.
+                raise ValueError(f"Transition key {key.type} not found in participants.")
+            for v in value:
+                if v not in participant_set:
+                    # Make sure all values are in the list of participants.
+                    raise ValueError(f"Transition value {v.type} not found in participants.")
+            if single_successor and len(value) > 1:
+                # Make sure there is only one transition for each key if no model client is provided.
+                raise ValueError(f"Multiple transitions provided for {key.type} but no model client is provided.")
+        self._transitions = {key: list(value) for key, value in transitions.items()}
+
+        # The first participant of a type is the speaker of that type, as messages name their source by type.
+        self._index: Dict[str, int] = {}
+        for i, participant in enumerate(self._participants):
+            self._index.setdefault(participant.type, i)
+        # The candidates keep the order of the participants.
+        self._candidates: List[Tuple[AgentId, ...]] = []
+        for participant in self._participants:
+            successors = transitions.get(participant)
+            if successors is None:
+                self._candidates.append(self._participants)
+            else:
+                allowed = set(successors)
+                self._candidates.append(tuple(p for p in self._participants if p in allowed))
+        count = len(self._participants)
+        self._next: List[AgentId] = [self._participants[(i + 1) % count] for i in range(count)]
+
+    @property
+    def participants(self) -> Tuple[AgentId, ...]:
+        return self._participants
+
+    def index(self, speaker: str) -> int | None:
+        """The index of the participant of type `speaker`, or None if it is not a participant."""
+        return self._index.get(speaker)
+
+    def candidates(self, speaker: str) -> Tuple[AgentId, ...]:
+        """The candidates to follow the participant of type `speaker`, all participants if it is not a participant."""
+        index = self._index.get(speaker)
+        return self._participants if index is None else self._candidates[index]
+
+    def has_transitions(self, speaker: str) -> bool:
+        """Whether the candidates to follow `speaker` are restricted by a transition."""
+        index = self._index.get(speaker)
+        return index is not None and self._participants[index] in self._transitions
+
+    def next_in_order(self, speaker: str) -> AgentId | None:
+        """The participant after `speaker` in the order of the participants, or None if it is not a participant."""
+        index = self._index.get(speaker)
+        return None if index is None else self._next[index]
+
+    def validate(self) -> List[str]:
+        """Finds participants that can never speak.
+
+        Returns:
+            List[str]: The problems of the graph, empty if every participant can be reached from the first one.
+        """
+        if not self._participants:
+            return []
+        reached = {0}
+        queue = deque([0])
+        while queue:
+            for candidate in self._candidates[queue.popleft()]:
+                index = self._index[candidate.type]
+                if index not in reached:
+                    reached.add(index)
+                    queue.append(index)
+        first = self._participants[0].type
+        return [
+            f"Participant {participant.type} can not be reached from {first}."
+            for i, participant in enumerate(self._participants)
+            if i not in reached
+        ]
+
+    def to_dot(self, name: str = "group_chat") -> str:
+        """The graph in the DOT language of Graphviz. Participants without transitions are drawn with a dashed
+        border, they can be followed by every participant."""
+        lines = [f'digraph "{name}" {{']
+        for participant in self._participants:
+            style = "" if participant in self._transitions else " [style=dashed]"
+            lines.append(f'    "{participant.type}"{style};')
+        for key, value in self._transitions.items():
+            for v in value:
+                lines.append(f'    "{key.type}" -> "{v.type}";')
+        lines.append("}")
+        return "\n".join(lines)
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import sqlite3
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Sequence
+
+# An operation of a state delta: ["set", path, value], ["extend", path, items] or ["delete", path].
+StateOp = List[Any]
+
+
+def diff_state(old: Mapping[str, Any], new: Mapping[str, Any], path: Sequence[str] = ()) -> List[StateOp]:
+    """The operations that turn `old` into `new`.
+
+    Lists that only grew, like the messages of a model context, are extended with their new items, so the size of
+    the delta is proportional to what was added rather than to the whole state."""
+    ops: List[StateOp] = []
+    for key in old:
+        if key not in new:
+            ops.append(["delete", [*path, key]])
+    for key, value in new.items():
+        key_path = [*path, key]
+        if key not in old:
+            ops.append(["set", key_path, value])
+            continue
+        previous = old[key]
+        if previous == value:
+            continue
+        if isinstance(previous, Mapping) and isinstance(value, Mapping):
+            ops.extend(diff_state(previous, value, key_path))  # type: ignore
+        elif (
+            isinstance(previous, list)
+            and isinstance(value, list)
+            and len(value) > len(previous)
+            and value[: len(previous)] == previous
+        ):
+            ops.append(["extend", key_path, value[len(previous) :]])
+        else:
+            ops.append(["set", key_path, value])
+    return ops
+
+
+def apply_state_ops(state: Dict[str, Any], ops: Sequence[StateOp]) -> Dict[str, Any]:
+    """Applies the operations of `diff_state` to `state` in place and returns it."""
+    for op, path, *value in ops:
+        parent = state
+        for key in path[:-1]:
+            parent = parent[key]
+        if op == "set":
+            parent[path[-1]] = value[0]
+        elif op == "extend":
+            parent[path[-1]].extend(value[0])
+        elif op == "delete":
+            del parent[path[-1]]
+        else:
+            raise ValueError(f"Unknown state operation: {op}")
+    return state
+
+
+class SqliteStateStore:
+    """A `StateStore` that keeps the agent state of every session in a SQLite database.
+
+    The first save of an agent writes a snapshot of its state, later saves append the delta to the previous state.
+    Once an agent has `compact_every` deltas, they are folded into a new snapshot. The saves of one call are written
+    in one transaction, so a process that crashes mid-turn resumes from the last complete turn. The database is
+    accessed in a worker thread and does not block the event loop.
+
+    Args:
+        path (str): The SQLite database.
+        compact_every (int, optional): Deltas of an agent before they are compacted into a snapshot. Defaults to 100.
+        max_cached_sessions (int, optional): Sessions whose last saved state is kept in memory to compute deltas.
+            Other sessions are read from the database on their next save. Defaults to 64.
+    """
+
+    def __init__(self, path: str, compact_every: int = 100, max_cached_sessions: int = 64) -> None:
+        self._compact_every = compact_every
+        self._max_cached_sessions = max_cached_sessions
+        # session -> agent -> (state, deltas since the snapshot)
+        self._cache: OrderedDict[str, Dict[str, tuple[Dict[str, Any], int]]] = OrderedDict()
+        self._lock = asyncio.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots (session_id TEXT NOT NULL, agent_id TEXT NOT NULL, "
+            "state TEXT NOT NULL, PRIMARY KEY (session_id, agent_id))"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS deltas (seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "session_id TEXT NOT NULL, agent_id TEXT NOT NULL, ops TEXT NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS deltas_by_agent ON deltas (session_id, agent_id, seq)")
+        self._connection.commit()
+        self.bytes_written = 0
+
+    def _read(self, session_id: str) -> Dict[str, tuple[Dict[str, Any], int]]:
+        states: Dict[str, tuple[Dict[str, Any], int]] = {}
+        for agent_id, state in self._connection.execute(
+            "SELECT agent_id, state FROM snapshots WHERE session_id = ?", (session_id,)
+        ):
+            states[agent_id] = (json.loads(state), 0)
+        for agent_id, ops in self._connection.execute(
+            "SELECT agent_id, ops FROM deltas WHERE session_id = ? ORDER BY seq", (session_id,)
+        ):
+            state, num_deltas = states[agent_id]
+            states[agent_id] = (apply_state_ops(state, json.loads(ops)), num_deltas + 1)
+        return states
+
+    def _cached(self, session_id: str) -> Dict[str, tuple[Dict[str, Any], int]]:
+        states = self._cache.get(session_id)
+        if states is None:
+            states = self._read(session_id)
+            self._cache[session_id] = states
+        self._cache.move_to_end(session_id)
+        while len(self._cache) > self._max_cached_sessions:
+            self._cache.popitem(last=False)
+        return states
+
+    def _write(self, session_id: str, new_states: Mapping[str, Dict[str, Any]]) -> None:
+        states = self._cached(session_id)
+        updated: Dict[str, tuple[Dict[str, Any], int]] = {}
+        with self._connection:
+            for agent_id, new_state in new_states.items():
+                previous = states.get(agent_id)
+                if previous is not None and previous[1] + 1 < self._compact_every:
+                    ops = diff_state(previous[0], new_state)
+                    if not ops:
+                        continue
+                    serialized = json.dumps(ops)
+                    self._connection.execute(
+                        "INSERT INTO deltas (session_id, agent_id, ops) VALUES (?, ?, ?)",
+                        (session_id, agent_id, serialized),
+                    )
+                    updated[agent_id] = (new_state, previous[1] + 1)
+                else:
+                    serialized = json.dumps(new_state)
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO snapshots (session_id, agent_id, state) VALUES (?, ?, ?)",
+                        (session_id, agent_id, serialized),
+                    )
+                    self._connection.execute(
+                        "DELETE FROM deltas WHERE session_id = ? AND agent_id = ?", (session_id, agent_id)
+                    )
+                    updated[agent_id] = (new_state, 0)
+                self.bytes_written += len(serialized)
+        # Only a committed transaction moves the cached state forward.
+        states.update(updated)
+
+    async def load(self, session_id: str) -> Mapping[str, Mapping[str, Any]]:
+        async with self._lock:
+            states = await asyncio.to_thread(self._cached, session_id)
+        return {agent_id: state for agent_id, (state, _) in states.items()}
+
+    async def save(self, session_id: str, states: Mapping[str, Mapping[str, Any]]) -> None:
+        # The states are kept to compute the next delta, agents must not change them after `save_state` returned.
+        async with self._lock:
+            await asyncio.to_thread(self._write, session_id, states)  # type: ignore
+
+    async def close(self) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._connection.close)
@@ -0,0 +1,220 @@
+import asyncio
+import contextlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Generic, Mapping, Protocol, TypeVar
+
+from autogen_core import AgentId, MessageContext, RoutedAgent, SingleThreadedAgentRuntime
+
+T = TypeVar("T")
+
+
+class StatefulAgent(RoutedAgent):
+    """A `RoutedAgent` that records whether it handled a message since its state was last saved.
+
+    The `SessionManager` persists only the agents whose `state_changed` is set."""
+
+    def __init__(self, description: str) -> None:
+        super().__init__(description)
+        self.state_changed = False
+
+    async def on_message_impl(self, message: Any, ctx: MessageContext) -> Any | None:
+        # Messages without a handler of this agent are ignored by `RoutedAgent` and leave the state as it is.
+        if type(message) in self._handlers:
+            self.state_changed = True
+        return await super().on_message_impl(message, ctx)
+
+
+class StateStore(Protocol):
+    """Persists the state of the agents of a session, keyed by the string of their `AgentId`."""
+
+    async def load(self, session_id: str) -> Mapping[str, Mapping[str, Any]]: ...
+
+    async def save(self, session_id: str, states: Mapping[str, Mapping[str, Any]]) -> None:
+        """Saves the state of the given agents, the state of other agents of the session is kept."""
+        ...
+
+
+class InMemoryStateStore:
+    """A `StateStore` that keeps the state in memory, nothing survives a restart."""
+
+    def __init__(self) -> None:
+        self._sessions: Dict[str, Dict[str, Mapping[str, Any]]] = {}
+
+    async def load(self, session_id: str) -> Mapping[str, Mapping[str, Any]]:
+        return dict(self._sessions.get(session_id, {}))
+
+    async def save(self, session_id: str, states: Mapping[str, Mapping[str, Any]]) -> None:
+        self._sessions.setdefault(session_id, {}).update(states)
+
+
+@dataclass
+class Session(Generic[T]):
+    """A runtime with the registered agents of one session.
+
+    `context` holds whatever the application needs per session, for example its intervention handlers."""
+
+    session_id: str
+    runtime: SingleThreadedAgentRuntime
+    context: T
+    turns: int = 0
+    active: bool = False
+    pending_save: asyncio.Task[int] | None = None
+
+
+@dataclass
+class SessionStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    agents_saved: int = 0
+    agents_unchanged: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.hits} warm, {self.misses} cold, {self.evictions} evicted sessions, "
+            f"{self.agents_saved} agent states saved, {self.agents_unchanged} unchanged"
+        )
+
+
+class SessionManager(Generic[T]):
+    """Keeps the runtimes of the most recently used sessions warm, instead of rebuilding them every turn.
+
+    A turn of a session that is not in memory creates its runtime with `create_session` and loads the state of its
+    agents from `store`. After every turn, only the agents whose state changed are saved. Once there are more than
+    `max_sessions` sessions, the least recently used idle session is closed; its state is already in `store`.
+
+    Args:
+        create_session (Callable[[str], Awaitable[Session[T]]]): Creates the runtime of a session and registers its
+            agents, without starting the runtime.
+        store (StateStore): Persists the agent state of the sessions.
+        max_sessions (int, optional): Sessions kept in memory. Defaults to 64.
+        background_saves (bool, optional): Save the changed agents in a background task after the turn, for example
+            while the user reads the answer. The next turn of the session waits for the save. Defaults to False.
+    """
+
+    def __init__(
+        self,
+        create_session: Callable[[str], Awaitable[Session[T]]],
+        store: StateStore,
+        max_sessions: int = 64,
+        background_saves: bool = False,
+    ) -> None:
+        self._create_session = create_session
+        self._store = store
+        self._max_sessions = max_sessions
+        self._background_saves = background_saves
+        self._sessions: OrderedDict[str, Session[T]] = OrderedDict()
+        self._stats = SessionStats()
+
+    @property
+    def stats(self) -> SessionStats:
+        return self._stats
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    async def _get(self, session_id: str) -> Session[T]:
+        session = self._sessions.get(session_id)
+        if session is not None:
+            self._sessions.move_to_end(session_id)
+            try:
+                # The session is marked active only after the save of its previous turn, so that a failed save
+                # leaves it idle: it is closed here, after one more attempt to save it.
+                await self._wait_for_save(session)
+            except BaseException:
+                await self.evict(session_id)
+                raise
+            # Another turn may have evicted the session while it waited, then it is created again.
+            if self._sessions.get(session_id) is session:
+                session.active = True
+                self._stats.hits += 1
+                return session
+        self._stats.misses += 1
+        session = await self._create_session(session_id)
+        states = await self._store.load(session_id)
+        if states:
+            await session.runtime.load_state(states)
+            # The loaded state is the stored state.
+            for agent in self._agents(session):
+                if isinstance(agent, StatefulAgent):
+                    agent.state_changed = False
+        session.active = True
+        self._sessions[session_id] = session
+        await self._evict_least_recently_used()
+        return session
+
+    @contextlib.asynccontextmanager
+    async def turn(self, session_id: str) -> AsyncIterator[Session[T]]:
+        """Provides the warm session of `session_id` for one turn and saves its changed agents afterwards.
+
+        If the turn fails, the session is dropped without saving, and the next turn starts from the stored state."""
+        session = await self._get(session_id)
+        try:
+            yield session
+        except BaseException:
+            session.active = False
+            await self.evict(session_id, save=False)
+            raise
+        session.active = False
+        session.turns += 1
+        if self._background_saves:
+            session.pending_save = asyncio.create_task(self.save(session))
+        else:
+            await self.save(session)
+        await self._evict_least_recently_used()
+
+    async def _wait_for_save(self, session: Session[T]) -> None:
+        if session.pending_save is not None:
+            pending_save, session.pending_save = session.pending_save, None
+            await pending_save
+
+    async def save(self, session: Session[T]) -> int:
+        """Saves the agents of `session` whose state changed and returns their number."""
+        states: Dict[str, Mapping[str, Any]] = {}
+        saved: list[StatefulAgent] = []
+        for agent in self._agents(session):
+            if isinstance(agent, StatefulAgent) and not agent.state_changed:
+                self._stats.agents_unchanged += 1
+                continue
+            states[str(agent.id)] = await agent.save_state()
+            if isinstance(agent, StatefulAgent):
+                saved.append(agent)
+        if states:
+            await self._store.save(session.session_id, states)
+            self._stats.agents_saved += len(states)
+        # Only a stored state is unchanged, an agent whose write failed is saved again next time.
+        for agent in saved:
+            agent.state_changed = False
+        return len(states)
+
+    async def evict(self, session_id: str, save: bool = True) -> None:
+        """Closes the runtime of `session_id`, after saving its changed agents if `save` is set."""
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return
+        try:
+            # A failed background save leaves its agents changed, so the save below tries them again.
+            with contextlib.suppress(Exception):
+                await self._wait_for_save(session)
+            if save:
+                await self.save(session)
+        finally:
+            await session.runtime.close()
+            self._stats.evictions += 1
+
+    async def _evict_least_recently_used(self) -> None:
+        idle = [session_id for session_id, session in self._sessions.items() if not session.active]
+        for session_id in idle[: max(0, len(self._sessions) - self._max_sessions)]:
+            await self.evict(session_id)
+
+    async def close(self) -> None:
+        """Saves and closes all sessions."""
+        for session_id in list(self._sessions):
+            await self.evict(session_id)
+
+    @staticmethod
+    def _agents(session: Session[T]) -> list[Any]:
+        # The runtime only exposes the state of all agents at once, so the instantiated agents are read directly.
+        instantiated: Dict[AgentId, Any] = session.runtime._instantiated_agents  # type: ignore
+        return list(instantiated.values())
@@ -32,7 +32,7 @@ class FunctionCallMessage(BaseMessage):
 Message = Union[TextMessage, MultiModalMessage, FunctionCallMessage, FunctionExecutionResultMessage]
 
 
-class ResponseFormat(Enum):
+class ResponseFormat(str, Enum):
     text = "text"
     json_object = "json_object"
 
@@ -72,4 +72,21 @@ class ToolApprovalResponse:
 
     tool_call_id: str
     approved: bool
-    reason: str
\ No newline at end of file
+    reason: str
+
+
+@dataclass
+class ToolApprovalBatchRequest:
+    """A message to request approval for all tool calls of one model response
+    at once. The sender expects a `ToolApprovalBatchResponse` upon sending and
+    waits for it synchronously."""
+
+    tool_calls: List[FunctionCall]
+
+
+@dataclass
+class ToolApprovalBatchResponse:
+    """A message to respond to a tool approval batch request, with one response
+    per tool call. The response is sent synchronously."""
+
+    responses: List[ToolApprovalResponse]
@@ -1,5 +1,5 @@
 import os
-from typing import Any, List, Optional, Union
+from typing import Any, Dict, List, Mapping, Optional, Union
 
 from autogen_core.models import (
     AssistantMessage,
@@ -10,9 +10,10 @@ from autogen_core.models import (
     UserMessage,
 )
 from autogen_ext.models.openai import AzureOpenAIChatCompletionClient, OpenAIChatCompletionClient
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
 from typing_extensions import Literal
 
+from .cache import CachedChatCompletionClient
+from .clients import model_clients
 from .types import (
     FunctionCallMessage,
     Message,
@@ -102,7 +103,7 @@ def convert_messages_to_llm_messages(
     return result
 
 
-def get_chat_completion_client_from_envs(**kwargs: Any) -> ChatCompletionClient:
+def _chat_completion_client_config_from_envs(**kwargs: Any) -> Dict[str, Any]:
     # Check API type.
     api_type = os.getenv("OPENAI_API_TYPE", "openai")
     if api_type == "openai":
@@ -111,18 +112,12 @@ def get_chat_completion_client_from_envs(**kwargs: Any) -> ChatCompletionClient:
         if api_key is None:
             raise ValueError("OPENAI_API_KEY is not set")
         kwargs["api_key"] = api_key
-        return OpenAIChatCompletionClient(**kwargs)
+        return kwargs
     elif api_type == "azure":
-        # Check Azure API key.
+        # Check Azure API key, without one the registry adds its shared token provider from the Azure CLI.
         azure_api_key = os.getenv("AZURE_OPENAI_API_KEY")
         if azure_api_key is not None:
             kwargs["api_key"] = azure_api_key
-        else:
-            # Try to use token from Azure CLI.
-            token_provider = get_bearer_token_provider(
-                DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default"
-            )
-            kwargs["azure_ad_token_provider"] = token_provider
         # Check Azure API endpoint.
         azure_api_endpoint = os.getenv("AZURE_OPENAI_API_ENDPOINT")
         if azure_api_endpoint is None:
@@ -137,5 +132,37 @@ def get_chat_completion_client_from_envs(**kwargs: Any) -> ChatCompletionClient:
                 "function_calling": True,
                 "json_output": True,
             }
-        return AzureOpenAIChatCompletionClient(**kwargs)  # type: ignore
-    raise ValueError(f"Unknown API type: {api_type}")
\ No newline at end of file
+        return kwargs
+    raise ValueError(f"Unknown API type: {api_type}")
+
+
+def _create_chat_completion_client(config: Mapping[str, Any]) -> ChatCompletionClient:
+    client: ChatCompletionClient
+    if "azure_endpoint" in config:
+        client = AzureOpenAIChatCompletionClient(**config)  # type: ignore
+    else:
+        client = OpenAIChatCompletionClient(**config)
+    # Check response cache, one of: off, memory, sqlite.
+    cache_type = os.getenv("CHAT_COMPLETION_CACHE", "off")
+    if cache_type == "off":
+        return client
+    if cache_type not in ("memory", "sqlite"):
+        raise ValueError(f"Unknown response cache type: {cache_type}")
+    # The sqlite cache also keeps the completions across restarts.
+    path = os.getenv("CHAT_COMPLETION_CACHE_PATH", "chat_completion_cache.sqlite") if cache_type == "sqlite" else None
+    ttl_seconds = os.getenv("CHAT_COMPLETION_CACHE_TTL_SECONDS")
+    return CachedChatCompletionClient(
+        client,
+        max_entries=int(os.getenv("CHAT_COMPLETION_CACHE_MAX_ENTRIES", "1024")),
+        path=path,
+        ttl_seconds=float(ttl_seconds) if ttl_seconds else None,
+        namespace=config.get("model", ""),
+    )
+
+
+def get_chat_completion_client_from_envs(**kwargs: Any) -> ChatCompletionClient:
+    """Returns the pooled model client of the configuration in the environment and `kwargs`.
+
+    Calls with the same configuration share one client, its connection pool and, if enabled, its response cache.
+    Close the clients with `await model_clients.aclose()` on shutdown."""
+    return model_clients.get(_chat_completion_client_config_from_envs(**kwargs), _create_chat_completion_client)
@@ -0,0 +1 @@
+# Lets the tests import the `common` package of this example, like the scripts next to it do.
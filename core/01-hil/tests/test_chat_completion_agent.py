@@ -0,0 +1,78 @@
+import asyncio
+from typing import Any, List, Mapping, Optional, Sequence
+
+from autogen_core import AgentId, CancellationToken, FunctionCall, SingleThreadedAgentRuntime
+from autogen_core.model_context import UnboundedChatCompletionContext
+from autogen_core.models import AssistantMessage, CreateResult, FunctionExecutionResultMessage, LLMMessage
+from autogen_core.tools import FunctionTool, Tool, ToolSchema
+from common.agents import ChatCompletionAgent, ToolLoopBudget
+from common.fakes import StubChatCompletionClient
+from common.types import FunctionCallMessage, RespondNow, TextMessage
+
+
+class ToolCallingClient(StubChatCompletionClient):
+    """Answers every request with a tool call and, like the OpenAI API, rejects requests with unanswered tool calls."""
+
+    def __init__(self) -> None:
+        super().__init__(lambda _: "")
+        self.requests: List[Sequence[LLMMessage]] = []
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        for i, message in enumerate(messages):
+            if isinstance(message, AssistantMessage) and isinstance(message.content, list):
+                following = messages[i + 1] if i + 1 < len(messages) else None
+                answered = set()
+                if isinstance(following, FunctionExecutionResultMessage):
+                    answered = {result.call_id for result in following.content}
+                if answered != {call.id for call in message.content}:
+                    raise ValueError("An assistant message with tool calls must be followed by their tool results.")
+        self.requests.append(messages)
+        result = self._result(messages, "")
+        result.content = [FunctionCall(id=f"call-{len(self.requests)}", name="lookup", arguments='{"key": "a"}')]
+        return result
+
+
+async def lookup(key: str) -> str:
+    return f"Value of {key}."
+
+
+def test_context_is_valid_after_the_tool_budget_is_exhausted() -> None:
+    async def main() -> None:
+        runtime = SingleThreadedAgentRuntime()
+        client = ToolCallingClient()
+        context = UnboundedChatCompletionContext()
+        await ChatCompletionAgent.register(
+            runtime,
+            "assistant",
+            lambda: ChatCompletionAgent(
+                description="Looks up values.",
+                system_messages=[],
+                model_context=context,
+                model_client=client,
+                tools=[FunctionTool(lookup, description="Looks up a value.")],
+                tool_loop_budget=ToolLoopBudget(max_iterations=1),
+            ),
+        )
+        runtime.start()
+        recipient = AgentId("assistant", "default")
+        for turn in range(2):
+            await runtime.send_message(TextMessage(content=f"Look up a, turn {turn}.", source="user"), recipient)
+            result = await runtime.send_message(RespondNow(), recipient)
+            assert isinstance(result, FunctionCallMessage)
+        await runtime.stop()
+
+        # The second turn asked the model again on top of the calls the budget cut off in the first turn.
+        assert len(client.requests) == 4
+        messages = await context.get_messages()
+        assert isinstance(messages[-1], FunctionExecutionResultMessage)
+        assert "not executed" in messages[-1].content[0].content
+
+    asyncio.run(main())
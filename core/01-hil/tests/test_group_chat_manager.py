@@ -0,0 +1,36 @@
+import asyncio
+import json
+
+from autogen_core import AgentId, SingleThreadedAgentRuntime
+from autogen_core.model_context import UnboundedChatCompletionContext
+from autogen_core.models import UserMessage
+from common.patterns import GroupChatManager
+
+
+def test_save_and_load_state_round_trip() -> None:
+    async def main() -> None:
+        runtime = SingleThreadedAgentRuntime()
+        participants = [AgentId("writer", "default"), AgentId("editor", "default")]
+        saved_context = UnboundedChatCompletionContext()
+        loaded_context = UnboundedChatCompletionContext()
+        await saved_context.add_message(UserMessage(content="Write a poem.", source="user"))
+        await GroupChatManager.register(
+            runtime,
+            "saved_manager",
+            lambda: GroupChatManager("Saved.", participants, saved_context, termination_word="DONE"),
+        )
+        await GroupChatManager.register(
+            runtime,
+            "loaded_manager",
+            lambda: GroupChatManager("Loaded.", participants, loaded_context),
+        )
+
+        state = await runtime.agent_save_state(AgentId("saved_manager", "default"))
+        # The state is stored as json, so it must not hold coroutines or other objects.
+        await runtime.agent_load_state(AgentId("loaded_manager", "default"), json.loads(json.dumps(state)))
+
+        assert await loaded_context.get_messages() == await saved_context.get_messages()
+        loaded = await runtime.agent_save_state(AgentId("loaded_manager", "default"))
+        assert loaded["termination_word"] == "DONE"
+
+    asyncio.run(main())
@@ -0,0 +1,77 @@
+import asyncio
+import functools
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Any, Mapping
+
+import pytest
+from app import TurnHandlers, create_session, run_turn
+from common.fakes import StubChatCompletionClient
+from common.persistence import SqliteStateStore
+from common.sessions import InMemoryStateStore, SessionManager, StateStore
+
+SESSION_ID = "session-0"
+CRASH_EXIT_CODE = 17
+
+
+def user_input(turn: int) -> str | None:
+    return None if turn == 0 else f"Meet Alice, message {turn}."
+
+
+def model_client(crash: bool = False) -> StubChatCompletionClient:
+    def respond(_: Any) -> str:
+        if crash:
+            # Kill the process in the middle of the turn, after the agents handled the user message.
+            os._exit(CRASH_EXIT_CODE)
+        return "Which date and time should the meeting have?"
+
+    return StubChatCompletionClient(respond)
+
+
+async def run_turns(store: StateStore, first_turn: int, turns: int, crash: bool = False) -> None:
+    """Runs `turns` turns of a new session manager, starting at `first_turn`."""
+    manager: SessionManager[TurnHandlers] = SessionManager(
+        functools.partial(create_session, model_client=model_client(crash)), store
+    )
+    for turn in range(first_turn, first_turn + turns):
+        async with manager.turn(SESSION_ID) as session:
+            await run_turn(session, user_input(turn))
+    await manager.close()
+
+
+async def reference_state(turns: int) -> Mapping[str, Mapping[str, Any]]:
+    store = InMemoryStateStore()
+    await run_turns(store, 0, turns)
+    return await store.load(SESSION_ID)
+
+
+async def crash_child(path: str, turns: int) -> None:
+    """Runs `turns` complete turns and crashes in the next one."""
+    store = SqliteStateStore(path, compact_every=4)
+    await run_turns(store, 0, turns)
+    await run_turns(store, turns, 1, crash=True)
+
+
+@pytest.mark.parametrize("turns", [1, 3, 6])
+def test_crash_mid_turn_and_resume(turns: int) -> None:
+    async def main(path: str) -> None:
+        store = SqliteStateStore(path, compact_every=4)
+        assert await store.load(SESSION_ID) == await reference_state(turns), "The crashed turn is in the state."
+        await run_turns(store, turns, 1)
+        assert await store.load(SESSION_ID) == await reference_state(turns + 1), "The resumed turn was not stored."
+        await store.close()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")]))}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "state.sqlite")
+        child = subprocess.run([sys.executable, __file__, path, str(turns)], cwd=root, env=env)
+        assert child.returncode == CRASH_EXIT_CODE, f"The child did not crash mid-turn: exit code {child.returncode}"
+        asyncio.run(main(path))
+
+
+if __name__ == "__main__":
+    # The child process of `test_crash_mid_turn_and_resume`.
+    asyncio.run(crash_child(sys.argv[1], int(sys.argv[2])))
@@ -0,0 +1,77 @@
+import asyncio
+import functools
+from typing import Any, Mapping
+
+import pytest
+from app import TurnHandlers, create_session, run_turn
+from common.fakes import StubChatCompletionClient
+from common.sessions import InMemoryStateStore, SessionManager
+
+SESSION_ID = "session-0"
+
+
+class FlakyStateStore(InMemoryStateStore):
+    """Fails the first `failures` saves."""
+
+    def __init__(self, failures: int) -> None:
+        super().__init__()
+        self.failures = failures
+
+    async def save(self, session_id: str, states: Mapping[str, Mapping[str, Any]]) -> None:
+        if self.failures > 0:
+            self.failures -= 1
+            raise OSError("The store is not available.")
+        await super().save(session_id, states)
+
+
+def create_manager(store: InMemoryStateStore, background_saves: bool) -> SessionManager[TurnHandlers]:
+    model_client = StubChatCompletionClient(lambda _: "Which date and time should the meeting have?")
+    return SessionManager(
+        functools.partial(create_session, model_client=model_client), store, background_saves=background_saves
+    )
+
+
+async def reference_state(turns: int) -> Mapping[str, Mapping[str, Any]]:
+    store = InMemoryStateStore()
+    manager = create_manager(store, background_saves=False)
+    for turn in range(turns):
+        async with manager.turn(SESSION_ID) as session:
+            await run_turn(session, None if turn == 0 else f"Meet Alice, message {turn}.")
+    await manager.close()
+    return await store.load(SESSION_ID)
+
+
+def test_failed_background_save_closes_the_session_after_saving_it_again() -> None:
+    async def main() -> None:
+        store = FlakyStateStore(failures=1)
+        manager = create_manager(store, background_saves=True)
+        async with manager.turn(SESSION_ID) as session:
+            await run_turn(session)
+
+        # The next turn waits for the failed save of the first one.
+        with pytest.raises(OSError):
+            async with manager.turn(SESSION_ID):
+                pass
+        assert SESSION_ID not in manager
+        assert await store.load(SESSION_ID) == await reference_state(1)
+
+        # The session is created again from the stored state.
+        async with manager.turn(SESSION_ID) as session:
+            await run_turn(session, "Meet Alice, message 1.")
+        await manager.close()
+        assert await store.load(SESSION_ID) == await reference_state(2)
+
+    asyncio.run(main())
+
+
+def test_failed_save_is_retried_by_the_next_save() -> None:
+    async def main() -> None:
+        store = FlakyStateStore(failures=1)
+        manager = create_manager(store, background_saves=False)
+        with pytest.raises(OSError):
+            async with manager.turn(SESSION_ID) as session:
+                await run_turn(session)
+        await manager.close()
+        assert await store.load(SESSION_ID) == await reference_state(1)
+
+    asyncio.run(main())
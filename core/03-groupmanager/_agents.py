@@ -1,14 +1,18 @@
 import asyncio
 import random
-from typing import Awaitable, Callable, List
+from typing import Awaitable, Callable, Dict, List
 from uuid import uuid4
 
-from _types import GroupChatMessage, MessageChunk, RequestToSpeak, UIAgentConfig
-from autogen_core import DefaultTopicId, MessageContext, RoutedAgent, message_handler
+from _conversations import ConversationAgent
+from _dispatch import ReplicaDispatcher
+from _selector import SelectorPromptBuilder
+from _types import GroupChatMessage, MessageChunk, MessageChunkBatch, RequestToSpeak, UIAgentConfig
+from autogen_core import MessageContext, RoutedAgent, TopicId, message_handler
+from autogen_core.model_context import ChatCompletionContext, UnboundedChatCompletionContext
 from autogen_core.models import (
     AssistantMessage,
     ChatCompletionClient,
-    LLMMessage,
+    CreateResult,
     SystemMessage,
     UserMessage,
 )
@@ -17,8 +21,10 @@ from rich.console import Console
 from rich.markdown import Markdown
 
 
-class BaseGroupChatAgent(RoutedAgent):
-    """A group chat participant using an LLM."""
+class BaseGroupChatAgent(ConversationAgent):
+    """A group chat participant using an LLM.
+
+    An instance is created per conversation, the key of its agent id is the conversation id."""
 
     def __init__(
         self,
@@ -27,105 +33,108 @@ class BaseGroupChatAgent(RoutedAgent):
         model_client: ChatCompletionClient,
         system_message: str,
         ui_config: UIAgentConfig,
+        model_context: ChatCompletionContext | None = None,
+        name: str | None = None,
     ) -> None:
         super().__init__(description=description)
+        # Replicas of a participant are registered under their own agent types but speak under the same name.
+        self._name = name or self.id.type
         self._group_chat_topic_type = group_chat_topic_type
         self._model_client = model_client
         self._system_message = SystemMessage(content=system_message)
-        self._chat_history: List[LLMMessage] = []
+        self._model_context = model_context or UnboundedChatCompletionContext()
         self._ui_config = ui_config
         self.console = Console()
 
     @message_handler
     async def handle_message(self, message: GroupChatMessage, ctx: MessageContext) -> None:
-        self._chat_history.extend(
-            [
-                UserMessage(content=f"Transferred to {message.body.source}", source="system"),  # type: ignore[union-attr]
-                message.body,
-            ]
+        await self._model_context.add_message(
+            UserMessage(content=f"Transferred to {message.body.source}", source="system")  # type: ignore[union-attr]
         )
+        await self._model_context.add_message(message.body)
 
     @message_handler
     async def handle_request_to_speak(self, message: RequestToSpeak, ctx: MessageContext) -> None:
-        self._chat_history.append(
-            UserMessage(content=f"Transferred to {self.id.type}, adopt the persona immediately.", source="system")
+        await self._model_context.add_message(
+            UserMessage(content=f"Transferred to {self._name}, adopt the persona immediately.", source="system")
+        )
+        # Forward tokens to the UI as they arrive and keep the final result for the backend.
+        ui_stream = UIMessageStream(
+            runtime=self, source=self._name, ui_config=self._ui_config, conversation_id=self.conversation_id
         )
-        completion = await self._model_client.create([self._system_message] + self._chat_history)
-        assert isinstance(completion.content, str)
-        self._chat_history.append(AssistantMessage(content=completion.content, source=self.id.type))
+        completion: CreateResult | None = None
+        try:
+            async for item in self._model_client.create_stream(
+                [self._system_message] + await self._model_context.get_messages(),
+                cancellation_token=ctx.cancellation_token,
+            ):
+                if isinstance(item, str):
+                    await ui_stream.write(item)
+                else:
+                    completion = item
+        finally:
+            # Also on errors, so the UI message is finished and no deadline flush outlives the request.
+            await ui_stream.close()
+        assert completion is not None and isinstance(completion.content, str)
+        await self._model_context.add_message(AssistantMessage(content=completion.content, source=self._name))
 
-        console_message = f"\n{'-'*80}\n**{self.id.type}**: {completion.content}"
+        console_message = f"\n{'-'*80}\n**{self._name}**: {completion.content}"
         self.console.print(Markdown(console_message))
 
-        await publish_message_to_ui_and_backend(
-            runtime=self,
-            source=self.id.type,
-            user_message=completion.content,
-            ui_config=self._ui_config,
-            group_chat_topic_type=self._group_chat_topic_type,
+        # Publish message to backend
+        await self.publish_message(
+            GroupChatMessage(
+                body=UserMessage(content=completion.content, source=self._name), conversation_id=self.conversation_id
+            ),
+            topic_id=TopicId(type=self._group_chat_topic_type, source=self.conversation_id),
         )
 
 
-class GroupChatManager(RoutedAgent):
+class GroupChatManager(ConversationAgent):
+    """Selects the next speaker of a conversation.
+
+    An instance is created per conversation. Every message of the conversation is forwarded to the replicas that
+    `dispatcher` assigned to the other participants, and the request to speak goes to the selected participant's
+    replica, so each conversation stays with the same replicas."""
+
     def __init__(
         self,
         model_client: ChatCompletionClient,
         participant_topic_types: List[str],
         participant_descriptions: List[str],
         ui_config: UIAgentConfig,
+        dispatcher: ReplicaDispatcher,
         max_rounds: int = 3,
     ) -> None:
         super().__init__("Group chat manager")
         self._model_client = model_client
         self._num_rounds = 0
         self._participant_topic_types = participant_topic_types
-        self._chat_history: List[GroupChatMessage] = []
         self._max_rounds = max_rounds
         self.console = Console()
         self._participant_descriptions = participant_descriptions
+        self._transcript = SelectorPromptBuilder(participant_topic_types, participant_descriptions, max_rounds)
         self._previous_participant_topic_type: str | None = None
         self._ui_config = ui_config
+        self._dispatcher = dispatcher
+
+    async def close(self) -> None:
+        # An evicted conversation that did not finish no longer counts towards the load of its replicas.
+        self._dispatcher.release(self.conversation_id)
 
     @message_handler
     async def handle_message(self, message: GroupChatMessage, ctx: MessageContext) -> None:
         assert isinstance(message.body, UserMessage)
 
-        self._chat_history.append(message.body)  # type: ignore[reportargumenttype,arg-type]
-
-        # Format message history.
-        messages: List[str] = []
-        for msg in self._chat_history:
-            if isinstance(msg.content, str):  # type: ignore[attr-defined]
-                messages.append(f"{msg.source}: {msg.content}")  # type: ignore[attr-defined]
-            elif isinstance(msg.content, list):  # type: ignore[attr-defined]
-                messages.append(f"{msg.source}: {', '.join(msg.content)}")  # type: ignore[attr-defined,reportUnknownArgumentType]
-        history = "\n".join(messages)
-        # Format roles.
-        roles = "\n".join(
-            [
-                f"{topic_type}: {description}".strip()
-                for topic_type, description in zip(
-                    self._participant_topic_types, self._participant_descriptions, strict=True
+        self._transcript.append(message.body)
+        conversation_id = self.conversation_id
+        for topic_type in self._participant_topic_types:
+            if topic_type != message.body.source:
+                await self.publish_message(
+                    message, TopicId(type=self._dispatcher.route(conversation_id, topic_type), source=conversation_id)
                 )
-                if topic_type != self._previous_participant_topic_type
-            ]
-        )
-        participants = str(
-            [
-                topic_type
-                for topic_type in self._participant_topic_types
-                if topic_type != self._previous_participant_topic_type
-            ]
-        )
 
-        selector_prompt = f"""You are in a role play game. The following roles are available:
-{roles}.
-Read the following conversation. Then select the next role from {participants} to play. Only return the role.
-
-{history}
-
-Read the above conversation. Then select the next role from {participants} to play. if you think it's enough talking (for example they have talked for {self._max_rounds} rounds), return 'FINISH'.
-"""
+        selector_prompt = self._transcript.build(self._previous_participant_topic_type)
         system_message = SystemMessage(content=selector_prompt)
         completion = await self._model_client.create([system_message], cancellation_token=ctx.cancellation_token)
 
@@ -137,9 +146,14 @@ Read the above conversation. Then select the next role from {participants} to pl
             finish_msg = "I think it's enough iterations on the story! Thanks for collaborating!"
             manager_message = f"\n{'-'*80}\n Manager ({id(self)}): {finish_msg}"
             await publish_message_to_ui(
-                runtime=self, source=self.id.type, user_message=finish_msg, ui_config=self._ui_config
+                runtime=self,
+                source=self.id.type,
+                user_message=finish_msg,
+                ui_config=self._ui_config,
+                conversation_id=conversation_id,
             )
             self.console.print(Markdown(manager_message))
+            self._dispatcher.release(conversation_id)
             return
 
         selected_topic_type: str
@@ -150,45 +164,135 @@ Read the above conversation. Then select the next role from {participants} to pl
                 self.console.print(
                     Markdown(f"\n{'-'*80}\n Manager ({id(self)}): Asking `{selected_topic_type}` to speak")
                 )
-                await self.publish_message(RequestToSpeak(), DefaultTopicId(type=selected_topic_type))
+                await self.publish_message(
+                    RequestToSpeak(conversation_id=conversation_id),
+                    TopicId(type=self._dispatcher.route(conversation_id, selected_topic_type), source=conversation_id),
+                )
                 return
         raise ValueError(f"Invalid role selected: {completion.content}")
 
 
-class UIAgent(RoutedAgent):
-    """Handles UI-related tasks and message processing for the distributed group chat system."""
+class UIAgent(ConversationAgent):
+    """Handles UI-related tasks and message processing for the distributed group chat system.
+
+    Batches of a streamed message can arrive out of order, they are handed to `on_message_chunk_func`
+    ordered by their sequence numbers."""
 
-    def __init__(self, on_message_chunk_func: Callable[[MessageChunk], Awaitable[None]]) -> None:
+    def __init__(self, on_message_chunk_func: Callable[[MessageChunk | MessageChunkBatch], Awaitable[None]]) -> None:
         super().__init__("UI Agent")
         self._on_message_chunk_func = on_message_chunk_func
+        self._next_sequences: Dict[str, int] = {}
+        self._pending_batches: Dict[str, Dict[int, MessageChunkBatch]] = {}
+        self._delivery_lock = asyncio.Lock()
 
     @message_handler
     async def handle_message_chunk(self, message: MessageChunk, ctx: MessageContext) -> None:
         await self._on_message_chunk_func(message)
 
+    @message_handler
+    async def handle_message_chunk_batch(self, message: MessageChunkBatch, ctx: MessageContext) -> None:
+        pending = self._pending_batches.setdefault(message.message_id, {})
+        pending[message.sequence] = message
+        async with self._delivery_lock:
+            next_sequence = self._next_sequences.get(message.message_id, 0)
+            while next_sequence in pending:
+                batch = pending.pop(next_sequence)
+                next_sequence = batch.next_sequence
+                await self._on_message_chunk_func(batch)
+                if batch.finished:
+                    del self._pending_batches[message.message_id]
+                    self._next_sequences.pop(message.message_id, None)
+                    return
+            self._next_sequences[message.message_id] = next_sequence
+
+
+class UIMessageStream:
+    """Publishes streamed text to the UI topic as `MessageChunkBatch`es of one message.
+
+    Fragments are batched until `ui_config.stream_flush_bytes` are buffered or the oldest buffered fragment is
+    `ui_config.stream_flush_interval_seconds` old, so the host is not flooded with one message per token.
+    The first fragment of a message is published immediately.
+    """
+
+    def __init__(
+        self,
+        runtime: RoutedAgent | GrpcWorkerAgentRuntime,
+        source: str,
+        ui_config: UIAgentConfig,
+        conversation_id: str = "default",
+    ) -> None:
+        self._runtime = runtime
+        self._source = source
+        self._conversation_id = conversation_id
+        self._topic_id = TopicId(type=ui_config.topic_type, source=conversation_id)
+        self._flush_bytes = ui_config.stream_flush_bytes
+        self._flush_interval = ui_config.stream_flush_interval_seconds
+        self._message_id = str(uuid4())
+        self._sequence = 0
+        self._buffer: List[str] = []
+        self._buffered_bytes = 0
+        self._deadline: asyncio.Task[None] | None = None
+
+    async def write(self, text: str) -> None:
+        self._buffer.append(text)
+        self._buffered_bytes += len(text.encode())
+        # The first fragment is sent right away to keep the time to first token low.
+        if self._sequence == 0 or self._buffered_bytes >= self._flush_bytes:
+            await self.flush()
+        elif self._deadline is None:
+            self._deadline = asyncio.create_task(self._flush_at_deadline())
+
+    async def _flush_at_deadline(self) -> None:
+        await asyncio.sleep(self._flush_interval)
+        self._deadline = None
+        await self.flush()
+
+    async def flush(self, finished: bool = False) -> None:
+        if self._deadline is not None:
+            self._deadline.cancel()
+            self._deadline = None
+        if not self._buffer and not finished:
+            return
+        batch = MessageChunkBatch(
+            message_id=self._message_id,
+            author=self._source,
+            sequence=self._sequence,
+            texts=self._buffer,
+            finished=finished,
+            conversation_id=self._conversation_id,
+        )
+        self._sequence = batch.next_sequence
+        self._buffer = []
+        self._buffered_bytes = 0
+        await self._runtime.publish_message(batch, self._topic_id)
+
+    async def close(self) -> None:
+        await self.flush(finished=True)
+
 
 async def publish_message_to_ui(
     runtime: RoutedAgent | GrpcWorkerAgentRuntime,
     source: str,
     user_message: str,
     ui_config: UIAgentConfig,
+    conversation_id: str = "default",
 ) -> None:
     message_id = str(uuid4())
+    topic_id = TopicId(type=ui_config.topic_type, source=conversation_id)
     # Stream the message to UI
     message_chunks = (
-        MessageChunk(message_id=message_id, text=token + " ", author=source, finished=False)
+        MessageChunk(
+            message_id=message_id, text=token + " ", author=source, finished=False, conversation_id=conversation_id
+        )
         for token in user_message.split()
     )
     for chunk in message_chunks:
-        await runtime.publish_message(
-            chunk,
-            DefaultTopicId(type=ui_config.topic_type),
-        )
+        await runtime.publish_message(chunk, topic_id)
         await asyncio.sleep(random.uniform(ui_config.min_delay, ui_config.max_delay))
 
     await runtime.publish_message(
-        MessageChunk(message_id=message_id, text=" ", author=source, finished=True),
-        DefaultTopicId(type=ui_config.topic_type),
+        MessageChunk(message_id=message_id, text=" ", author=source, finished=True, conversation_id=conversation_id),
+        topic_id,
     )
 
 
@@ -198,6 +302,7 @@ async def publish_message_to_ui_and_backend(
     user_message: str,
     ui_config: UIAgentConfig,
     group_chat_topic_type: str,
+    conversation_id: str = "default",
 ) -> None:
     # Publish messages for ui
     await publish_message_to_ui(
@@ -205,10 +310,11 @@ async def publish_message_to_ui_and_backend(
         source=source,
         user_message=user_message,
         ui_config=ui_config,
+        conversation_id=conversation_id,
     )
 
     # Publish message to backend
     await runtime.publish_message(
-        GroupChatMessage(body=UserMessage(content=user_message, source=source)),
-        topic_id=DefaultTopicId(type=group_chat_topic_type),
+        GroupChatMessage(body=UserMessage(content=user_message, source=source), conversation_id=conversation_id),
+        topic_id=TopicId(type=group_chat_topic_type, source=conversation_id),
     )
@@ -0,0 +1,270 @@
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Dict, Mapping, Optional, Sequence, Tuple, Union
+
+from autogen_core import CancellationToken, Image
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    LLMMessage,
+    ModelCapabilities,  # type: ignore
+    ModelInfo,
+    RequestUsage,
+)
+from autogen_core.tools import Tool, ToolSchema
+
+# Key of `extra_create_args` to bypass the cache for a single call, it is not forwarded to the model client.
+CACHE_ARG = "cache"
+
+
+@dataclass
+class ResponseCacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    bypassed: int = 0
+    latency_saved_seconds: float = 0.0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"hit ratio {self.hit_ratio:.1%} ({self.memory_hits} memory, {self.disk_hits} disk, {self.misses} misses, "
+            f"{self.bypassed} bypassed), {self.latency_saved_seconds:.2f}s of model latency saved"
+        )
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, Image):
+        return value.to_base64()
+    return str(value)
+
+
+def cache_key(
+    messages: Sequence[LLMMessage],
+    tools: Sequence[Tool | ToolSchema],
+    json_output: Optional[bool],
+    extra_create_args: Mapping[str, Any],
+    namespace: str = "",
+) -> str:
+    """A SHA-256 hash over the canonical JSON of everything that determines a completion."""
+    payload = {
+        "namespace": namespace,
+        "messages": [message.model_dump() for message in messages],
+        "tools": [tool.schema if isinstance(tool, Tool) else tool for tool in tools],
+        "json_output": json_output,
+        "extra_create_args": dict(extra_create_args),
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=_encode)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class _SqliteTier:
+    def __init__(self, path: str) -> None:
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, created_at REAL NOT NULL, latency REAL NOT NULL, result TEXT NOT NULL)"
+        )
+        self._connection.commit()
+
+    def get(self, key: str) -> Tuple[float, float, str] | None:
+        return self._connection.execute(
+            "SELECT created_at, latency, result FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+
+    def put(self, key: str, created_at: float, latency: float, result: str) -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO responses (key, created_at, latency, result) VALUES (?, ?, ?, ?)",
+            (key, created_at, latency, result),
+        )
+        self._connection.commit()
+
+    def delete(self, key: str) -> None:
+        self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+        self._connection.commit()
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class CachedChatCompletionClient(ChatCompletionClient):
+    """Caches the completions of a `ChatCompletionClient` by a hash of the request.
+
+    Completions are kept in an in-memory LRU tier of `max_entries` and, if `path` is given, in a SQLite database
+    that survives restarts. Entries older than `ttl_seconds` are ignored. A single call bypasses the cache with
+    `extra_create_args={"cache": False}`. Cached results are returned with `cached=True`, streamed calls that hit
+    the cache yield the whole content as one chunk.
+
+    Args:
+        client (ChatCompletionClient): The model client to cache.
+        max_entries (int, optional): Entries of the in-memory tier. Defaults to 1024.
+        path (str | None, optional): The SQLite database of the on-disk tier. Defaults to None.
+        ttl_seconds (float | None, optional): The time after which an entry expires. Defaults to None, no expiry.
+        namespace (str, optional): Part of every key, for example the model name, to keep models apart in a shared
+            database. Defaults to "".
+    """
+
+    def __init__(
+        self,
+        client: ChatCompletionClient,
+        max_entries: int = 1024,
+        path: str | None = None,
+        ttl_seconds: float | None = None,
+        namespace: str = "",
+    ) -> None:
+        self._client = client
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._namespace = namespace
+        # key -> (created_at, latency, result)
+        self._memory: OrderedDict[str, Tuple[float, float, CreateResult]] = OrderedDict()
+        self._disk = _SqliteTier(path) if path else None
+        self._stats = ResponseCacheStats()
+
+    @property
+    def stats(self) -> ResponseCacheStats:
+        return self._stats
+
+    def _expired(self, created_at: float) -> bool:
+        return self._ttl_seconds is not None and time.time() - created_at > self._ttl_seconds
+
+    def _remember(self, key: str, created_at: float, latency: float, result: CreateResult) -> None:
+        self._memory[key] = (created_at, latency, result)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, key: str) -> CreateResult | None:
+        entry = self._memory.get(key)
+        if entry is not None:
+            created_at, latency, result = entry
+            if not self._expired(created_at):
+                self._memory.move_to_end(key)
+                self._stats.memory_hits += 1
+                self._stats.latency_saved_seconds += latency
+                return result
+            del self._memory[key]
+        if self._disk is not None:
+            row = self._disk.get(key)
+            if row is not None:
+                created_at, latency, serialized = row
+                if not self._expired(created_at):
+                    result = CreateResult.model_validate_json(serialized)
+                    self._remember(key, created_at, latency, result)
+                    self._stats.disk_hits += 1
+                    self._stats.latency_saved_seconds += latency
+                    return result
+                self._disk.delete(key)
+        self._stats.misses += 1
+        return None
+
+    def _store(self, key: str, latency: float, result: CreateResult) -> None:
+        created_at = time.time()
+        self._remember(key, created_at, latency, result)
+        if self._disk is not None:
+            self._disk.put(key, created_at, latency, result.model_dump_json())
+
+    def _prepare(
+        self,
+        messages: Sequence[LLMMessage],
+        tools: Sequence[Tool | ToolSchema],
+        json_output: Optional[bool],
+        extra_create_args: Mapping[str, Any],
+    ) -> Tuple[str | None, Dict[str, Any]]:
+        """Returns the cache key, None if the call bypasses the cache, and the arguments for the model client."""
+        forwarded = {name: value for name, value in extra_create_args.items() if name != CACHE_ARG}
+        if not extra_create_args.get(CACHE_ARG, True):
+            self._stats.bypassed += 1
+            return None, forwarded
+        return cache_key(messages, tools, json_output, forwarded, self._namespace), forwarded
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        key, forwarded = self._prepare(messages, tools, json_output, extra_create_args)
+        if key is not None:
+            cached = self._lookup(key)
+            if cached is not None:
+                return cached.model_copy(update={"cached": True})
+        start = time.perf_counter()
+        result = await self._client.create(
+            messages,
+            tools=tools,
+            json_output=json_output,
+            extra_create_args=forwarded,
+            cancellation_token=cancellation_token,
+        )
+        if key is not None:
+            self._store(key, time.perf_counter() - start, result)
+        return result
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        key, forwarded = self._prepare(messages, tools, json_output, extra_create_args)
+        if key is not None:
+            cached = self._lookup(key)
+            if cached is not None:
+                if isinstance(cached.content, str):
+                    yield cached.content
+                yield cached.model_copy(update={"cached": True})
+                return
+        start = time.perf_counter()
+        async for item in self._client.create_stream(
+            messages,
+            tools=tools,
+            json_output=json_output,
+            extra_create_args=forwarded,
+            cancellation_token=cancellation_token,
+        ):
+            if isinstance(item, CreateResult) and key is not None:
+                self._store(key, time.perf_counter() - start, item)
+            yield item
+
+    def actual_usage(self) -> RequestUsage:
+        return self._client.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self._client.total_usage()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._client.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._client.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore
+        return self._client.capabilities  # type: ignore
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self._client.model_info
+
+    def close(self) -> None:
+        """Closes the on-disk tier."""
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
@@ -0,0 +1,109 @@
+import hashlib
+import inspect
+import json
+from typing import Any, Callable, Dict, Mapping
+
+import httpx
+from _types import ConnectionPoolConfig
+from autogen_core.models import ChatCompletionClient
+from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
+from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+
+COGNITIVE_SERVICES_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+# Keys that identify a credential rather than the model client configuration.
+_CREDENTIAL_KEYS = {"api_key", "azure_ad_token", "azure_ad_token_provider"}
+
+
+def config_key(config: Mapping[str, Any]) -> str:
+    """A SHA-256 hash over the canonical JSON of a model client configuration.
+
+    Callables, such as token providers, are identified by their qualified name, so configurations that only differ in
+    the provider instance share a client."""
+
+    def encode(value: Any) -> Any:
+        if callable(value):
+            return getattr(value, "__qualname__", type(value).__qualname__)
+        return str(value)
+
+    canonical = json.dumps(dict(config), sort_keys=True, separators=(",", ":"), default=encode)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _create_azure_openai_client(config: Mapping[str, Any]) -> ChatCompletionClient:
+    return AzureOpenAIChatCompletionClient(**config)
+
+
+class ModelClientRegistry:
+    """Process-wide pool of model clients, keyed by a hash of their configuration.
+
+    All clients send their requests through one `httpx.AsyncClient`, so connections, and with them TLS sessions, are
+    kept alive and reused across agents and conversations. Configurations without an API key get an AAD token
+    provider that is created once per scope, so `DefaultAzureCredential` discovers the credential only once and
+    its token cache is shared. `aclose` closes the clients and the connection pool.
+
+    Args:
+        pool (ConnectionPoolConfig): Limits and timeouts of the shared connection pool.
+    """
+
+    def __init__(self, pool: ConnectionPoolConfig = ConnectionPoolConfig()) -> None:
+        self._pool = pool
+        self._http_client: httpx.AsyncClient | None = None
+        self._clients: Dict[str, ChatCompletionClient] = {}
+        self._token_providers: Dict[str, Callable[[], str]] = {}
+        self.num_created = 0
+        self.num_reused = 0
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self._pool.max_connections,
+                    max_keepalive_connections=self._pool.max_keepalive_connections,
+                    keepalive_expiry=self._pool.keepalive_expiry_seconds,
+                ),
+                timeout=httpx.Timeout(self._pool.timeout_seconds, connect=self._pool.connect_timeout_seconds),
+            )
+        return self._http_client
+
+    def token_provider(self, scope: str = COGNITIVE_SERVICES_SCOPE) -> Callable[[], str]:
+        """Returns the AAD token provider of `scope`, creating the credential on first use."""
+        if scope not in self._token_providers:
+            self._token_providers[scope] = get_bearer_token_provider(DefaultAzureCredential(), scope)
+        return self._token_providers[scope]
+
+    def get(
+        self,
+        config: Mapping[str, Any],
+        create: Callable[[Mapping[str, Any]], ChatCompletionClient] = _create_azure_openai_client,
+    ) -> ChatCompletionClient:
+        """Returns the client of `config`, creating it with `create` if there is none yet.
+
+        `create` receives `config` with the shared HTTP client and, if no credential is configured, the shared
+        token provider added."""
+        key = config_key(config)
+        client = self._clients.get(key)
+        if client is not None:
+            self.num_reused += 1
+            return client
+        pooled_config: Dict[str, Any] = {**config, "http_client": self.http_client}
+        if not any(config.get(name) for name in _CREDENTIAL_KEYS):
+            pooled_config["azure_ad_token_provider"] = self.token_provider()
+        client = create(pooled_config)
+        self._clients[key] = client
+        self.num_created += 1
+        return client
+
+    async def aclose(self) -> None:
+        """Closes all pooled clients and the shared connection pool."""
+        for client in self._clients.values():
+            close = getattr(client, "close", None)
+            if close is not None:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+        self._clients.clear()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
@@ -0,0 +1,88 @@
+import asyncio
+import time
+from typing import Any, List
+
+from autogen_core import AgentId, AgentRuntime, MessageContext, RoutedAgent
+
+
+class ConversationAgent(RoutedAgent):
+    """An agent that serves a single conversation.
+
+    The runtime creates one instance per topic source, so the key of the agent id is the conversation id.
+    The agent records when it last handled a message, which lets `IdleConversationEvictor` drop idle instances."""
+
+    def __init__(self, description: str) -> None:
+        super().__init__(description)
+        self.last_active = time.monotonic()
+        self._num_handling = 0
+
+    @property
+    def conversation_id(self) -> str:
+        return self.id.key
+
+    @property
+    def busy(self) -> bool:
+        return self._num_handling > 0
+
+    async def on_message_impl(self, message: Any, ctx: MessageContext) -> Any | None:
+        self._num_handling += 1
+        try:
+            return await super().on_message_impl(message, ctx)
+        finally:
+            self._num_handling -= 1
+            self.last_active = time.monotonic()
+
+
+class IdleConversationEvictor:
+    """Periodically removes the conversation agents of a runtime that were idle for `ttl_seconds`.
+
+    Evicted agents are closed and forgotten. A later message of the same conversation creates a new instance with an
+    empty history, so the TTL should be well above the time between two turns of a conversation.
+
+    Args:
+        runtime (AgentRuntime): A `SingleThreadedAgentRuntime` or `GrpcWorkerAgentRuntime`.
+        ttl_seconds (float): The time without messages after which a conversation agent is evicted.
+        interval_seconds (float): The time between two scans for idle agents.
+    """
+
+    def __init__(self, runtime: AgentRuntime, ttl_seconds: float, interval_seconds: float) -> None:
+        self._runtime = runtime
+        self._ttl_seconds = ttl_seconds
+        self._interval_seconds = interval_seconds
+        self._task: asyncio.Task[None] | None = None
+        self.num_evicted = 0
+
+    @property
+    def num_agents(self) -> int:
+        """The number of agent instances currently held by the runtime."""
+        return len(self._runtime._instantiated_agents)  # type: ignore[attr-defined]
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def evict_idle(self) -> int:
+        """Evicts the idle conversation agents now and returns how many were evicted."""
+        # Neither runtime offers a public way to drop an agent instance, both keep them in `_instantiated_agents`.
+        agents = self._runtime._instantiated_agents  # type: ignore[attr-defined]
+        now = time.monotonic()
+        idle: List[AgentId] = [
+            agent_id
+            for agent_id, agent in agents.items()
+            if isinstance(agent, ConversationAgent) and not agent.busy and now - agent.last_active >= self._ttl_seconds
+        ]
+        for agent_id in idle:
+            await agents.pop(agent_id).close()
+        self.num_evicted += len(idle)
+        return len(idle)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval_seconds)
+            await self.evict_idle()
@@ -0,0 +1,51 @@
+from typing import Dict, Iterable
+
+
+def replica_topic_type(topic_type: str, replica: int) -> str:
+    """The topic type and agent type of one replica of a participant."""
+    return f"{topic_type}.{replica}"
+
+
+class ReplicaDispatcher:
+    """Assigns each conversation to one replica per participant and keeps that assignment.
+
+    A conversation is assigned to the replica with the fewest active conversations the first time a message of the
+    conversation has to be delivered to the participant. All later messages of the conversation go to the same
+    replica, so the chat history of the participant stays in one process. The dispatcher is shared by all
+    `GroupChatManager` instances of a runtime, one per conversation, so the load is tracked across conversations.
+    """
+
+    def __init__(self) -> None:
+        # participant topic type -> replica -> number of active conversations
+        self._load: Dict[str, Dict[int, int]] = {}
+        # conversation id -> participant topic type -> replica
+        self._assignments: Dict[str, Dict[str, int]] = {}
+
+    def add_replica(self, topic_type: str, replica: int) -> None:
+        """Makes a replica available for new conversations. Adding a known replica again has no effect."""
+        self._load.setdefault(topic_type, {}).setdefault(replica, 0)
+
+    def replicas(self, topic_type: str) -> Iterable[int]:
+        return self._load.get(topic_type, {}).keys()
+
+    def load(self, topic_type: str) -> Dict[int, int]:
+        """The number of active conversations per replica of a participant."""
+        return dict(self._load.get(topic_type, {}))
+
+    def route(self, conversation_id: str, topic_type: str) -> str:
+        """Returns the topic type of the replica that serves the participant in the conversation."""
+        assignment = self._assignments.setdefault(conversation_id, {})
+        replica = assignment.get(topic_type)
+        if replica is None:
+            load = self._load.get(topic_type)
+            if not load:
+                raise ValueError(f"No replica of {topic_type} is available")
+            replica = min(load, key=lambda r: (load[r], r))
+            load[replica] += 1
+            assignment[topic_type] = replica
+        return replica_topic_type(topic_type, replica)
+
+    def release(self, conversation_id: str) -> None:
+        """Frees the replicas of a finished conversation."""
+        for topic_type, replica in self._assignments.pop(conversation_id, {}).items():
+            self._load[topic_type][replica] -= 1
@@ -0,0 +1,215 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Deque, List, Mapping
+
+import tiktoken
+from _types import ChatHistoryConfig
+from autogen_core.model_context import (
+    ChatCompletionContext,
+    ChatCompletionContextState,
+    UnboundedChatCompletionContext,
+)
+from autogen_core.models import LLMMessage, SystemMessage
+
+
+class _EvictingChatCompletionContext(ChatCompletionContext, ABC):
+    """Base class for chat completion contexts that drop their oldest messages.
+
+    Unlike `BufferedChatCompletionContext`, which only limits the view returned by `get_messages`,
+    evicted messages are removed from memory. Subclasses decide when to evict by implementing
+    `_over_limit` and can observe every evicted message through `_on_evict`.
+    """
+
+    def __init__(self, initial_messages: List[LLMMessage] | None = None) -> None:
+        super().__init__()
+        self._messages: Deque[LLMMessage] = deque()  # type: ignore[assignment]
+        for message in initial_messages or []:
+            self._append(message)
+
+    @abstractmethod
+    def _over_limit(self) -> bool:
+        """Whether the messages exceed the limit, checked after every added message."""
+
+    def _on_add(self, message: LLMMessage) -> None:
+        pass
+
+    def _on_evict(self, message: LLMMessage) -> None:
+        pass
+
+    def _append(self, message: LLMMessage) -> None:
+        self._messages.append(message)
+        self._on_add(message)
+        # Always keep the latest message, even if it alone exceeds the limit.
+        while len(self._messages) > 1 and self._over_limit():
+            self._on_evict(self._messages.popleft())
+
+    async def add_message(self, message: LLMMessage) -> None:
+        self._append(message)
+
+    async def get_messages(self) -> List[LLMMessage]:
+        return list(self._messages)
+
+    async def clear(self) -> None:
+        self._messages.clear()
+
+    async def save_state(self) -> Mapping[str, Any]:
+        return ChatCompletionContextState(messages=list(self._messages)).model_dump()
+
+    async def load_state(self, state: Mapping[str, Any]) -> None:
+        await self.clear()
+        for message in ChatCompletionContextState.model_validate(state).messages:
+            self._append(message)
+
+
+class SlidingWindowChatCompletionContext(_EvictingChatCompletionContext):
+    """Keeps the last `max_messages` messages.
+
+    Args:
+        max_messages (int): The number of messages to keep.
+        initial_messages (List[LLMMessage] | None): The initial messages.
+    """
+
+    def __init__(self, max_messages: int, initial_messages: List[LLMMessage] | None = None) -> None:
+        if max_messages <= 0:
+            raise ValueError("max_messages must be greater than 0.")
+        self._max_messages = max_messages
+        super().__init__(initial_messages)
+
+    def _over_limit(self) -> bool:
+        return len(self._messages) > self._max_messages
+
+
+class TokenBudgetChatCompletionContext(_EvictingChatCompletionContext):
+    """Keeps the most recent messages that fit into `max_tokens`.
+
+    Every message is tokenized once when it is added, so keeping the budget costs O(1) amortized per message.
+
+    Args:
+        max_tokens (int): The token budget for the chat history, excluding the system message of the agent.
+        count_tokens (Callable[[str], int]): Counts the tokens of a message's text.
+        initial_messages (List[LLMMessage] | None): The initial messages.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        count_tokens: Callable[[str], int],
+        initial_messages: List[LLMMessage] | None = None,
+    ) -> None:
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be greater than 0.")
+        self._max_tokens = max_tokens
+        self._count_tokens = count_tokens
+        self._token_counts: Deque[int] = deque()
+        self._num_tokens = 0
+        super().__init__(initial_messages)
+
+    @property
+    def num_tokens(self) -> int:
+        return self._num_tokens
+
+    def _over_limit(self) -> bool:
+        return self._num_tokens > self._max_tokens
+
+    def _on_add(self, message: LLMMessage) -> None:
+        num_tokens = self._count_tokens(_message_text(message))
+        self._token_counts.append(num_tokens)
+        self._num_tokens += num_tokens
+
+    def _on_evict(self, message: LLMMessage) -> None:
+        self._num_tokens -= self._token_counts.popleft()
+
+    async def clear(self) -> None:
+        await super().clear()
+        self._token_counts.clear()
+        self._num_tokens = 0
+
+
+class RollingSummaryChatCompletionContext(SlidingWindowChatCompletionContext):
+    """Keeps the last `max_messages` messages and folds evicted messages into a single summary note.
+
+    The note is built locally without calling the model: every evicted message contributes its first
+    sentence, and the oldest lines of the note are dropped once it exceeds `max_summary_chars`. Transfer
+    notes written by the system are not summarized.
+
+    Args:
+        max_messages (int): The number of messages to keep verbatim.
+        max_summary_chars (int): The maximum length of the summary note.
+        initial_messages (List[LLMMessage] | None): The initial messages.
+    """
+
+    def __init__(
+        self,
+        max_messages: int,
+        max_summary_chars: int,
+        initial_messages: List[LLMMessage] | None = None,
+    ) -> None:
+        self._max_summary_chars = max_summary_chars
+        self._summary_lines: Deque[str] = deque()
+        self._summary_chars = 0
+        super().__init__(max_messages, initial_messages)
+
+    def _on_evict(self, message: LLMMessage) -> None:
+        if getattr(message, "source", None) == "system":
+            return
+        text = _message_text(message)
+        sentence = text.split(". ", 1)[0].strip()[: self._max_summary_chars]
+        if not sentence:
+            return
+        line = f"- {getattr(message, 'source', 'unknown')}: {sentence}"
+        self._summary_lines.append(line)
+        self._summary_chars += len(line) + 1
+        while len(self._summary_lines) > 1 and self._summary_chars > self._max_summary_chars:
+            self._summary_chars -= len(self._summary_lines.popleft()) + 1
+
+    async def get_messages(self) -> List[LLMMessage]:
+        messages = await super().get_messages()
+        if not self._summary_lines:
+            return messages
+        summary = "Summary of the earlier conversation:\n" + "\n".join(self._summary_lines)
+        return [SystemMessage(content=summary), *messages]
+
+    async def clear(self) -> None:
+        await super().clear()
+        self._summary_lines.clear()
+        self._summary_chars = 0
+
+    async def save_state(self) -> Mapping[str, Any]:
+        return {**(await super().save_state()), "summary_lines": list(self._summary_lines)}
+
+    async def load_state(self, state: Mapping[str, Any]) -> None:
+        # The saved messages fit into the window, so loading them folds nothing into the summary.
+        await super().load_state({"messages": state["messages"]})
+        self._summary_lines.extend(state.get("summary_lines", []))
+        self._summary_chars = sum(len(line) + 1 for line in self._summary_lines)
+
+
+def _message_text(message: LLMMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return " ".join(str(item) for item in content)  # type: ignore[union-attr]
+
+
+def get_token_counter(model: str) -> Callable[[str], int]:
+    """Returns a local tokenizer for `model`, falling back to `cl100k_base` for unknown models."""
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text))
+
+
+def create_model_context(config: ChatHistoryConfig, model: str) -> ChatCompletionContext:
+    """Creates the chat history of a group chat agent according to its configured policy."""
+    match config.policy:
+        case "unbounded":
+            return UnboundedChatCompletionContext()
+        case "sliding_window":
+            return SlidingWindowChatCompletionContext(max_messages=config.max_messages)
+        case "token_budget":
+            return TokenBudgetChatCompletionContext(max_tokens=config.max_tokens, count_tokens=get_token_counter(model))
+        case "rolling_summary":
+            return RollingSummaryChatCompletionContext(
+                max_messages=config.max_messages, max_summary_chars=config.max_summary_chars
+            )
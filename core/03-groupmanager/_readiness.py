@@ -0,0 +1,118 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Set
+
+from _dispatch import replica_topic_type
+from _types import ParticipantReady, ReadinessConfig, ReadinessProbe
+from autogen_core import DefaultTopicId, MessageContext, RoutedAgent, TypeSubscription, message_handler
+from autogen_ext.runtimes.grpc import GrpcWorkerAgentRuntime
+from rich.console import Console
+from rich.markdown import Markdown
+
+
+async def wait_for_host(address: str, config: ReadinessConfig) -> None:
+    """Waits until the host accepts connections, retrying with exponential backoff."""
+    hostname, port = address.rsplit(":", 1)
+    deadline = time.monotonic() + config.timeout_seconds
+    backoff = config.initial_backoff_seconds
+    while True:
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(hostname, int(port)), timeout=backoff)
+            writer.close()
+            await writer.wait_closed()
+            return
+        except (OSError, asyncio.TimeoutError) as e:
+            if time.monotonic() + backoff > deadline:
+                raise TimeoutError(f"Host {address} is not reachable after {config.timeout_seconds}s") from e
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, config.max_backoff_seconds)
+
+
+class ReadinessAgent(RoutedAgent):
+    """Answers readiness probes on the control topic on behalf of a participant."""
+
+    def __init__(self, participant: str, replica: int, topic_types: List[str], control_topic_type: str) -> None:
+        super().__init__(f"Readiness of {participant}")
+        self._ready = ParticipantReady(participant=participant, replica=replica, topic_types=topic_types)
+        self._control_topic_type = control_topic_type
+
+    @message_handler
+    async def handle_probe(self, message: ReadinessProbe, ctx: MessageContext) -> None:
+        await self.publish_message(self._ready, DefaultTopicId(type=self._control_topic_type))
+
+
+class ReadinessMonitor(RoutedAgent):
+    """Collects the participants that announced themselves on the control topic."""
+
+    def __init__(self, on_ready: Callable[[ParticipantReady], Awaitable[None]]) -> None:
+        super().__init__("Readiness monitor")
+        self._on_ready = on_ready
+
+    @message_handler
+    async def handle_ready(self, message: ParticipantReady, ctx: MessageContext) -> None:
+        await self._on_ready(message)
+
+
+async def announce_ready(
+    runtime: GrpcWorkerAgentRuntime,
+    participant: str,
+    topic_types: List[str],
+    config: ReadinessConfig,
+    replica: int = 0,
+) -> None:
+    """Announces a participant on the control topic once its agents are registered and subscribed.
+
+    The participant also keeps answering readiness probes, so a manager that starts later still finds it."""
+    readiness_agent_type = await ReadinessAgent.register(
+        runtime,
+        f"{replica_topic_type(participant, replica)}_readiness",
+        lambda: ReadinessAgent(participant, replica, topic_types, config.control_topic_type),
+    )
+    await runtime.add_subscription(
+        TypeSubscription(topic_type=config.control_topic_type, agent_type=readiness_agent_type.type)
+    )
+    await runtime.publish_message(
+        ParticipantReady(participant=participant, replica=replica, topic_types=topic_types),
+        DefaultTopicId(type=config.control_topic_type),
+    )
+
+
+async def wait_for_participants(
+    runtime: GrpcWorkerAgentRuntime,
+    config: ReadinessConfig,
+    on_ready: Callable[[ParticipantReady], Awaitable[None]] | None = None,
+) -> None:
+    """Waits until at least one replica of each of `config.participants` announced itself on the control topic.
+
+    Readiness probes are published with exponential backoff until every participant answered or
+    `config.timeout_seconds` have passed, in which case a `TimeoutError` is raised. `on_ready` is called for
+    every announcement, including those of replicas that start after this function returned."""
+    missing: Set[str] = set(config.participants)
+    all_ready = asyncio.Event()
+    console = Console()
+
+    async def on_participant_ready(message: ParticipantReady) -> None:
+        if on_ready is not None:
+            await on_ready(message)
+        if message.participant in missing:
+            missing.discard(message.participant)
+            console.print(Markdown(f"`{message.participant}` is ready, subscribed to {message.topic_types}"))
+            if not missing:
+                all_ready.set()
+
+    monitor_type = await ReadinessMonitor.register(
+        runtime, "readiness_monitor", lambda: ReadinessMonitor(on_participant_ready)
+    )
+    await runtime.add_subscription(TypeSubscription(topic_type=config.control_topic_type, agent_type=monitor_type.type))
+
+    deadline = time.monotonic() + config.timeout_seconds
+    backoff = config.initial_backoff_seconds
+    while not all_ready.is_set():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Participants {sorted(missing)} are not ready after {config.timeout_seconds}s")
+        await runtime.publish_message(ReadinessProbe(), DefaultTopicId(type=config.control_topic_type))
+        try:
+            await asyncio.wait_for(all_ready.wait(), timeout=min(backoff, remaining))
+        except asyncio.TimeoutError:
+            backoff = min(backoff * 2, config.max_backoff_seconds)
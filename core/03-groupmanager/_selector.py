@@ -0,0 +1,76 @@
+from typing import Dict, List, Tuple
+
+from autogen_core.models import LLMMessage
+
+
+class SelectorPromptBuilder:
+    """Incrementally builds the speaker selection prompt of the group chat manager.
+
+    Every message is formatted exactly once when it is appended to the transcript. The roles and
+    candidate lists only depend on the previous speaker, so the text around the transcript is
+    precomputed for every possible previous speaker and the prompt is assembled from cached pieces.
+    """
+
+    def __init__(
+        self,
+        participant_topic_types: List[str],
+        participant_descriptions: List[str],
+        max_rounds: int,
+    ) -> None:
+        self._participant_topic_types = participant_topic_types
+        self._participant_descriptions = participant_descriptions
+        self._max_rounds = max_rounds
+        self._candidates: Dict[str | None, List[str]] = {}
+        self._frames: Dict[str | None, Tuple[str, str]] = {}
+        for previous_topic_type in [None, *participant_topic_types]:
+            self._candidates[previous_topic_type] = [
+                topic_type for topic_type in participant_topic_types if topic_type != previous_topic_type
+            ]
+            self._frames[previous_topic_type] = self._build_frame(previous_topic_type)
+        self._history = ""
+        self._num_messages = 0
+
+    def __len__(self) -> int:
+        return self._num_messages
+
+    def _build_frame(self, previous_topic_type: str | None) -> Tuple[str, str]:
+        roles = "\n".join(
+            [
+                f"{topic_type}: {description}".strip()
+                for topic_type, description in zip(
+                    self._participant_topic_types, self._participant_descriptions, strict=True
+                )
+                if topic_type != previous_topic_type
+            ]
+        )
+        participants = str(self._candidates[previous_topic_type])
+        head = f"""You are in a role play game. The following roles are available:
+{roles}.
+Read the following conversation. Then select the next role from {participants} to play. Only return the role.
+
+"""
+        tail = f"""
+
+Read the above conversation. Then select the next role from {participants} to play. if you think it's enough talking (for example they have talked for {self._max_rounds} rounds), return 'FINISH'.
+"""
+        return head, tail
+
+    def append(self, message: LLMMessage) -> None:
+        """Formats a message once and appends it to the transcript."""
+        if isinstance(message.content, str):  # type: ignore[union-attr]
+            line = f"{message.source}: {message.content}"  # type: ignore[union-attr]
+        elif isinstance(message.content, list):  # type: ignore[union-attr]
+            line = f"{message.source}: {', '.join(message.content)}"  # type: ignore[union-attr,arg-type]
+        else:
+            return
+        self._history = f"{self._history}\n{line}" if self._num_messages else line
+        self._num_messages += 1
+
+    def candidates(self, previous_topic_type: str | None) -> List[str]:
+        """Returns the participants that may speak after `previous_topic_type`."""
+        return self._candidates[previous_topic_type]
+
+    def build(self, previous_topic_type: str | None) -> str:
+        """Assembles the selector prompt for the current transcript."""
+        head, tail = self._frames[previous_topic_type]
+        return "".join((head, self._history, tail))
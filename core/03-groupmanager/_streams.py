@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Generic, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StreamRegistryStats:
+    open_streams: int = 0
+    finalizing_streams: int = 0
+    finalized: int = 0
+    evicted_abandoned: int = 0
+    evicted_over_capacity: int = 0
+    late_chunks: int = 0
+    finalize_errors: int = 0
+    last_finalize_lag_seconds: float = 0.0
+    max_finalize_lag_seconds: float = 0.0
+
+
+class MessageStreamRegistry(Generic[T]):
+    """Keeps track of the UI messages that are currently being streamed.
+
+    Streams are kept in least recently used order. Streams without a chunk for `ttl_seconds` are evicted as
+    abandoned, and the least recently used stream is evicted when more than `max_streams` are open. Finished and
+    evicted streams leave the registry immediately and are finalized by a background task after
+    `finalize_delay_seconds`, so the caller is never blocked by the delay or by the finalization itself. The ids of
+    the last `max_streams` closed streams are remembered, so a late chunk of a closed stream does not start a new one.
+
+    Args:
+        create (Callable[[str], T]): Creates the stream for a new message, given the author.
+        finalize (Callable[[T], Awaitable[None]]): Finalizes a finished stream.
+        max_streams (int): The maximum number of open streams.
+        ttl_seconds (float): The time after which a stream without new chunks is considered abandoned.
+        finalize_delay_seconds (float): The delay between finishing and finalizing a stream.
+    """
+
+    def __init__(
+        self,
+        create: Callable[[str], T],
+        finalize: Callable[[T], Awaitable[None]],
+        max_streams: int = 256,
+        ttl_seconds: float = 300.0,
+        finalize_delay_seconds: float = 0.0,
+    ) -> None:
+        self._create = create
+        self._finalize = finalize
+        self._max_streams = max_streams
+        self._ttl_seconds = ttl_seconds
+        self._finalize_delay_seconds = finalize_delay_seconds
+        self._streams: OrderedDict[str, Tuple[T, float]] = OrderedDict()
+        self._closed: OrderedDict[str, None] = OrderedDict()
+        self._finalize_tasks: Set[asyncio.Task[None]] = set()
+        self._stats = StreamRegistryStats()
+
+    @property
+    def stats(self) -> StreamRegistryStats:
+        self._stats.open_streams = len(self._streams)
+        self._stats.finalizing_streams = len(self._finalize_tasks)
+        return self._stats
+
+    def get(self, message_id: str, author: str) -> Optional[T]:
+        """Returns the stream of `message_id`, creating it if needed, and marks it as recently used.
+
+        Returns None for a late chunk of a stream that was already finished or evicted."""
+        now = time.monotonic()
+        self._evict_abandoned(now)
+        if message_id in self._streams:
+            stream, _ = self._streams.pop(message_id)
+        elif message_id in self._closed:
+            self._stats.late_chunks += 1
+            return None
+        else:
+            stream = self._create(author)
+            if len(self._streams) >= self._max_streams:
+                self._close(*self._streams.popitem(last=False))
+                self._stats.evicted_over_capacity += 1
+        self._streams[message_id] = (stream, now)
+        return stream
+
+    def finish(self, message_id: str) -> None:
+        """Removes the stream of `message_id` and schedules its finalization."""
+        entry = self._streams.pop(message_id, None)
+        if entry is not None:
+            self._close(message_id, entry)
+
+    def _close(self, message_id: str, entry: Tuple[T, float]) -> None:
+        self._closed[message_id] = None
+        if len(self._closed) > self._max_streams:
+            self._closed.popitem(last=False)
+        task = asyncio.create_task(self._finalize_later(entry[0], time.monotonic()))
+        self._finalize_tasks.add(task)
+        task.add_done_callback(self._finalize_tasks.discard)
+
+    async def aclose(self) -> None:
+        """Waits for all scheduled finalizations."""
+        await asyncio.gather(*self._finalize_tasks, return_exceptions=True)
+
+    def _evict_abandoned(self, now: float) -> None:
+        # The oldest entry is the least recently used one, so stop at the first entry that is still alive.
+        while self._streams:
+            _, (_, last_used) = next(iter(self._streams.items()))
+            if now - last_used < self._ttl_seconds:
+                return
+            self._close(*self._streams.popitem(last=False))
+            self._stats.evicted_abandoned += 1
+
+    async def _finalize_later(self, stream: T, finished_at: float) -> None:
+        if self._finalize_delay_seconds > 0:
+            await asyncio.sleep(self._finalize_delay_seconds)
+        try:
+            await self._finalize(stream)
+        except Exception:
+            # Nobody awaits the task, so the error is logged instead of being lost.
+            logger.exception("Finalizing a message stream failed.")
+            self._stats.finalize_errors += 1
+            return
+        lag = time.monotonic() - finished_at - self._finalize_delay_seconds
+        self._stats.finalized += 1
+        self._stats.last_finalize_lag_seconds = lag
+        self._stats.max_finalize_lag_seconds = max(self._stats.max_finalize_lag_seconds, lag)
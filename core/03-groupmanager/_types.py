@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, List, Literal
 
 from autogen_core.models import (
     LLMMessage,
@@ -12,11 +12,26 @@ class GroupChatMessage(BaseModel):
     """Implements a sample message sent by an LLM agent"""
 
     body: LLMMessage
+    conversation_id: str = "default"
 
 
 class RequestToSpeak(BaseModel):
     """Message type for agents to speak"""
 
+    conversation_id: str = "default"
+
+
+class ParticipantReady(BaseModel):
+    """Message type for participants to announce that their agents and subscriptions are registered"""
+
+    participant: str
+    replica: int = 0
+    topic_types: List[str]
+
+
+class ReadinessProbe(BaseModel):
+    """Message type for asking all participants to announce themselves again"""
+
     pass
 
 
@@ -26,11 +41,34 @@ class MessageChunk:
     text: str
     author: str
     finished: bool
+    conversation_id: str = "default"
 
     def __str__(self) -> str:
         return f"{self.author}({self.message_id}): {self.text}"
 
 
+@dataclass
+class MessageChunkBatch:
+    """Carries consecutive text fragments of one streamed message.
+
+    The fragments are numbered per `message_id`, `sequence` is the number of the first fragment in `texts`.
+    The batch with `finished` set is the last one of the message."""
+
+    message_id: str
+    author: str
+    sequence: int
+    texts: List[str]
+    finished: bool
+    conversation_id: str = "default"
+
+    @property
+    def next_sequence(self) -> int:
+        return self.sequence + len(self.texts)
+
+    def __str__(self) -> str:
+        return f"{self.author}({self.message_id})[{self.sequence}:{self.next_sequence}]: {''.join(self.texts)}"
+
+
 # Define Host configuration model
 class HostConfig(BaseModel):
     hostname: str
@@ -47,17 +85,31 @@ class GroupChatManagerConfig(BaseModel):
     max_rounds: int
 
 
+# Define chat history configuration model
+class ChatHistoryConfig(BaseModel):
+    policy: Literal["unbounded", "sliding_window", "token_budget", "rolling_summary"] = "unbounded"
+    max_messages: int = 20
+    max_tokens: int = 2000
+    max_summary_chars: int = 1000
+
+
 # Define WriterAgent configuration model
 class ChatAgentConfig(BaseModel):
     topic_type: str
     description: str
     system_message: str
+    history: ChatHistoryConfig = ChatHistoryConfig()
 
 
 # Define UI Agent configuration model
 class UIAgentConfig(BaseModel):
     topic_type: str
     artificial_stream_delay_seconds: Dict[str, float]
+    stream_flush_bytes: int = 64
+    stream_flush_interval_seconds: float = 0.05
+    max_open_streams: int = 256
+    stream_ttl_seconds: float = 300.0
+    finalize_delay_seconds: float = 3.0
 
     @property
     def min_delay(self) -> float:
@@ -68,9 +120,45 @@ class UIAgentConfig(BaseModel):
         return self.artificial_stream_delay_seconds.get("max", 0.0)
 
 
+# Define readiness configuration model
+class ReadinessConfig(BaseModel):
+    control_topic_type: str = "control"
+    participants: List[str] = ["writer_agent", "editor_agent", "ui_agent"]
+    timeout_seconds: float = 30.0
+    initial_backoff_seconds: float = 0.05
+    max_backoff_seconds: float = 2.0
+
+
+# Define conversation configuration model
+class ConversationConfig(BaseModel):
+    idle_ttl_seconds: float = 600.0
+    eviction_interval_seconds: float = 30.0
+
+
+# Define response cache configuration model
+class ResponseCacheConfig(BaseModel):
+    enabled: bool = False
+    max_entries: int = 1024
+    path: str | None = None
+    ttl_seconds: float | None = None
+
+
+# Define connection pool configuration model
+class ConnectionPoolConfig(BaseModel):
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry_seconds: float = 60.0
+    timeout_seconds: float = 60.0
+    connect_timeout_seconds: float = 10.0
+
+
 # Define the overall AppConfig model
 class AppConfig(BaseModel):
     host: HostConfig
+    readiness: ReadinessConfig = ReadinessConfig()
+    conversations: ConversationConfig = ConversationConfig()
+    response_cache: ResponseCacheConfig = ResponseCacheConfig()
+    connection_pool: ConnectionPoolConfig = ConnectionPoolConfig()
     group_chat_manager: GroupChatManagerConfig
     writer_agent: ChatAgentConfig
     editor_agent: ChatAgentConfig
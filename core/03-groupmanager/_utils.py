@@ -1,12 +1,14 @@
 import logging
 import os
-from typing import Any, Iterable, Type
+from typing import Any, Iterable, Mapping, Type
 
 import yaml
+from _cache import CachedChatCompletionClient
+from _clients import ModelClientRegistry
 from _types import AppConfig
 from autogen_core import MessageSerializer, try_get_known_serializers_for_type
-from autogen_ext.models.openai import AzureOpenAIClientConfiguration
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+from autogen_core.models import ChatCompletionClient
+from autogen_ext.models.openai import AzureOpenAIChatCompletionClient, AzureOpenAIClientConfiguration
 
 
 def load_config(file_path: str = os.path.join(os.path.dirname(__file__), "config.yaml")) -> AppConfig:
@@ -17,17 +19,35 @@ def load_config(file_path: str = os.path.join(os.path.dirname(__file__), "config
         del config_data["client_config"]
         app_config = AppConfig(**config_data)
     # This was required as it couldn't automatically instantiate AzureOpenAIClientConfiguration
-
-    aad_params = {}
+    # Without an api_key, the AAD token provider is added by the ModelClientRegistry, which shares it per process.
     if len(model_client.get("api_key", "")) == 0:
-        aad_params["azure_ad_token_provider"] = get_bearer_token_provider(
-            DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default"
-        )
+        model_client.pop("api_key", None)
 
-    app_config.client_config = AzureOpenAIClientConfiguration(**model_client, **aad_params)  # type: ignore[typeddict-item]
+    app_config.client_config = AzureOpenAIClientConfiguration(**model_client)  # type: ignore[typeddict-item]
     return app_config
 
 
+def create_model_client(config: AppConfig, registry: ModelClientRegistry) -> ChatCompletionClient:
+    """Returns the pooled model client of `config.client_config`, wrapped in a response cache if it is enabled.
+
+    The registry creates the client once per process and shares it between agents, so they share the connection
+    pool and the cache as well."""
+
+    def create(pooled_config: Mapping[str, Any]) -> ChatCompletionClient:
+        model_client = AzureOpenAIChatCompletionClient(**pooled_config)
+        if not config.response_cache.enabled:
+            return model_client
+        return CachedChatCompletionClient(
+            model_client,
+            max_entries=config.response_cache.max_entries,
+            path=config.response_cache.path,
+            ttl_seconds=config.response_cache.ttl_seconds,
+            namespace=config.client_config["model"],
+        )
+
+    return registry.get(config.client_config, create)
+
+
 def get_serializers(types: Iterable[Type[Any]]) -> list[MessageSerializer[Any]]:
     serializers = []
     for type in types:
@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from _cache import CachedChatCompletionClient
+from _fakes import StubChatCompletionClient
+from _selector import SelectorPromptBuilder
+from autogen_core.models import ChatCompletionClient, SystemMessage, UserMessage
+from rich.console import Console
+from rich.table import Table
+
+PARTICIPANTS = ["Writer", "Editor"]
+DESCRIPTIONS = ["Writer for creating any text content.", "Editor for planning and reviewing the content."]
+
+
+async def replay(client: ChatCompletionClient, conversations: int, rounds: int) -> float:
+    """Replays the speaker selection of identical scripted conversations and returns the elapsed seconds."""
+    start = time.perf_counter()
+    for _ in range(conversations):
+        transcript = SelectorPromptBuilder(PARTICIPANTS, DESCRIPTIONS, rounds)
+        transcript.append(
+            UserMessage(content="Please write a short story about the gingerbread in halloween!", source="User")
+        )
+        previous: str | None = None
+        for turn in range(rounds * 2):
+            completion = await client.create([SystemMessage(content=transcript.build(previous))])
+            previous = str(completion.content)
+            transcript.append(UserMessage(content=f"Turn {turn}: the gingerbread hides in a pumpkin.", source=previous))
+    return time.perf_counter() - start
+
+
+async def main(conversations: int, rounds: int, latency: float) -> None:
+    table = Table(
+        title=f"Speaker selection of {conversations} replayed conversations, {latency * 1000:.0f} ms per model call"
+    )
+    table.add_column("Run")
+    table.add_column("Seconds", justify="right")
+    table.add_column("Model calls", justify="right")
+    table.add_column("Hit ratio", justify="right")
+    table.add_column("Latency saved (s)", justify="right")
+
+    def stub() -> StubChatCompletionClient:
+        return StubChatCompletionClient(
+            lambda messages: "Editor" if "from ['Editor']" in str(messages[0].content) else "Writer", latency=latency
+        )
+
+    stub_client = stub()
+    seconds = await replay(stub_client, conversations, rounds)
+    table.add_row("no cache", f"{seconds:.2f}", str(stub_client.num_calls), "-", "-")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "responses.sqlite")
+        # The second run starts with an empty memory tier, like a restarted process, and is served from disk.
+        for run in ["cold", "restarted"]:
+            stub_client = stub()
+            client = CachedChatCompletionClient(stub_client, path=path)
+            seconds = await replay(client, conversations, rounds)
+            table.add_row(
+                run,
+                f"{seconds:.2f}",
+                str(stub_client.num_calls),
+                f"{client.stats.hit_ratio:.1%}",
+                f"{client.stats.latency_saved_seconds:.2f}",
+            )
+            client.close()
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the response cache on replayed speaker selections.")
+    parser.add_argument("--conversations", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per model call.")
+    args = parser.parse_args()
+    asyncio.run(main(args.conversations, args.rounds, args.latency))
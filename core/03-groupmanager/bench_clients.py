@@ -0,0 +1,158 @@
+import argparse
+import asyncio
+import json
+import time
+import warnings
+from typing import Any, Dict, List
+
+import httpx
+from _clients import ModelClientRegistry
+from _types import ConnectionPoolConfig
+from autogen_core.models import UserMessage
+from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
+from rich.console import Console
+from rich.table import Table
+
+COMPLETION = json.dumps(
+    {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o",
+        "choices": [
+            {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "Writer"}},
+        ],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 1, "total_tokens": 11},
+    }
+).encode()
+
+
+class StubChatCompletionServer:
+    """A local HTTP/1.1 server that answers every request with the same chat completion.
+
+    Every new connection waits `handshake_seconds` before it is served, a stand-in for the TCP and TLS handshakes
+    with a remote endpoint."""
+
+    def __init__(self, handshake_seconds: float) -> None:
+        self._handshake_seconds = handshake_seconds
+        self._server: asyncio.Server | None = None
+        self.num_connections = 0
+        self.num_requests = 0
+
+    @property
+    def endpoint(self) -> str:
+        assert self._server is not None
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.num_connections += 1
+        await asyncio.sleep(self._handshake_seconds)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                headers = dict(
+                    line.split(": ", 1) for line in head.decode("latin-1").split("\r\n")[1:] if ": " in line
+                )
+                headers = {name.lower(): value for name, value in headers.items()}
+                await reader.readexactly(int(headers.get("content-length", 0)))
+                self.num_requests += 1
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(COMPLETION)}\r\n\r\n".encode()
+                    + COMPLETION
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+def client_config(endpoint: str) -> Dict[str, Any]:
+    return {
+        "model": "gpt-4o",
+        "azure_endpoint": endpoint,
+        "azure_deployment": "gpt-4o",
+        "api_version": "2024-08-01-preview",
+        "api_key": "stub",
+        "max_retries": 0,
+        "model_capabilities": {"vision": True, "function_calling": True, "json_output": True},
+    }
+
+
+async def run(mode: str, turns: int, concurrency: int, handshake_seconds: float) -> Dict[str, float]:
+    """Runs `turns` turns, `concurrency` at a time, each getting its model client and calling it once."""
+    server = StubChatCompletionServer(handshake_seconds)
+    await server.start()
+    config = client_config(server.endpoint)
+    registry = ModelClientRegistry(ConnectionPoolConfig(max_keepalive_connections=concurrency))
+    slots = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def turn() -> None:
+        async with slots:
+            start = time.perf_counter()
+            if mode == "per turn":
+                # As before: every agent factory and every turn built its own client and connection pool.
+                async with httpx.AsyncClient() as http_client:
+                    client = AzureOpenAIChatCompletionClient(**{**config, "http_client": http_client})
+                    await client.create([UserMessage(content="Who speaks next?", source="User")])
+            else:
+                client = registry.get(config)
+                await client.create([UserMessage(content="Who speaks next?", source="User")])
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(turn() for _ in range(turns)))
+    elapsed = time.perf_counter() - start
+    await registry.aclose()
+    await server.stop()
+    latencies.sort()
+    return {
+        "connections": server.num_connections,
+        "seconds": elapsed,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+async def main(turns: int, concurrency: int, handshake_seconds: float) -> None:
+    table = Table(
+        title=f"{turns} model calls, {concurrency} at a time, {handshake_seconds * 1000:.0f} ms per new connection"
+    )
+    table.add_column("Client")
+    table.add_column("Connections", justify="right")
+    table.add_column("Seconds", justify="right")
+    table.add_column("Mean (ms)", justify="right")
+    table.add_column("p95 (ms)", justify="right")
+    for mode in ["per turn", "registry"]:
+        result = await run(mode, turns, concurrency, handshake_seconds)
+        table.add_row(
+            mode,
+            f"{result['connections']:.0f}",
+            f"{result['seconds']:.2f}",
+            f"{result['mean_ms']:.1f}",
+            f"{result['p95_ms']:.1f}",
+        )
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pooled model clients against a local HTTP stub server.")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--handshake-seconds", type=float, default=0.05, help="Delay of every new connection, like a TLS handshake."
+    )
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore", category=UserWarning, message="Resolved model mismatch.*")
+    asyncio.run(main(args.turns, args.concurrency, args.handshake_seconds))
@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import time
+
+from _agents import UIAgent, UIMessageStream, publish_message_to_ui
+from _readiness import wait_for_host
+from _types import MessageChunk, MessageChunkBatch, ReadinessConfig, UIAgentConfig
+from _utils import get_serializers, set_all_log_levels
+from autogen_core import TypeSubscription
+from autogen_ext.runtimes.grpc import GrpcWorkerAgentRuntime, GrpcWorkerAgentRuntimeHost
+from rich.console import Console
+from rich.table import Table
+
+
+async def serve(address: str) -> None:
+    host = GrpcWorkerAgentRuntimeHost(address=address)
+    host.start()
+    await host.stop_when_signal()
+
+
+def cpu_seconds(pid: int) -> float:
+    """User and system CPU time of a process, read from procfs (Linux only)."""
+    with open(f"/proc/{pid}/stat") as file:
+        fields = file.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def run(mode: str, address: str, answers: int, words: int, ui_config: UIAgentConfig) -> dict[str, float]:
+    """Streams `answers` answers of `words` words through a host in a separate process."""
+    host = subprocess.Popen([sys.executable, __file__, "--serve", address])
+    await wait_for_host(address, ReadinessConfig())
+
+    serializers = get_serializers([MessageChunk, MessageChunkBatch])
+    ui_runtime = GrpcWorkerAgentRuntime(host_address=address)
+    ui_runtime.add_message_serializer(serializers)
+    ui_runtime.start()
+    finished = asyncio.Event()
+    num_messages = 0
+    num_finished = 0
+
+    async def on_chunk(chunk: MessageChunk | MessageChunkBatch) -> None:
+        nonlocal num_messages, num_finished
+        num_messages += 1
+        if chunk.finished:
+            num_finished += 1
+            if num_finished == answers:
+                finished.set()
+
+    await UIAgent.register(ui_runtime, "ui_agent", lambda: UIAgent(on_message_chunk_func=on_chunk))
+    await ui_runtime.add_subscription(TypeSubscription(topic_type=ui_config.topic_type, agent_type="ui_agent"))
+
+    worker_runtime = GrpcWorkerAgentRuntime(host_address=address)
+    worker_runtime.add_message_serializer(serializers)
+    worker_runtime.start()
+
+    answer = " ".join(f"word{i}" for i in range(words))
+    host_cpu_start = cpu_seconds(host.pid)
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    for _ in range(answers):
+        if mode == "per-word":
+            await publish_message_to_ui(runtime=worker_runtime, source="Writer", user_message=answer, ui_config=ui_config)
+        else:
+            stream = UIMessageStream(runtime=worker_runtime, source="Writer", ui_config=ui_config)
+            for token in answer.split(" "):
+                await stream.write(token + " ")
+            await stream.close()
+    await finished.wait()
+    elapsed = time.perf_counter() - start
+    worker_cpu = time.process_time() - cpu_start
+    host_cpu = cpu_seconds(host.pid) - host_cpu_start
+
+    await worker_runtime.stop()
+    await ui_runtime.stop()
+    host.terminate()
+    host.wait()
+    return {
+        "messages": num_messages,
+        "seconds": elapsed,
+        "messages_per_second": num_messages / elapsed,
+        "host_cpu": host_cpu,
+        "worker_cpu": worker_cpu,
+    }
+
+
+async def main(address: str, answers: int, words: int, flush_bytes: int) -> None:
+    set_all_log_levels(logging.ERROR)
+    ui_config = UIAgentConfig(
+        topic_type="ui_events",
+        artificial_stream_delay_seconds={"min": 0.0, "max": 0.0},
+        stream_flush_bytes=flush_bytes,
+    )
+    table = Table(title=f"{answers} answers of {words} words through the gRPC host at {address}")
+    table.add_column("Mode")
+    table.add_column("Host messages", justify="right")
+    table.add_column("Seconds", justify="right")
+    table.add_column("Messages/s", justify="right")
+    table.add_column("Host CPU (s)", justify="right")
+    table.add_column("Worker CPU (s)", justify="right")
+    for mode in ["per-word", "batched"]:
+        result = await run(mode, address, answers, words, ui_config)
+        table.add_row(
+            mode,
+            f"{result['messages']:.0f}",
+            f"{result['seconds']:.2f}",
+            f"{result['messages_per_second']:.0f}",
+            f"{result['host_cpu']:.2f}",
+            f"{result['worker_cpu']:.2f}",
+        )
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark UI message chunks through a local gRPC host.")
+    parser.add_argument("--address", default="localhost:50071")
+    parser.add_argument("--answers", type=int, default=20)
+    parser.add_argument("--words", type=int, default=500)
+    parser.add_argument("--flush-bytes", type=int, default=UIAgentConfig.model_fields["stream_flush_bytes"].default)
+    parser.add_argument("--serve", metavar="ADDRESS", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        set_all_log_levels(logging.ERROR)
+        asyncio.run(serve(args.serve))
+    else:
+        asyncio.run(main(args.address, args.answers, args.words, args.flush_bytes))
@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+import io
+import time
+from typing import List, Sequence
+
+from _agents import BaseGroupChatAgent
+from _fakes import StubChatCompletionClient
+from _history import (
+    RollingSummaryChatCompletionContext,
+    SlidingWindowChatCompletionContext,
+    TokenBudgetChatCompletionContext,
+)
+from _types import GroupChatMessage, RequestToSpeak, UIAgentConfig
+from autogen_core import AgentId, SingleThreadedAgentRuntime
+from autogen_core.model_context import ChatCompletionContext, UnboundedChatCompletionContext
+from autogen_core.models import LLMMessage, UserMessage
+from rich.console import Console
+from rich.table import Table
+
+
+def count_words(text: str) -> int:
+    # tiktoken needs to download its encodings, a word count keeps the benchmark offline.
+    return len(text.split())
+
+
+def create_model_context(policy: str) -> ChatCompletionContext:
+    match policy:
+        case "sliding_window":
+            return SlidingWindowChatCompletionContext(max_messages=20)
+        case "token_budget":
+            return TokenBudgetChatCompletionContext(max_tokens=2000, count_tokens=count_words)
+        case "rolling_summary":
+            return RollingSummaryChatCompletionContext(max_messages=20, max_summary_chars=1000)
+        case _:
+            return UnboundedChatCompletionContext()
+
+
+async def run(policy: str, turns: int) -> tuple[int, float]:
+    """Runs a writer through `turns` turns and returns the last prompt size in words and the mean
+    `RequestToSpeak` handler latency over the last 100 turns in milliseconds."""
+    last_prompt: List[Sequence[LLMMessage]] = []
+
+    def respond(messages: Sequence[LLMMessage]) -> str:
+        last_prompt[:] = [messages]
+        return "The gingerbread man put on his pumpkin costume and ran into the haunted bakery."
+
+    runtime = SingleThreadedAgentRuntime()
+    await BaseGroupChatAgent.register(
+        runtime,
+        "Writer",
+        lambda: BaseGroupChatAgent(
+            description="Writer for creating any text content.",
+            group_chat_topic_type="group_chat",
+            model_client=StubChatCompletionClient(respond),
+            system_message="You are a one sentence Writer and provide one sentence content each time",
+            ui_config=UIAgentConfig(topic_type="ui_events", artificial_stream_delay_seconds={"min": 0.0, "max": 0.0}),
+            model_context=create_model_context(policy),
+        ),
+    )
+    writer = AgentId("Writer", "default")
+    (await runtime.try_get_underlying_agent_instance(writer, BaseGroupChatAgent)).console = Console(file=io.StringIO())
+    runtime.start()
+
+    latencies: List[float] = []
+    for turn in range(turns):
+        feedback = UserMessage(content=f"Round {turn}: make the story spookier but keep it short.", source="Editor")
+        await runtime.send_message(GroupChatMessage(body=feedback), writer)
+        start = time.perf_counter()
+        await runtime.send_message(RequestToSpeak(), writer)
+        latencies.append(time.perf_counter() - start)
+    await runtime.stop()
+
+    prompt_words = sum(count_words(str(message.content)) for message in last_prompt[0])
+    recent = latencies[-100:]
+    return prompt_words, sum(recent) / len(recent) * 1000
+
+
+async def main(turn_counts: List[int]) -> None:
+    table = Table(title="BaseGroupChatAgent prompt size and RequestToSpeak latency per history policy")
+    table.add_column("Policy")
+    table.add_column("Turns", justify="right")
+    table.add_column("Prompt (words)", justify="right")
+    table.add_column("Handler latency (ms)", justify="right")
+    for policy in ["unbounded", "sliding_window", "token_budget", "rolling_summary"]:
+        for turns in turn_counts:
+            prompt_words, latency_ms = await run(policy, turns)
+            table.add_row(policy, str(turns), str(prompt_words), f"{latency_ms:.3f}")
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the chat history policies of BaseGroupChatAgent.")
+    parser.add_argument("--turns", type=int, nargs="+", default=[100, 1_000, 10_000])
+    args = parser.parse_args()
+    asyncio.run(main(args.turns))
@@ -0,0 +1,153 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+from typing import Any, AsyncGenerator, List, Sequence, Union
+
+from _agents import BaseGroupChatAgent, GroupChatManager, publish_message_to_ui_and_backend
+from _dispatch import ReplicaDispatcher, replica_topic_type
+from _fakes import StubChatCompletionClient
+from _types import UIAgentConfig
+from autogen_core import SingleThreadedAgentRuntime, TypeSubscription
+from autogen_core.models import CreateResult, LLMMessage
+from rich.console import Console
+from rich.table import Table
+
+PARTICIPANTS = {
+    "Writer": "Writer for creating any text content.",
+    "Editor": "Editor for planning and reviewing the content.",
+}
+
+
+class ReplicaModelClient(StubChatCompletionClient):
+    """A stub model client that serves at most `concurrency` requests at a time, like the deployment of one replica."""
+
+    def __init__(self, concurrency: int, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs: Any) -> CreateResult:
+        async with self._semaphore:
+            return await super().create(messages, **kwargs)
+
+    async def create_stream(
+        self, messages: Sequence[LLMMessage], **kwargs: Any
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        async with self._semaphore:
+            async for item in super().create_stream(messages, **kwargs):
+                yield item
+
+
+def select_speaker(rounds: int):
+    def respond(messages: Sequence[LLMMessage]) -> str:
+        prompt = str(messages[0].content)
+        if prompt.count("\nEditor: ") >= rounds:
+            return "FINISH"
+        return "Editor" if "from ['Editor']" in prompt else "Writer"
+
+    return respond
+
+
+async def run(
+    replicas: int, conversations: int, rounds: int, concurrency: int, latency: float, token_latency: float
+) -> tuple[float, List[int]]:
+    """Runs `conversations` conversations concurrently and returns the elapsed seconds and the model calls per
+    participant replica."""
+    ui_config = UIAgentConfig(topic_type="ui_events", artificial_stream_delay_seconds={"min": 0.0, "max": 0.0})
+    runtime = SingleThreadedAgentRuntime()
+    dispatcher = ReplicaDispatcher()
+    await GroupChatManager.register(
+        runtime,
+        "group_chat_manager",
+        lambda: GroupChatManager(
+            model_client=StubChatCompletionClient(select_speaker(rounds)),
+            participant_topic_types=list(PARTICIPANTS),
+            participant_descriptions=list(PARTICIPANTS.values()),
+            ui_config=ui_config,
+            dispatcher=dispatcher,
+            max_rounds=rounds,
+        ),
+    )
+    await runtime.add_subscription(TypeSubscription(topic_type="group_chat", agent_type="group_chat_manager"))
+
+    clients: List[ReplicaModelClient] = []
+    for topic_type, description in PARTICIPANTS.items():
+        for replica in range(replicas):
+            client = ReplicaModelClient(
+                concurrency,
+                lambda _, name=topic_type: f"{name} adds one more spooky sentence to the gingerbread story.",
+                latency=latency,
+                token_latency=token_latency,
+            )
+            clients.append(client)
+            agent_type = await BaseGroupChatAgent.register(
+                runtime,
+                replica_topic_type(topic_type, replica),
+                lambda client=client, topic_type=topic_type, description=description: BaseGroupChatAgent(
+                    description=description,
+                    group_chat_topic_type="group_chat",
+                    model_client=client,
+                    system_message=f"You are the {topic_type}.",
+                    ui_config=ui_config,
+                    name=topic_type,
+                ),
+            )
+            await runtime.add_subscription(TypeSubscription(topic_type=agent_type.type, agent_type=agent_type.type))
+            dispatcher.add_replica(topic_type, replica)
+
+    runtime.start()
+    start = time.perf_counter()
+    # The agents print every turn, keep the benchmark output readable.
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(conversations):
+            await publish_message_to_ui_and_backend(
+                runtime=runtime,
+                source="User",
+                user_message="Please write a short story about the gingerbread in halloween!",
+                ui_config=ui_config,
+                group_chat_topic_type="group_chat",
+                conversation_id=f"conversation-{i}",
+            )
+        await runtime.stop_when_idle()
+    return time.perf_counter() - start, [client.num_calls for client in clients]
+
+
+async def main(
+    replica_counts: List[int], conversations: int, rounds: int, concurrency: int, latency: float, token_latency: float
+) -> None:
+    table = Table(
+        title=f"{conversations} conversations of {rounds} rounds, {concurrency} concurrent model requests per replica"
+    )
+    table.add_column("Replicas", justify="right")
+    table.add_column("Seconds", justify="right")
+    table.add_column("Conversations/s", justify="right")
+    table.add_column("Speedup", justify="right")
+    table.add_column("Model calls per replica (min-max)", justify="right")
+    baseline: float | None = None
+    for replicas in replica_counts:
+        seconds, calls = await run(replicas, conversations, rounds, concurrency, latency, token_latency)
+        throughput = conversations / seconds
+        baseline = baseline or throughput
+        table.add_row(
+            str(replicas),
+            f"{seconds:.2f}",
+            f"{throughput:.1f}",
+            f"{throughput / baseline:.2f}x",
+            f"{min(calls)}-{max(calls)}",
+        )
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark conversation throughput against the number of replicas.")
+    parser.add_argument("--replicas", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--conversations", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=2, help="Concurrent model requests per replica.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds until the first token.")
+    parser.add_argument("--token-latency", type=float, default=0.002, help="Seconds between tokens.")
+    args = parser.parse_args()
+    asyncio.run(
+        main(args.replicas, args.conversations, args.rounds, args.concurrency, args.latency, args.token_latency)
+    )
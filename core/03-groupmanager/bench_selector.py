@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import time
+from typing import Callable, List
+
+from _fakes import StubChatCompletionClient
+from _selector import SelectorPromptBuilder
+from autogen_core.models import LLMMessage, SystemMessage, UserMessage
+from rich.console import Console
+from rich.table import Table
+
+PARTICIPANTS = ["Writer", "Editor"]
+DESCRIPTIONS = ["Writer for creating any text content.", "Editor for planning and reviewing the content."]
+
+
+def rebuild_selector_prompt(chat_history: List[LLMMessage], previous_topic_type: str | None, max_rounds: int) -> str:
+    """The selector prompt as `GroupChatManager` used to build it: from scratch on every turn."""
+    messages: List[str] = []
+    for msg in chat_history:
+        if isinstance(msg.content, str):  # type: ignore[union-attr]
+            messages.append(f"{msg.source}: {msg.content}")  # type: ignore[union-attr]
+    history = "\n".join(messages)
+    roles = "\n".join(
+        [
+            f"{topic_type}: {description}".strip()
+            for topic_type, description in zip(PARTICIPANTS, DESCRIPTIONS, strict=True)
+            if topic_type != previous_topic_type
+        ]
+    )
+    participants = str([topic_type for topic_type in PARTICIPANTS if topic_type != previous_topic_type])
+    return f"""You are in a role play game. The following roles are available:
+{roles}.
+Read the following conversation. Then select the next role from {participants} to play. Only return the role.
+
+{history}
+
+Read the above conversation. Then select the next role from {participants} to play. if you think it's enough talking (for example they have talked for {max_rounds} rounds), return 'FINISH'.
+"""
+
+
+async def replay(turns: int, buckets: int, select: Callable[[LLMMessage, str | None], str]) -> List[float]:
+    """Replays a synthetic chat and returns the mean per-turn cost in microseconds for each bucket of turns."""
+    client = StubChatCompletionClient(lambda messages: PARTICIPANTS[client.num_calls % 2])
+    previous: str | None = None
+    bucket_size = turns // buckets
+    timings: List[float] = []
+    elapsed = 0.0
+    for turn in range(turns):
+        content = f"Turn {turn}: once upon a time there was a gingerbread."
+        message = UserMessage(content=content, source=previous or "User")
+        start = time.perf_counter()
+        prompt = select(message, previous)
+        completion = await client.create([SystemMessage(content=prompt)])
+        elapsed += time.perf_counter() - start
+        previous = completion.content  # type: ignore[assignment]
+        if (turn + 1) % bucket_size == 0:
+            timings.append(elapsed / bucket_size * 1e6)
+            elapsed = 0.0
+    return timings
+
+
+async def main(turns: int, buckets: int) -> None:
+    chat_history: List[LLMMessage] = []
+
+    def rebuild(message: LLMMessage, previous: str | None) -> str:
+        chat_history.append(message)
+        return rebuild_selector_prompt(chat_history, previous, max_rounds=3)
+
+    builder = SelectorPromptBuilder(PARTICIPANTS, DESCRIPTIONS, max_rounds=3)
+
+    def incremental(message: LLMMessage, previous: str | None) -> str:
+        builder.append(message)
+        return builder.build(previous)
+
+    assert rebuild_selector_prompt([], None, 3) == SelectorPromptBuilder(PARTICIPANTS, DESCRIPTIONS, 3).build(None)
+
+    rebuild_timings = await replay(turns, buckets, rebuild)
+    incremental_timings = await replay(turns, buckets, incremental)
+
+    table = Table(title=f"Selector cost per turn over a {turns}-turn chat (µs)")
+    table.add_column("Turns")
+    table.add_column("Rebuild", justify="right")
+    table.add_column("Incremental", justify="right")
+    bucket_size = turns // buckets
+    for i, (rebuild_us, incremental_us) in enumerate(zip(rebuild_timings, incremental_timings, strict=True)):
+        table.add_row(f"{i * bucket_size}-{(i + 1) * bucket_size}", f"{rebuild_us:.1f}", f"{incremental_us:.1f}")
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark selector prompt construction.")
+    parser.add_argument("--turns", type=int, default=10_000)
+    parser.add_argument("--buckets", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.buckets))
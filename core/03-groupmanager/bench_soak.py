@@ -0,0 +1,140 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+
+from _agents import BaseGroupChatAgent, GroupChatManager, UIAgent, publish_message_to_ui_and_backend
+from _conversations import IdleConversationEvictor
+from _dispatch import ReplicaDispatcher, replica_topic_type
+from _fakes import StubChatCompletionClient
+from _types import MessageChunk, MessageChunkBatch, UIAgentConfig
+from autogen_core import SingleThreadedAgentRuntime, TypeSubscription
+from bench_scaling import PARTICIPANTS, select_speaker
+from rich.console import Console
+from rich.table import Table
+
+
+def rss_megabytes() -> float:
+    """Resident set size of this process, read from procfs (Linux only)."""
+    with open("/proc/self/status") as file:
+        for line in file:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def main(conversations: int, concurrent: int, rounds: int, ttl_seconds: float, interval_seconds: float) -> None:
+    ui_config = UIAgentConfig(topic_type="ui_events", artificial_stream_delay_seconds={"min": 0.0, "max": 0.0})
+    runtime = SingleThreadedAgentRuntime()
+    dispatcher = ReplicaDispatcher()
+    await GroupChatManager.register(
+        runtime,
+        "group_chat_manager",
+        lambda: GroupChatManager(
+            model_client=StubChatCompletionClient(select_speaker(rounds)),
+            participant_topic_types=list(PARTICIPANTS),
+            participant_descriptions=list(PARTICIPANTS.values()),
+            ui_config=ui_config,
+            dispatcher=dispatcher,
+            max_rounds=rounds,
+        ),
+    )
+    await runtime.add_subscription(TypeSubscription(topic_type="group_chat", agent_type="group_chat_manager"))
+    for topic_type, description in PARTICIPANTS.items():
+        client = StubChatCompletionClient(
+            lambda _, name=topic_type: f"{name} adds one more spooky sentence to the gingerbread story.",
+            latency=0.01,
+        )
+        agent_type = await BaseGroupChatAgent.register(
+            runtime,
+            replica_topic_type(topic_type, 0),
+            lambda client=client, topic_type=topic_type, description=description: BaseGroupChatAgent(
+                description=description,
+                group_chat_topic_type="group_chat",
+                model_client=client,
+                system_message=f"You are the {topic_type}.",
+                ui_config=ui_config,
+                name=topic_type,
+            ),
+        )
+        await runtime.add_subscription(TypeSubscription(topic_type=agent_type.type, agent_type=agent_type.type))
+        dispatcher.add_replica(topic_type, 0)
+
+    slots = asyncio.Semaphore(concurrent)
+    all_finished = asyncio.Event()
+    num_finished = 0
+
+    async def on_chunk(chunk: MessageChunk | MessageChunkBatch) -> None:
+        nonlocal num_finished
+        if chunk.finished and chunk.author == "group_chat_manager":
+            num_finished += 1
+            slots.release()
+            if num_finished == conversations:
+                all_finished.set()
+
+    await UIAgent.register(runtime, "ui_agent", lambda: UIAgent(on_message_chunk_func=on_chunk))
+    await runtime.add_subscription(TypeSubscription(topic_type=ui_config.topic_type, agent_type="ui_agent"))
+
+    evictor = IdleConversationEvictor(runtime, ttl_seconds, interval_seconds)
+    peak_agents = 0
+    peak_rss = rss_megabytes()
+    rss_at_start = peak_rss
+
+    async def sample() -> None:
+        nonlocal peak_agents, peak_rss
+        while True:
+            peak_agents = max(peak_agents, evictor.num_agents)
+            peak_rss = max(peak_rss, rss_megabytes())
+            await asyncio.sleep(0.1)
+
+    runtime.start()
+    evictor.start()
+    sampler = asyncio.create_task(sample())
+    start = time.perf_counter()
+    # The agents print every turn, keep the soak output readable.
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(conversations):
+            await slots.acquire()
+            await publish_message_to_ui_and_backend(
+                runtime=runtime,
+                source="User",
+                user_message="Please write a short story about the gingerbread in halloween!",
+                ui_config=ui_config,
+                group_chat_topic_type="group_chat",
+                conversation_id=f"conversation-{i}",
+            )
+        await all_finished.wait()
+        elapsed = time.perf_counter() - start
+        # Give the evictor time to drop the agents of the last conversations.
+        await asyncio.sleep(ttl_seconds + 2 * interval_seconds)
+    sampler.cancel()
+    agents_at_end = evictor.num_agents
+    rss_at_end = rss_megabytes()
+    await evictor.stop()
+    await runtime.stop()
+
+    table = Table(title=f"{conversations} conversations, at most {concurrent} at a time, idle TTL {ttl_seconds}s")
+    table.add_column("Metric")
+    table.add_column("Value", justify="right")
+    table.add_row("Finished conversations", str(num_finished))
+    table.add_row("Conversations/s", f"{num_finished / elapsed:.1f}")
+    table.add_row("Peak agent instances", str(peak_agents))
+    table.add_row("Evicted agent instances", str(evictor.num_evicted))
+    table.add_row("Agent instances at end", str(agents_at_end))
+    table.add_row("Open dispatcher assignments", str(sum(dispatcher.load("Writer").values())))
+    table.add_row("RSS start / peak / end (MB)", f"{rss_at_start:.0f} / {peak_rss:.0f} / {rss_at_end:.0f}")
+    Console().print(table)
+    if num_finished != conversations or agents_at_end != 0:
+        raise SystemExit("Soak failed: not all conversations finished or agent instances were left behind.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Soak test many concurrent conversations with idle eviction.")
+    parser.add_argument("--conversations", type=int, default=5000)
+    parser.add_argument("--concurrent", type=int, default=200, help="Conversations in flight at the same time.")
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--ttl-seconds", type=float, default=10.0, help="Must stay well above the time of one turn.")
+    parser.add_argument("--interval-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.conversations, args.concurrent, args.rounds, args.ttl_seconds, args.interval_seconds))
@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import time
+
+from _agents import UIAgent
+from _readiness import announce_ready, wait_for_host
+from _types import GroupChatMessage, MessageChunk, MessageChunkBatch, ParticipantReady, ReadinessProbe, RequestToSpeak
+from _utils import get_serializers, load_config, set_all_log_levels
+from autogen_core import TypeSubscription
+from autogen_ext.runtimes.grpc import GrpcWorkerAgentRuntime
+from rich.console import Console
+
+PROCESSES = ["run_host.py", "run_writer_agent.py", "run_editor_agent.py", "run_group_chat_manager.py"]
+IMPORTS = "import _agents, _cache, _clients, _history, _readiness, _utils, autogen_ext.runtimes.grpc"
+
+
+def measure_imports(directory: str) -> float:
+    """The time all processes take to import their modules at the same time, the floor of the cold start."""
+    start = time.perf_counter()
+    processes = [subprocess.Popen([sys.executable, "-c", IMPORTS], cwd=directory) for _ in PROCESSES]
+    for process in processes:
+        process.wait()
+    return time.perf_counter() - start
+
+
+async def main(max_overhead_seconds: float) -> None:
+    """Starts the host, writer, editor and group chat manager, and acts as the UI participant itself.
+
+    Chainlit is not needed: this process announces itself as `ui_agent` and measures the time from launching all
+    processes until the first message of the group chat manager reaches the UI topic. The time beyond importing the
+    modules of the processes is the cost of waiting for each other, which the fixed sleeps put at about 9 seconds."""
+    set_all_log_levels(logging.ERROR)
+    config = load_config()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    import_seconds = measure_imports(directory)
+    start = time.perf_counter()
+    processes = [
+        subprocess.Popen([sys.executable, script], cwd=directory, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for script in PROCESSES
+    ]
+    try:
+        first_message = asyncio.Event()
+
+        async def on_chunk(chunk: MessageChunk | MessageChunkBatch) -> None:
+            first_message.set()
+
+        ui_agent_runtime = GrpcWorkerAgentRuntime(host_address=config.host.address)
+        ui_agent_runtime.add_message_serializer(get_serializers([RequestToSpeak, GroupChatMessage, MessageChunk, MessageChunkBatch, ParticipantReady, ReadinessProbe]))  # type: ignore[arg-type]
+        await wait_for_host(config.host.address, config.readiness)
+        ui_agent_runtime.start()
+        await UIAgent.register(ui_agent_runtime, "ui_agent", lambda: UIAgent(on_message_chunk_func=on_chunk))
+        await ui_agent_runtime.add_subscription(
+            TypeSubscription(topic_type=config.ui_agent.topic_type, agent_type="ui_agent")
+        )
+        await announce_ready(ui_agent_runtime, "ui_agent", [config.ui_agent.topic_type], config.readiness)
+
+        await asyncio.wait_for(first_message.wait(), timeout=config.readiness.timeout_seconds)
+        elapsed = time.perf_counter() - start
+        await ui_agent_runtime.stop()
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+    overhead = elapsed - import_seconds
+    Console().print(
+        f"Time to first message: {elapsed:.2f}s, importing: {import_seconds:.2f}s, waiting: {overhead:.2f}s"
+    )
+    assert overhead <= max_overhead_seconds, f"Waiting {overhead:.2f}s exceeds {max_overhead_seconds}s"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the cold start of the distributed group chat.")
+    parser.add_argument(
+        "--max-overhead-seconds",
+        type=float,
+        default=2.0,
+        help="Fail if the first message takes longer than importing the modules of the processes by this much.",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.max_overhead_seconds))
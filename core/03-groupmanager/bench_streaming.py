@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import io
+import time
+from typing import List
+
+from _agents import BaseGroupChatAgent, UIAgent, publish_message_to_ui_and_backend
+from _fakes import StubChatCompletionClient
+from _types import MessageChunk, MessageChunkBatch, RequestToSpeak, UIAgentConfig
+from autogen_core import AgentId, MessageContext, SingleThreadedAgentRuntime, TypeSubscription, message_handler
+from autogen_core.models import AssistantMessage, UserMessage
+from rich.console import Console
+from rich.table import Table
+
+STORY = (
+    "On Halloween night the gingerbread man slipped out of the bakery window, wrapped himself in a licorice cape "
+    "and went from door to door, frightening the candy corn and trading crumbs for moonlight until dawn."
+)
+
+
+class SyntheticChunkingGroupChatAgent(BaseGroupChatAgent):
+    """The previous `RequestToSpeak` path: wait for the full completion, then split it into words for the UI."""
+
+    @message_handler
+    async def handle_request_to_speak(self, message: RequestToSpeak, ctx: MessageContext) -> None:
+        await self._model_context.add_message(
+            UserMessage(content=f"Transferred to {self.id.type}, adopt the persona immediately.", source="system")
+        )
+        completion = await self._model_client.create([self._system_message] + await self._model_context.get_messages())
+        assert isinstance(completion.content, str)
+        await self._model_context.add_message(AssistantMessage(content=completion.content, source=self.id.type))
+        await publish_message_to_ui_and_backend(
+            runtime=self,
+            source=self.id.type,
+            user_message=completion.content,
+            ui_config=self._ui_config,
+            group_chat_topic_type=self._group_chat_topic_type,
+        )
+
+
+async def run(
+    agent_class: type[BaseGroupChatAgent], ui_config: UIAgentConfig, latency: float, token_latency: float, turns: int
+) -> tuple[float, float, float]:
+    """Returns the mean time to first UI chunk, the mean turn latency (both in ms) and the UI chunks per turn."""
+    runtime = SingleThreadedAgentRuntime()
+    first_chunk_at: List[float] = []
+    num_chunks = 0
+
+    async def on_chunk(chunk: MessageChunk | MessageChunkBatch) -> None:
+        nonlocal num_chunks
+        num_chunks += 1
+        if not first_chunk_at:
+            first_chunk_at.append(time.perf_counter())
+
+    await UIAgent.register(runtime, "ui_agent", lambda: UIAgent(on_message_chunk_func=on_chunk))
+    await runtime.add_subscription(TypeSubscription(topic_type=ui_config.topic_type, agent_type="ui_agent"))
+    await agent_class.register(
+        runtime,
+        "Writer",
+        lambda: agent_class(
+            description="Writer for creating any text content.",
+            group_chat_topic_type="group_chat",
+            model_client=StubChatCompletionClient(lambda _: STORY, latency=latency, token_latency=token_latency),
+            system_message="You are a one sentence Writer and provide one sentence content each time",
+            ui_config=ui_config,
+        ),
+    )
+    writer = AgentId("Writer", "default")
+    (await runtime.try_get_underlying_agent_instance(writer, BaseGroupChatAgent)).console = Console(file=io.StringIO())
+    runtime.start()
+
+    ttfts: List[float] = []
+    totals: List[float] = []
+    for _ in range(turns):
+        first_chunk_at.clear()
+        start = time.perf_counter()
+        await runtime.send_message(RequestToSpeak(), writer)
+        await runtime.stop_when_idle()
+        totals.append(time.perf_counter() - start)
+        ttfts.append(first_chunk_at[0] - start)
+        runtime.start()
+    await runtime.stop()
+    return sum(ttfts) / turns * 1000, sum(totals) / turns * 1000, num_chunks / turns
+
+
+async def main(latency: float, token_latency: float, turns: int) -> None:
+    ui_config = UIAgentConfig(topic_type="ui_events", artificial_stream_delay_seconds={"min": 0.05, "max": 0.1})
+    table = Table(title=f"RequestToSpeak with {latency * 1000:.0f} ms to first token, {token_latency * 1000:.0f} ms/token")
+    table.add_column("Path")
+    table.add_column("TTFT (ms)", justify="right")
+    table.add_column("Turn latency (ms)", justify="right")
+    table.add_column("UI chunks/turn", justify="right")
+    for name, agent_class in [
+        ("create + synthetic chunks", SyntheticChunkingGroupChatAgent),
+        ("create_stream + batching", BaseGroupChatAgent),
+    ]:
+        ttft, total, chunks = await run(agent_class, ui_config, latency, token_latency, turns)
+        table.add_row(name, f"{ttft:.1f}", f"{total:.1f}", f"{chunks:.1f}")
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark time to first token of the group chat agents.")
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds until the first token.")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="Seconds between tokens.")
+    parser.add_argument("--turns", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.token_latency, args.turns))
@@ -0,0 +1 @@
+# Lets the tests import the modules of this example, like the scripts next to it do.
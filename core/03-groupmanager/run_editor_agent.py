@@ -1,48 +1,87 @@
+import argparse
 import asyncio
 import logging
 import warnings
 
 from _agents import BaseGroupChatAgent
-from _types import AppConfig, GroupChatMessage, MessageChunk, RequestToSpeak
-from _utils import get_serializers, load_config, set_all_log_levels
+from _cache import CachedChatCompletionClient
+from _clients import ModelClientRegistry
+from _conversations import IdleConversationEvictor
+from _dispatch import replica_topic_type
+from _history import create_model_context
+from _readiness import announce_ready, wait_for_host
+from _types import (
+    AppConfig,
+    GroupChatMessage,
+    MessageChunk,
+    MessageChunkBatch,
+    ParticipantReady,
+    ReadinessProbe,
+    RequestToSpeak,
+)
+from _utils import create_model_client, get_serializers, load_config, set_all_log_levels
 from autogen_core import (
     TypeSubscription,
 )
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
 from autogen_ext.runtimes.grpc import GrpcWorkerAgentRuntime
 from rich.console import Console
 from rich.markdown import Markdown
 
 
-async def main(config: AppConfig):
+async def main(config: AppConfig, replica: int):
     set_all_log_levels(logging.ERROR)
     editor_agent_runtime = GrpcWorkerAgentRuntime(host_address=config.host.address)
-    editor_agent_runtime.add_message_serializer(get_serializers([RequestToSpeak, GroupChatMessage, MessageChunk]))  # type: ignore[arg-type]
-    await asyncio.sleep(4)
-    Console().print(Markdown("Starting **`Editor Agent`**"))
+    editor_agent_runtime.add_message_serializer(get_serializers([RequestToSpeak, GroupChatMessage, MessageChunk, MessageChunkBatch, ParticipantReady, ReadinessProbe]))  # type: ignore[arg-type]
+    await wait_for_host(config.host.address, config.readiness)
+    Console().print(Markdown(f"Starting **`Editor Agent`** replica {replica}"))
     editor_agent_runtime.start()
+    # Shared by the agents of all conversations, and with it the connection pool and the response cache.
+    model_clients = ModelClientRegistry(config.connection_pool)
+    model_client = create_model_client(config, model_clients)
     editor_agent_type = await BaseGroupChatAgent.register(
         editor_agent_runtime,
-        config.editor_agent.topic_type,
+        replica_topic_type(config.editor_agent.topic_type, replica),
         lambda: BaseGroupChatAgent(
             description=config.editor_agent.description,
             group_chat_topic_type=config.group_chat_manager.topic_type,
             system_message=config.editor_agent.system_message,
-            model_client=AzureOpenAIChatCompletionClient(**config.client_config),
+            model_client=model_client,
             ui_config=config.ui_agent,
+            model_context=create_model_context(config.editor_agent.history, config.client_config["model"]),
+            name=config.editor_agent.topic_type,
         ),
     )
+    # The group chat manager sends the requests to speak and the messages of the other participants of the
+    # conversations assigned to this replica to its own topic.
     await editor_agent_runtime.add_subscription(
-        TypeSubscription(topic_type=config.editor_agent.topic_type, agent_type=editor_agent_type.type)
+        TypeSubscription(topic_type=editor_agent_type.type, agent_type=editor_agent_type.type)
     )
-    await editor_agent_runtime.add_subscription(
-        TypeSubscription(topic_type=config.group_chat_manager.topic_type, agent_type=editor_agent_type.type)
+
+    # One agent instance is kept per conversation, drop those of conversations that went idle.
+    evictor = IdleConversationEvictor(
+        editor_agent_runtime, config.conversations.idle_ttl_seconds, config.conversations.eviction_interval_seconds
+    )
+    evictor.start()
+
+    await announce_ready(
+        editor_agent_runtime,
+        "editor_agent",
+        [editor_agent_type.type],
+        config.readiness,
+        replica=replica,
     )
 
     await editor_agent_runtime.stop_when_signal()
+    if isinstance(model_client, CachedChatCompletionClient):
+        Console().print(f"Response cache: {model_client.stats}")
+    await model_clients.aclose()
+    await evictor.stop()
 
 
 if __name__ == "__main__":
     set_all_log_levels(logging.ERROR)
     warnings.filterwarnings("ignore", category=UserWarning, message="Resolved model mismatch.*")
-    asyncio.run(main(load_config()))
+    parser = argparse.ArgumentParser(description="Run a replica of the editor agent.")
+    parser.add_argument("--replica", type=int, default=0, help="Index of this replica, unique per participant.")
+    args = parser.parse_args()
+    asyncio.run(main(load_config(), args.replica))
@@ -1,14 +1,27 @@
 import asyncio
 import logging
 import warnings
+from uuid import uuid4
 
 from _agents import GroupChatManager, publish_message_to_ui, publish_message_to_ui_and_backend
-from _types import AppConfig, GroupChatMessage, MessageChunk, RequestToSpeak
-from _utils import get_serializers, load_config, set_all_log_levels
+from _cache import CachedChatCompletionClient
+from _clients import ModelClientRegistry
+from _conversations import IdleConversationEvictor
+from _dispatch import ReplicaDispatcher
+from _readiness import wait_for_host, wait_for_participants
+from _types import (
+    AppConfig,
+    GroupChatMessage,
+    MessageChunk,
+    MessageChunkBatch,
+    ParticipantReady,
+    ReadinessProbe,
+    RequestToSpeak,
+)
+from _utils import create_model_client, get_serializers, load_config, set_all_log_levels
 from autogen_core import (
     TypeSubscription,
 )
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
 from autogen_ext.runtimes.grpc import GrpcWorkerAgentRuntime
 from rich.console import Console
 from rich.markdown import Markdown
@@ -20,21 +33,36 @@ async def main(config: AppConfig):
     set_all_log_levels(logging.ERROR)
     group_chat_manager_runtime = GrpcWorkerAgentRuntime(host_address=config.host.address)
 
-    group_chat_manager_runtime.add_message_serializer(get_serializers([RequestToSpeak, GroupChatMessage, MessageChunk]))  # type: ignore[arg-type]
-    await asyncio.sleep(1)
+    group_chat_manager_runtime.add_message_serializer(get_serializers([RequestToSpeak, GroupChatMessage, MessageChunk, MessageChunkBatch, ParticipantReady, ReadinessProbe]))  # type: ignore[arg-type]
+    await wait_for_host(config.host.address, config.readiness)
     Console().print(Markdown("Starting **`Group Chat Manager`**"))
     group_chat_manager_runtime.start()
     set_all_log_levels(logging.ERROR)
 
+    # Shared by the managers of all conversations, replicas join as they announce themselves.
+    dispatcher = ReplicaDispatcher()
+    participant_topic_types = {
+        "writer_agent": config.writer_agent.topic_type,
+        "editor_agent": config.editor_agent.topic_type,
+    }
+
+    async def on_participant_ready(message: ParticipantReady) -> None:
+        if message.participant in participant_topic_types:
+            dispatcher.add_replica(participant_topic_types[message.participant], message.replica)
+
+    # Shared by the agents of all conversations, and with it the connection pool and the response cache.
+    model_clients = ModelClientRegistry(config.connection_pool)
+    model_client = create_model_client(config, model_clients)
     group_chat_manager_type = await GroupChatManager.register(
         group_chat_manager_runtime,
         "group_chat_manager",
         lambda: GroupChatManager(
-            model_client=AzureOpenAIChatCompletionClient(**config.client_config),
+            model_client=model_client,
             participant_topic_types=[config.writer_agent.topic_type, config.editor_agent.topic_type],
             participant_descriptions=[config.writer_agent.description, config.editor_agent.description],
             max_rounds=config.group_chat_manager.max_rounds,
             ui_config=config.ui_agent,
+            dispatcher=dispatcher,
         ),
     )
 
@@ -42,15 +70,26 @@ async def main(config: AppConfig):
         TypeSubscription(topic_type=config.group_chat_manager.topic_type, agent_type=group_chat_manager_type.type)
     )
 
-    await asyncio.sleep(5)
+    # One agent instance is kept per conversation, drop those of conversations that went idle.
+    evictor = IdleConversationEvictor(
+        group_chat_manager_runtime,
+        config.conversations.idle_ttl_seconds,
+        config.conversations.eviction_interval_seconds,
+    )
+    evictor.start()
+
+    # Start the conversation only once all participants are registered and subscribed.
+    await wait_for_participants(group_chat_manager_runtime, config.readiness, on_participant_ready)
 
+    # Every run starts a new conversation, agents are instantiated per conversation id.
+    conversation_id = str(uuid4())
     await publish_message_to_ui(
         runtime=group_chat_manager_runtime,
         source="System",
         user_message="[ **Due to responsible AI considerations of this sample, group chat manager is sending an initiator message on behalf of user** ]",
         ui_config=config.ui_agent,
+        conversation_id=conversation_id,
     )
-    await asyncio.sleep(3)
 
     user_message: str = "Please write a short story about the gingerbread in halloween!"
     Console().print(f"Simulating User input in group chat topic:\n\t'{user_message}'")
@@ -61,9 +100,14 @@ async def main(config: AppConfig):
         user_message=user_message,
         ui_config=config.ui_agent,
         group_chat_topic_type=config.group_chat_manager.topic_type,
+        conversation_id=conversation_id,
     )
 
     await group_chat_manager_runtime.stop_when_signal()
+    if isinstance(model_client, CachedChatCompletionClient):
+        Console().print(f"Response cache: {model_client.stats}")
+    await model_clients.aclose()
+    await evictor.stop()
     Console().print("Manager left the chat!")
 
 
@@ -4,7 +4,10 @@ import warnings
 
 import chainlit as cl  # type: ignore [reportUnknownMemberType] # This dependency is installed through instructions
 from _agents import MessageChunk, UIAgent
-from _types import AppConfig, GroupChatMessage, RequestToSpeak
+from _conversations import IdleConversationEvictor
+from _readiness import announce_ready, wait_for_host
+from _streams import MessageStreamRegistry
+from _types import AppConfig, GroupChatMessage, MessageChunkBatch, ParticipantReady, ReadinessProbe, RequestToSpeak
 from _utils import get_serializers, load_config, set_all_log_levels
 from autogen_core import (
     TypeSubscription,
@@ -17,29 +20,45 @@ from rich.markdown import Markdown
 set_all_log_levels(logging.ERROR)
 
 
-message_chunks: dict[str, Message] = {}  # type: ignore [reportUnknownVariableType]
+async def send_cl_message(cl_msg: Message) -> None:  # type: ignore [reportUnknownParameterType]
+    await cl_msg.send()  # type: ignore [reportUnknownMemberType]
 
 
-async def send_cl_stream(msg: MessageChunk) -> None:
-    if msg.message_id not in message_chunks:
-        message_chunks[msg.message_id] = Message(content="", author=msg.author)
+message_streams: MessageStreamRegistry[Message] | None = None  # type: ignore [reportUnknownVariableType]
 
-    if not msg.finished:
-        await message_chunks[msg.message_id].stream_token(msg.text)  # type: ignore [reportUnknownVariableType]
-    else:
-        await message_chunks[msg.message_id].stream_token(msg.text)  # type: ignore [reportUnknownVariableType]
-        await message_chunks[msg.message_id].update()  # type: ignore [reportUnknownMemberType]
-        await asyncio.sleep(3)
-        cl_msg = message_chunks[msg.message_id]  # type: ignore [reportUnknownVariableType]
-        await cl_msg.send()  # type: ignore [reportUnknownMemberType]
+
+async def send_cl_stream(msg: MessageChunk | MessageChunkBatch) -> None:
+    assert message_streams is not None, "The UI agent must be started before messages are streamed."
+    cl_msg = message_streams.get(msg.message_id, msg.author)  # type: ignore [reportUnknownVariableType]
+    if cl_msg is None:
+        # A late chunk of a message that was already finished or evicted.
+        return
+
+    # UIAgent hands over batches in sequence order, so their fragments can be streamed as one token.
+    text = msg.text if isinstance(msg, MessageChunk) else "".join(msg.texts)
+    await cl_msg.stream_token(text)  # type: ignore [reportUnknownMemberType]
+    if msg.finished:
+        await cl_msg.update()  # type: ignore [reportUnknownMemberType]
+        # Sending the message is scheduled in the background, so later chunks are not blocked by it.
+        message_streams.finish(msg.message_id)
 
 
 async def main(config: AppConfig):
+    global message_streams
+
     set_all_log_levels(logging.ERROR)
+    message_streams = MessageStreamRegistry(
+        create=lambda author: Message(content="", author=author),
+        finalize=send_cl_message,
+        max_streams=config.ui_agent.max_open_streams,
+        ttl_seconds=config.ui_agent.stream_ttl_seconds,
+        finalize_delay_seconds=config.ui_agent.finalize_delay_seconds,
+    )
     ui_agent_runtime = GrpcWorkerAgentRuntime(host_address=config.host.address)
 
-    ui_agent_runtime.add_message_serializer(get_serializers([RequestToSpeak, GroupChatMessage, MessageChunk]))  # type: ignore[arg-type]
+    ui_agent_runtime.add_message_serializer(get_serializers([RequestToSpeak, GroupChatMessage, MessageChunk, MessageChunkBatch, ParticipantReady, ReadinessProbe]))  # type: ignore[arg-type]
 
+    await wait_for_host(config.host.address, config.readiness)
     Console().print(Markdown("Starting **`UI Agent`**"))
     ui_agent_runtime.start()
     set_all_log_levels(logging.ERROR)
@@ -56,8 +75,18 @@ async def main(config: AppConfig):
         TypeSubscription(topic_type=config.ui_agent.topic_type, agent_type=ui_agent_type.type)
     )  # TODO: This could be a great example of using agent_id to route to sepecific element in the ui. Can replace MessageChunk.message_id
 
+    # One agent instance is kept per conversation, drop those of conversations that went idle.
+    evictor = IdleConversationEvictor(
+        ui_agent_runtime, config.conversations.idle_ttl_seconds, config.conversations.eviction_interval_seconds
+    )
+    evictor.start()
+
+    await announce_ready(ui_agent_runtime, "ui_agent", [config.ui_agent.topic_type], config.readiness)
+
     await ui_agent_runtime.stop_when_signal()
-    Console().print("UI Agent left the chat!")
+    await evictor.stop()
+    await message_streams.aclose()
+    Console().print(f"UI Agent left the chat! Stream stats: {message_streams.stats}")
 
 
 @cl.on_chat_start  # type: ignore
@@ -0,0 +1,66 @@
+import asyncio
+import io
+from typing import Any, AsyncGenerator, List, Sequence, Union
+
+import pytest
+from _agents import BaseGroupChatAgent, UIAgent
+from _fakes import StubChatCompletionClient
+from _types import MessageChunk, MessageChunkBatch, RequestToSpeak, UIAgentConfig
+from autogen_core import AgentId, SingleThreadedAgentRuntime, TypeSubscription
+from autogen_core.models import CreateResult, LLMMessage
+from rich.console import Console
+
+
+class FailingStreamClient(StubChatCompletionClient):
+    """Streams a few tokens and then fails, like a dropped connection to the model."""
+
+    async def create_stream(
+        self, messages: Sequence[LLMMessage], **kwargs: Any
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        for token in ["Once ", "upon ", "a "]:
+            yield token
+        raise ConnectionError("The model stream was interrupted.")
+
+
+def test_ui_message_is_finished_when_the_model_stream_fails() -> None:
+    async def main() -> None:
+        # A long flush interval keeps the deadline flush of the buffered tokens pending when the stream fails.
+        ui_config = UIAgentConfig(
+            topic_type="ui_events", artificial_stream_delay_seconds={}, stream_flush_interval_seconds=60.0
+        )
+        runtime = SingleThreadedAgentRuntime()
+        chunks: List[MessageChunk | MessageChunkBatch] = []
+
+        async def on_chunk(chunk: MessageChunk | MessageChunkBatch) -> None:
+            chunks.append(chunk)
+
+        await UIAgent.register(runtime, "ui_agent", lambda: UIAgent(on_message_chunk_func=on_chunk))
+        await runtime.add_subscription(TypeSubscription(topic_type=ui_config.topic_type, agent_type="ui_agent"))
+        await BaseGroupChatAgent.register(
+            runtime,
+            "Writer",
+            lambda: BaseGroupChatAgent(
+                description="Writer for creating any text content.",
+                group_chat_topic_type="group_chat",
+                model_client=FailingStreamClient(lambda _: ""),
+                system_message="You are a Writer.",
+                ui_config=ui_config,
+            ),
+        )
+        writer = AgentId("Writer", "default")
+        (await runtime.try_get_underlying_agent_instance(writer, BaseGroupChatAgent)).console = Console(
+            file=io.StringIO()
+        )
+        runtime.start()
+        with pytest.raises(ConnectionError):
+            await runtime.send_message(RequestToSpeak(), writer)
+        await runtime.stop_when_idle()
+
+        assert chunks[-1].finished
+        assert "".join(chunk.text if isinstance(chunk, MessageChunk) else "".join(chunk.texts) for chunk in chunks) == (
+            "Once upon a "
+        )
+        # No deadline flush is left behind to publish into the stopped runtime.
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    asyncio.run(main())
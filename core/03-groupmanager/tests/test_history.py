@@ -0,0 +1,28 @@
+import asyncio
+import json
+
+from _history import RollingSummaryChatCompletionContext
+from autogen_core.models import AssistantMessage, UserMessage
+
+
+def test_rolling_summary_save_and_load_state_round_trip() -> None:
+    async def main() -> None:
+        saved = RollingSummaryChatCompletionContext(max_messages=2, max_summary_chars=500)
+        for turn in range(5):
+            message = f"Turn {turn} of the conversation. It has a second sentence."
+            await saved.add_message(UserMessage(content=message, source="user"))
+            await saved.add_message(AssistantMessage(content=f"Answer {turn}.", source="writer"))
+        messages = await saved.get_messages()
+        assert len(messages) == 3
+
+        loaded = RollingSummaryChatCompletionContext(max_messages=2, max_summary_chars=500)
+        # The state is stored as json by the runtime.
+        await loaded.load_state(json.loads(json.dumps(await saved.save_state())))
+        assert await loaded.get_messages() == messages
+
+        # The loaded summary keeps folding evicted messages within its limit.
+        await loaded.add_message(UserMessage(content="Turn 5 of the conversation.", source="user"))
+        await saved.add_message(UserMessage(content="Turn 5 of the conversation.", source="user"))
+        assert await loaded.get_messages() == await saved.get_messages()
+
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+import asyncio
+import logging
+from typing import List
+
+import pytest
+from _streams import MessageStreamRegistry
+
+
+def test_evicted_streams_are_finalized_and_late_chunks_dropped() -> None:
+    async def main() -> None:
+        finalized: List[str] = []
+
+        async def finalize(stream: str) -> None:
+            finalized.append(stream)
+
+        registry = MessageStreamRegistry(create=lambda author: author, finalize=finalize, max_streams=2)
+        registry.get("m1", "a")
+        registry.get("m2", "b")
+        registry.get("m3", "c")
+        # A late chunk of the evicted stream does not start a second message.
+        assert registry.get("m1", "a") is None
+        await registry.aclose()
+
+        assert finalized == ["a"]
+        assert registry.stats.evicted_over_capacity == 1
+        assert registry.stats.late_chunks == 1
+
+    asyncio.run(main())
+
+
+def test_finalize_errors_are_logged(caplog: pytest.LogCaptureFixture) -> None:
+    async def main() -> None:
+        async def finalize(stream: str) -> None:
+            raise RuntimeError("The UI is gone.")
+
+        registry = MessageStreamRegistry(create=lambda author: author, finalize=finalize)
+        registry.get("m1", "a")
+        registry.finish("m1")
+        await registry.aclose()
+        assert registry.stats.finalize_errors == 1
+
+    with caplog.at_level(logging.ERROR):
+        asyncio.run(main())
+    assert "Finalizing a message stream failed." in caplog.text
@@ -0,0 +1,155 @@
+import argparse
+import random
+import time
+from typing import Callable, List, Tuple
+
+from board import DIRECTIONS, Board, Robot, Wall, render_observation
+from rich.console import Console
+from rich.table import Table
+
+
+class ListBoard:
+    """The board as before: lists of robots and walls that every move and observation scans."""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.robots: List[Robot] = []
+        self.walls: List[Wall] = []
+
+    def add_robot(self, robot: Robot):
+        self.robots.append(robot)
+
+    def add_wall(self, wall: Wall):
+        self.walls.append(wall)
+
+    def move_robot(self, robot_name: str, direction: str) -> bool:
+        robot = next(r for r in self.robots if r.name == robot_name)
+        if robot.battery <= 0:
+            return False
+        dx, dy = DIRECTIONS[direction]
+        new_position_x = robot.position_x + dx
+        new_position_y = robot.position_y + dy
+        if not (0 <= new_position_x < self.width and 0 <= new_position_y < self.height):
+            return False
+        for wall in self.walls:
+            if wall.position_x == new_position_x and wall.position_y == new_position_y:
+                return False
+        for other_robot in self.robots:
+            if other_robot.position_x == new_position_x and other_robot.position_y == new_position_y:
+                return False
+        robot.position_x = new_position_x
+        robot.position_y = new_position_y
+        robot.battery -= 1
+        return True
+
+    def what_can_robot_see(self, robot_name: str) -> str:
+        robot = next(r for r in self.robots if r.name == robot_name)
+        robot_observation = []
+        for wall in self.walls:
+            if wall.position_x == robot.position_x and wall.position_y < robot.position_y:
+                robot_observation.append("I can see a wall to the north. I cannot see what is behind it.")
+            if wall.position_x == robot.position_x and wall.position_y > robot.position_y:
+                robot_observation.append("I can see a wall to the south. I cannot see what is behind it.")
+            if wall.position_y == robot.position_y and wall.position_x < robot.position_x:
+                robot_observation.append("I can see a wall to the west. I cannot see what is behind it.")
+            if wall.position_y == robot.position_y and wall.position_x > robot.position_x:
+                robot_observation.append("I can see a wall to the east. I cannot see what is behind it.")
+        for other_robot in self.robots:
+            if other_robot.name != robot_name:
+                if other_robot.position_x == robot.position_x and other_robot.position_y < robot.position_y:
+                    robot_observation.append(f"I can see {other_robot.name} to the north.")
+                if other_robot.position_x == robot.position_x and other_robot.position_y > robot.position_y:
+                    robot_observation.append(f"I can see {other_robot.name} to the south.")
+                if other_robot.position_y == robot.position_y and other_robot.position_x < robot.position_x:
+                    robot_observation.append(f"I can see {other_robot.name} to the west.")
+                if other_robot.position_y == robot.position_y and other_robot.position_x > robot.position_x:
+                    robot_observation.append(f"I can see {other_robot.name} to the east.")
+        return " ".join(robot_observation)
+
+    def render(self) -> str:
+        rows = []
+        for y in range(self.height):
+            row = ""
+            for x in range(self.width):
+                field = "-"
+                for wall in self.walls:
+                    if wall.position_x == x and wall.position_y == y:
+                        field = "#"
+                        break
+                for robot in self.robots:
+                    if robot.position_x == x and robot.position_y == y:
+                        field = robot.name
+                        break
+                row += field + " "
+            rows.append(row)
+        return "\n".join(rows)
+
+
+def populate(board: Board | ListBoard, size: int, num_robots: int, num_walls: int, seed: int) -> List[str]:
+    """Places the same robots and walls on `board` for the same seed and returns the names of the robots."""
+    rng = random.Random(seed)
+    fields = rng.sample(range(size * size), num_robots + num_walls)
+    names = [f"R{i}" for i in range(num_robots)]
+    for name, field in zip(names, fields):
+        board.add_robot(Robot(name, field % size, field // size, battery=10**9))
+    for field in fields[num_robots:]:
+        board.add_wall(Wall(field % size, field // size))
+    return names
+
+
+def measure(operation: Callable[[], object], seconds: float) -> Tuple[float, int]:
+    """Operations per second of `operation`, run for about `seconds`."""
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        operation()
+        count += 1
+    return count / (time.perf_counter() - start), count
+
+
+def main(sizes: List[int], num_robots: int, wall_density: float, render_size: int, seconds: float) -> None:
+    # The lists report every wall and robot in the row and column of a robot, the grids only the nearest ones.
+    table = Table(title=f"{num_robots} robots, {wall_density:.0%} of the fields are walls")
+    for column in ["Board", "Index", "Moves/s", "Observations/s", "All robots (ms)", "Prompt chars", "Render (ms)"]:
+        table.add_column(column, justify="right")
+    for size in sizes:
+        num_walls = int(size * size * wall_density)
+        for name, board_type in [("lists", ListBoard), ("grids", Board)]:
+            board = board_type(size, size)
+            names = populate(board, size, num_robots, num_walls, seed=size)
+            rng = random.Random(0)
+            directions = list(DIRECTIONS)
+            moves, _ = measure(lambda: board.move_robot(rng.choice(names), rng.choice(directions)), seconds)
+            observations, _ = measure(lambda: board.what_can_robot_see(rng.choice(names)), seconds)
+            if isinstance(board, Board):
+                step, _ = measure(board.observe_all, seconds)
+                prompt = sum(len(render_observation(observation)) for observation in board.observe_all())
+            else:
+                step, _ = measure(lambda: [board.what_can_robot_see(name) for name in names], seconds)
+                prompt = sum(len(board.what_can_robot_see(name)) for name in names)
+            render = "-"
+            if size <= render_size:
+                per_second, _ = measure(board.render, seconds)
+                render = f"{1000 / per_second:.2f}"
+            table.add_row(
+                f"{size}x{size}",
+                name,
+                f"{moves:,.0f}",
+                f"{observations:,.0f}",
+                f"{1000 / step:.1f}",
+                f"{prompt / num_robots:.0f}",
+                render,
+            )
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the moves and observations of the robot game board.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 200, 1000])
+    parser.add_argument("--robots", type=int, default=300)
+    parser.add_argument("--wall-density", type=float, default=0.05)
+    parser.add_argument("--render-size", type=int, default=200, help="Render only boards up to this size.")
+    parser.add_argument("--seconds", type=float, default=0.5)
+    args = parser.parse_args()
+    main(args.sizes, args.robots, args.wall_density, args.render_size, args.seconds)
@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import json
+import random
+from typing import Any, List, Mapping, Optional, Sequence
+
+from autogen_core import CancellationToken, FunctionCall
+from autogen_core.models import CreateResult, LLMMessage, ModelInfo, RequestUsage
+from autogen_core.tools import Tool, ToolSchema
+from autogen_ext.models.replay import ReplayChatCompletionClient
+from board import Board, Robot
+from environment import BoardServer, RobotEnvironment, RoundMetrics, create_robot_agent
+from rich.console import Console
+from rich.table import Table
+
+
+class StubModelClient(ReplayChatCompletionClient):
+    """A model that calls `move_robot` with a random direction after `latency` seconds."""
+
+    def __init__(self, latency: float, seed: int):
+        super().__init__([])
+        self._latency = latency
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        await asyncio.sleep(self._latency)
+        self.calls += 1
+        arguments = json.dumps({"direction": self._random.choice(["north", "south", "west", "east"])})
+        call = FunctionCall(id=f"call-{self.calls}", name="move_robot", arguments=arguments)
+        usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+        return CreateResult(finish_reason="function_calls", content=[call], usage=usage, cached=False)
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return ModelInfo(vision=False, function_calling=True, json_output=False, family="unknown")
+
+
+async def play(num_robots: int, rounds: int, latency: float, concurrent: bool) -> List[RoundMetrics]:
+    board = Board(30, 30)
+    for i in range(num_robots):
+        board.add_robot(Robot(f"R{i}", 3 * i % 30, 3 * i // 30 * 3, battery=rounds))
+    server = BoardServer(board)
+    # The robots plan with different latencies, the last one is the slowest.
+    agents = [
+        create_robot_agent(server, robot.name, StubModelClient(latency * (i + 1) / num_robots, seed=i), "Explore.")
+        for i, robot in enumerate(board.robots)
+    ]
+    return await RobotEnvironment(server, agents, concurrent=concurrent).run(rounds)
+
+
+async def main(num_robots: int, rounds: int, latency: float) -> None:
+    table = Table(title=f"{num_robots} robot agents, model latencies up to {latency}s, {rounds} rounds")
+    for column in ["Robots", "Round (s)", "Slowest robot (s)", "Sum of robots (s)", "Model calls per round", "Moves per round"]:
+        table.add_column(column, justify="right")
+    for concurrent in [False, True]:
+        metrics = await play(num_robots, rounds, latency, concurrent)
+        table.add_row(
+            "concurrent" if concurrent else "taking turns",
+            f"{sum(m.seconds for m in metrics) / len(metrics):.2f}",
+            f"{sum(max(m.robot_seconds.values()) for m in metrics) / len(metrics):.2f}",
+            f"{sum(sum(m.robot_seconds.values()) for m in metrics) / len(metrics):.2f}",
+            f"{sum(m.model_calls for m in metrics) / len(metrics):.1f}",
+            f"{sum(m.moves for m in metrics) / len(metrics):.1f}",
+        )
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the rounds of the robot game with concurrent robot agents.")
+    parser.add_argument("--robots", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.4, help="Seconds per model request of the slowest robot.")
+    args = parser.parse_args()
+    asyncio.run(main(args.robots, args.rounds, args.latency))
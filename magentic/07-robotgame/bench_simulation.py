@@ -0,0 +1,98 @@
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Callable, List, Mapping, Optional, Sequence
+
+from autogen_core import CancellationToken
+from autogen_core.models import CreateResult, LLMMessage, RequestUsage
+from autogen_core.tools import Tool, ToolSchema
+from autogen_ext.models.replay import ReplayChatCompletionClient
+from board import Board, Robot, Wall
+from rich.console import Console
+from rich.table import Table
+from simulation import Episode, EpisodeResult, LLMPolicy, Policy, RandomPolicy, Simulation
+
+
+class StubModelClient(ReplayChatCompletionClient):
+    """A model that answers with a random direction after `latency` seconds."""
+
+    def __init__(self, latency: float, seed: int = 0):
+        super().__init__([])
+        self._latency = latency
+        self._random = random.Random(seed)
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        await asyncio.sleep(self._latency)
+        direction = self._random.choice(["north", "south", "west", "east"])
+        usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+        return CreateResult(finish_reason="stop", content=f"I move {direction}.", usage=usage, cached=False)
+
+
+def create_episode_factory(size: int, num_robots: int, wall_density: float, create_policy: Callable[[int], Policy]):
+    def create_episode(number: int) -> Episode:
+        rng = random.Random(number)
+        num_walls = int(size * size * wall_density)
+        fields = rng.sample(range(size * size), num_robots + num_walls + 1)
+        board = Board(size, size)
+        for i, field in enumerate(fields[:num_robots]):
+            board.add_robot(Robot(f"R{i}", field % size, field // size, battery=50))
+        for field in fields[num_robots:-1]:
+            board.add_wall(Wall(field % size, field // size))
+        # The first robot has to reach the target field.
+        target_x, target_y = fields[-1] % size, fields[-1] // size
+        robot = board.robots[0]
+        return Episode(board, create_policy(number), lambda _: (robot.position_x, robot.position_y) == (target_x, target_y))
+
+    return create_episode
+
+
+async def run(simulation: Simulation, episodes: int, batch_size: int) -> tuple[float, List[EpisodeResult]]:
+    start = time.perf_counter()
+    results = await simulation.run(episodes, batch_size)
+    return time.perf_counter() - start, results
+
+
+async def main(size: int, num_robots: int, wall_density: float, episodes: int, llm_episodes: int, latency: float) -> None:
+    table = Table(title=f"{size}x{size} boards, {num_robots} robots, robot R0 has to reach a target field")
+    for column in ["Policy", "Batch", "Episodes", "Episodes per minute", "Success", "Mean steps", "Mean battery left"]:
+        table.add_column(column, justify="right")
+    runs = [
+        ("random", 1, episodes, lambda number: RandomPolicy(seed=number)),
+        ("random", 256, episodes, lambda number: RandomPolicy(seed=number)),
+        (f"model, {latency * 1000:.0f} ms", 1, llm_episodes, lambda number: LLMPolicy(StubModelClient(latency, number), "Reach the target.")),
+        (f"model, {latency * 1000:.0f} ms", 64, llm_episodes, lambda number: LLMPolicy(StubModelClient(latency, number), "Reach the target.")),
+    ]
+    for name, batch_size, count, create_policy in runs:
+        simulation = Simulation(create_episode_factory(size, num_robots, wall_density, create_policy), max_steps=100)
+        elapsed, results = await run(simulation, count, batch_size)
+        table.add_row(
+            name,
+            str(batch_size),
+            str(count),
+            f"{count / elapsed * 60:,.0f}",
+            f"{sum(result.success for result in results) / count:.0%}",
+            f"{sum(result.steps for result in results) / count:.1f}",
+            f"{sum(result.battery_left for result in results) / count:.1f}",
+        )
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the throughput of the headless robot game simulation.")
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--robots", type=int, default=4)
+    parser.add_argument("--wall-density", type=float, default=0.1)
+    parser.add_argument("--episodes", type=int, default=2000)
+    parser.add_argument("--llm-episodes", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds per request of the stub model.")
+    args = parser.parse_args()
+    asyncio.run(main(args.size, args.robots, args.wall_density, args.episodes, args.llm_episodes, args.latency))
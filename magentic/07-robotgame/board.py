@@ -0,0 +1,244 @@
+import os
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Dict, List, Literal, Optional
+
+import numpy as np
+
+# The moves of the directions as (dx, dy), north is up.
+DIRECTIONS = {
+    "north": (0, -1),
+    "south": (0, 1),
+    "west": (-1, 0),
+    "east": (1, 0),
+}
+
+NO_ROBOT = -1
+
+
+class Robot:
+    position_x : int = 0
+    position_y : int = 0
+    battery : int = 5
+    name : str = ""
+
+    def __init__(self, name: str, position_x: int, position_y: int, battery: int = 5):
+        self.name = name
+        self.battery = battery
+        self.position_x = position_x
+        self.position_y = position_y
+
+class Wall:
+    position_x : int = 0
+    position_y : int = 0
+
+    def __init__(self, position_x: int, position_y: int):
+        self.position_x = position_x
+        self.position_y = position_y
+
+@dataclass
+class BoardEvent:
+    robot_name: str
+    direction: str
+    new_position_x: int
+    new_position_y: int
+    message: str
+    success: bool
+
+@dataclass
+class Sighting:
+    """The nearest thing a robot sees in a direction: a wall, another robot or the end of the board.
+
+    `distance` is the number of free fields in between, how far the robot can move in that direction.
+    """
+    direction: str
+    kind: Literal["wall", "robot", "edge"]
+    distance: int
+    robot_name: Optional[str] = None
+
+@dataclass
+class Observation:
+    robot_name: str
+    position_x: int
+    position_y: int
+    battery: int
+    # One sighting per direction, in the order of `DIRECTIONS`.
+    sightings: List[Sighting]
+
+def render_observation(observation: Observation) -> str:
+    """The observation as text for the prompt of the robot. The end of the board is only mentioned when the robot
+    stands at it."""
+    robot_observation = []
+    for sighting in observation.sightings:
+        if sighting.distance == 0:
+            where = f"right next to me in the {sighting.direction}"
+        else:
+            where = f"to the {sighting.direction}, {sighting.distance} free {'field' if sighting.distance == 1 else 'fields'} in between"
+        if sighting.kind == "edge":
+            if sighting.distance == 0:
+                robot_observation.append(f"I can see the end of the board in the {sighting.direction}.")
+        elif sighting.kind == "wall":
+            robot_observation.append(f"I can see a wall {where}. I cannot see what is behind it.")
+        else:
+            robot_observation.append(f"I can see {sighting.robot_name} {where}.")
+    return " ".join(robot_observation)
+
+class Board:
+    """The game board, kept in occupancy grids so that moves and collisions take constant time.
+
+    `wall_grid[y, x]` is True for a wall and `robot_grid[y, x]` is the index of the robot in `robots` or `NO_ROBOT`.
+    The robots are looked up by name in a dict. For the line of sight, the board also keeps the sorted x of the
+    occupied fields of every row and the sorted y of the occupied fields of every column, updated on every move, so
+    the nearest wall or robot in a direction is found by bisection.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.robots: List[Robot] = []
+        self.walls: List[Wall] = []
+        self.last_event: Optional[BoardEvent] = None
+        self.wall_grid = np.zeros((height, width), dtype=bool)
+        self.robot_grid = np.full((height, width), NO_ROBOT, dtype=np.int32)
+        self._robot_index: Dict[str, int] = {}
+        self._rows: List[List[int]] = [[] for _ in range(height)]
+        self._columns: List[List[int]] = [[] for _ in range(width)]
+
+    def is_on_board(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def __str__(self):
+        return f"Board(width={self.width}, height={self.height})"
+
+    def add_robot(self, robot: Robot):
+        self._check_free(robot.position_x, robot.position_y)
+        if robot.name in self._robot_index:
+            raise ValueError(f"There is already a robot named {robot.name}.")
+        self._robot_index[robot.name] = len(self.robots)
+        self.robot_grid[robot.position_y, robot.position_x] = len(self.robots)
+        self._occupy(robot.position_x, robot.position_y)
+        self.robots.append(robot)
+
+    def add_wall(self, wall: Wall):
+        self._check_free(wall.position_x, wall.position_y)
+        self.wall_grid[wall.position_y, wall.position_x] = True
+        self._occupy(wall.position_x, wall.position_y)
+        self.walls.append(wall)
+
+    def _check_free(self, x: int, y: int):
+        if not self.is_on_board(x, y):
+            raise ValueError(f"Position {x} {y} is not on the board.")
+        if self.wall_grid[y, x] or self.robot_grid[y, x] != NO_ROBOT:
+            raise ValueError(f"Position {x} {y} is not free.")
+
+    def _occupy(self, x: int, y: int):
+        insort(self._rows[y], x)
+        insort(self._columns[x], y)
+
+    def _vacate(self, x: int, y: int):
+        row = self._rows[y]
+        del row[bisect_left(row, x)]
+        column = self._columns[x]
+        del column[bisect_left(column, y)]
+
+    def get_robot(self, robot_name: str) -> Robot:
+        return self.robots[self._robot_index[robot_name]]
+
+    def move_robot(self, robot_name: str, direction: str) -> BoardEvent:
+        robot = self.get_robot(robot_name)
+        if robot.battery <= 0:
+            self.last_event = BoardEvent(robot_name, direction, robot.position_x, robot.position_y, f"{robot_name} has no battery left.", False)
+            return self.last_event
+
+        dx, dy = DIRECTIONS.get(direction, (0, 0))
+        new_position_x = robot.position_x + dx
+        new_position_y = robot.position_y + dy
+        if (dx, dy) == (0, 0) or not self.is_on_board(new_position_x, new_position_y):
+            self.last_event = BoardEvent(robot_name, direction, robot.position_x, robot.position_y, f"{robot_name} cannot move {direction}.", False)
+            return self.last_event
+
+        if self.wall_grid[new_position_y, new_position_x]:
+            self.last_event = BoardEvent(robot_name, direction, robot.position_x, robot.position_y, f"{robot_name} cannot move {direction}. There is a wall in the way.", False)
+            return self.last_event
+
+        other_robot = self.robot_grid[new_position_y, new_position_x]
+        if other_robot != NO_ROBOT:
+            self.last_event = BoardEvent(robot_name, direction, robot.position_x, robot.position_y, f"{robot_name} cannot move {direction}. {self.robots[other_robot].name} is in the way.", False)
+            return self.last_event
+
+        self.robot_grid[robot.position_y, robot.position_x] = NO_ROBOT
+        self._vacate(robot.position_x, robot.position_y)
+        self.robot_grid[new_position_y, new_position_x] = self._robot_index[robot_name]
+        self._occupy(new_position_x, new_position_y)
+        robot.position_x = new_position_x
+        robot.position_y = new_position_y
+        robot.battery -= 1
+        self.last_event = BoardEvent(robot_name, direction, new_position_x, new_position_y, f"{robot_name} moved {direction}.", True)
+
+        return self.last_event
+
+    def render(self) -> str:
+        """The board as text, a "#" for a wall, the name of a robot for a robot and a "-" for an empty field."""
+        cells = np.full((self.height, self.width), "-", dtype=object)
+        cells[self.wall_grid] = "#"
+        for robot in self.robots:
+            cells[robot.position_y, robot.position_x] = robot.name
+        return "\n".join(" ".join(row) + " " for row in cells)
+
+    def print_board(self):
+        clear_console()
+        print(self.render())
+        if self.last_event:
+            print(self.last_event.message)
+        for observation in self.observe_all():
+            print("Robot", observation.robot_name, "is at", observation.position_x, observation.position_y, "with", observation.battery, "battery left.")
+            print(render_observation(observation))
+
+    def _sighting(self, direction: str, x: int, y: int, distance: int) -> Sighting:
+        """The sighting of the occupied field `x`, `y`."""
+        if self.wall_grid[y, x]:
+            return Sighting(direction, "wall", distance)
+        return Sighting(direction, "robot", distance, self.robots[self.robot_grid[y, x]].name)
+
+    def observe(self, robot_name: str) -> Observation:
+        """What the robot sees: walls and robots block the view, only the nearest one in each direction is seen."""
+        robot = self.get_robot(robot_name)
+        x, y = robot.position_x, robot.position_y
+        column = self._columns[x]
+        row = self._rows[y]
+        # The robot is in its row and column, the occupied fields before and after it are the nearest ones.
+        i = bisect_left(column, y)
+        j = bisect_left(row, x)
+        sightings = []
+        if i > 0:
+            sightings.append(self._sighting("north", x, column[i - 1], y - column[i - 1] - 1))
+        else:
+            sightings.append(Sighting("north", "edge", y))
+        if i + 1 < len(column):
+            sightings.append(self._sighting("south", x, column[i + 1], column[i + 1] - y - 1))
+        else:
+            sightings.append(Sighting("south", "edge", self.height - 1 - y))
+        if j > 0:
+            sightings.append(self._sighting("west", row[j - 1], y, x - row[j - 1] - 1))
+        else:
+            sightings.append(Sighting("west", "edge", x))
+        if j + 1 < len(row):
+            sightings.append(self._sighting("east", row[j + 1], y, row[j + 1] - x - 1))
+        else:
+            sightings.append(Sighting("east", "edge", self.width - 1 - x))
+        return Observation(robot.name, x, y, robot.battery, sightings)
+
+    def observe_all(self) -> List[Observation]:
+        """The observations of all robots, in the order of `robots`."""
+        return [self.observe(robot.name) for robot in self.robots]
+
+    def what_can_robot_see(self, robot_name: str):
+        return render_observation(self.observe(robot_name))
+
+def clear_console():
+    # For Windows
+    if os.name == 'nt':
+        _ = os.system('cls')
+    # For macOS and Linux
+    else:
+        _ = os.system('clear')
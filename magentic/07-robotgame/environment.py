@@ -0,0 +1,163 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.base import Response
+from autogen_agentchat.messages import TextMessage, ToolCallRequestEvent
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient
+from autogen_core.tools import FunctionTool
+
+from board import Board, BoardEvent, render_observation
+
+
+class BoardServer:
+    """Owns the board and applies the moves of all robots one at a time, in the order they arrive in its queue.
+
+    Robots plan concurrently, so their moves can arrive at any time. The server applies each move completely before
+    the next one, and answers each robot with the event of its move. A robot has one move per round, started with
+    `start_round`; further moves in the round are refused, even if the model asks for several in one response.
+    """
+
+    def __init__(self, board: Board):
+        self.board = board
+        self._queue: asyncio.Queue[Tuple[str, str, asyncio.Future[BoardEvent]]] = asyncio.Queue()
+        self._task: Optional[asyncio.Task[None]] = None
+        self._moved: Set[str] = set()
+        self.moves = 0
+
+    def start_round(self):
+        self._moved.clear()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._serve())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _serve(self):
+        while True:
+            robot_name, direction, result = await self._queue.get()
+            if result.cancelled():
+                pass
+            elif robot_name in self._moved:
+                robot = self.board.get_robot(robot_name)
+                message = f"{robot_name} already moved this round."
+                result.set_result(BoardEvent(robot_name, direction, robot.position_x, robot.position_y, message, False))
+            else:
+                try:
+                    result.set_result(self.board.move_robot(robot_name, direction))
+                except Exception as e:
+                    result.set_exception(e)
+                self._moved.add(robot_name)
+                self.moves += 1
+            self._queue.task_done()
+
+    async def move(self, robot_name: str, direction: str) -> BoardEvent:
+        result: asyncio.Future[BoardEvent] = asyncio.get_running_loop().create_future()
+        await self._queue.put((robot_name, direction, result))
+        return await result
+
+    def what_can_robot_see(self, robot_name: str) -> str:
+        return render_observation(self.board.observe(robot_name))
+
+def create_robot_agent(server: BoardServer, robot_name: str, model_client: ChatCompletionClient, task: str) -> AssistantAgent:
+    """An assistant agent that controls the robot `robot_name` with the tools `move_robot` and `what_can_robot_see`."""
+
+    async def move_robot(direction: str) -> str:
+        """Moves the robot one field north, south, west or east."""
+        event = await server.move(robot_name, direction)
+        return event.message
+
+    async def what_can_robot_see() -> str:
+        """Describes the nearest wall, robot or end of the board in every direction."""
+        return server.what_can_robot_see(robot_name)
+
+    return AssistantAgent(
+        name=robot_name,
+        model_client=model_client,
+        tools=[
+            FunctionTool(move_robot, description=move_robot.__doc__ or ""),
+            FunctionTool(what_can_robot_see, description=what_can_robot_see.__doc__ or ""),
+        ],
+        description=f"Controls robot {robot_name}.",
+        system_message=f"You are robot {robot_name} on a board. {task} Every round you can move one field with the move_robot tool.",
+    )
+
+@dataclass
+class RoundMetrics:
+    round: int
+    seconds: float
+    model_calls: int
+    moves: int
+    # The seconds each robot took to plan and move, by name.
+    robot_seconds: Dict[str, float] = field(default_factory=dict)
+
+class RobotEnvironment:
+    """Plays rounds of the game: in every round, every robot agent that has battery left plans and moves.
+
+    With `concurrent`, the robots plan at the same time and a round takes as long as the slowest robot. Otherwise
+    they take turns, like in a round robin group chat, and a round takes as long as all robots together.
+    """
+
+    def __init__(self, server: BoardServer, agents: Sequence[AssistantAgent], concurrent: bool = True):
+        self.server = server
+        self.agents = list(agents)
+        self.concurrent = concurrent
+        self.metrics: List[RoundMetrics] = []
+
+    async def _play(self, agent: AssistantAgent) -> Tuple[Response, float]:
+        start = time.perf_counter()
+        observation = self.server.what_can_robot_see(agent.name)
+        message = TextMessage(content=f"Your move. {observation}", source="board")
+        response = await agent.on_messages([message], CancellationToken())
+        return response, time.perf_counter() - start
+
+    async def play_round(self) -> RoundMetrics:
+        players = [agent for agent in self.agents if self.server.board.get_robot(agent.name).battery > 0]
+        moves = self.server.moves
+        self.server.start_round()
+        start = time.perf_counter()
+        if self.concurrent:
+            results = list(await asyncio.gather(*(self._play(agent) for agent in players)))
+        else:
+            results = [await self._play(agent) for agent in players]
+        metrics = RoundMetrics(
+            round=len(self.metrics) + 1,
+            seconds=time.perf_counter() - start,
+            model_calls=sum(_model_calls(response) for response, _ in results),
+            moves=self.server.moves - moves,
+            robot_seconds={agent.name: seconds for agent, (_, seconds) in zip(players, results)},
+        )
+        self.metrics.append(metrics)
+        return metrics
+
+    async def run(self, max_rounds: int, is_done: Optional[Callable[[Board], bool]] = None, on_round: Optional[Callable[[RoundMetrics], None]] = None) -> List[RoundMetrics]:
+        """Plays until `is_done`, no robot has battery left or after `max_rounds`, and calls `on_round` after every round."""
+        board = self.server.board
+        self.server.start()
+        try:
+            for _ in range(max_rounds):
+                if all(robot.battery <= 0 for robot in board.robots) or (is_done is not None and is_done(board)):
+                    break
+                metrics = await self.play_round()
+                if on_round is not None:
+                    on_round(metrics)
+        finally:
+            await self.server.stop()
+        return self.metrics
+
+def _model_calls(response: Response) -> int:
+    # Every tool call request is the result of a model call, and a text answer is one more, either without tool
+    # calls or the reflection on them.
+    requests = sum(isinstance(message, ToolCallRequestEvent) for message in response.inner_messages or [])
+    return requests + (1 if isinstance(response.chat_message, TextMessage) else 0)
@@ -0,0 +1,155 @@
+import asyncio
+import random
+import re
+import sys
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional, Protocol, Sequence, TextIO, Tuple
+
+from autogen_core.models import ChatCompletionClient, SystemMessage, UserMessage
+
+from board import Board, Observation, render_observation
+
+
+class Policy(Protocol):
+    async def act(self, observations: Sequence[Observation]) -> List[Optional[str]]:
+        """The direction each observed robot moves in, or None if it stays."""
+        ...
+
+class ScriptedPolicy:
+    """Moves every robot along its script, one direction per step, and stops it at the end of the script."""
+
+    def __init__(self, scripts: Mapping[str, Sequence[str]]):
+        self._scripts = scripts
+        self._steps: Dict[str, int] = {}
+
+    async def act(self, observations: Sequence[Observation]) -> List[Optional[str]]:
+        moves = []
+        for observation in observations:
+            script = self._scripts.get(observation.robot_name, ())
+            step = self._steps.get(observation.robot_name, 0)
+            self._steps[observation.robot_name] = step + 1
+            moves.append(script[step] if step < len(script) else None)
+        return moves
+
+class RandomPolicy:
+    """Moves every robot in a random direction in which it sees a free field."""
+
+    def __init__(self, seed: Optional[int] = None):
+        self._random = random.Random(seed)
+
+    async def act(self, observations: Sequence[Observation]) -> List[Optional[str]]:
+        moves = []
+        for observation in observations:
+            free = [sighting.direction for sighting in observation.sightings if sighting.distance > 0]
+            moves.append(self._random.choice(free) if free else None)
+        return moves
+
+class LLMPolicy:
+    """Asks the model for the move of every robot, the robots of a step concurrently."""
+
+    def __init__(self, model_client: ChatCompletionClient, task: str):
+        self._model_client = model_client
+        self._system_message = SystemMessage(content=f"You control a robot on a board. {task} Answer with the direction to move in: north, south, west or east.")
+
+    async def act(self, observations: Sequence[Observation]) -> List[Optional[str]]:
+        return list(await asyncio.gather(*(self._act(observation) for observation in observations)))
+
+    async def _act(self, observation: Observation) -> Optional[str]:
+        prompt = f"You are robot {observation.robot_name} at {observation.position_x} {observation.position_y} with {observation.battery} battery left. {render_observation(observation)}"
+        result = await self._model_client.create([self._system_message, UserMessage(content=prompt, source="board")])
+        match = re.search(r"\b(north|south|west|east)\b", str(result.content).lower())
+        return match.group(1) if match else None
+
+@dataclass
+class Episode:
+    board: Board
+    policy: Policy
+    is_success: Callable[[Board], bool]
+
+@dataclass
+class EpisodeResult:
+    episode: int
+    steps: int
+    success: bool
+    battery_left: int
+    failed_moves: int
+
+class Simulation:
+    """Runs episodes of the game without a console, a batch of boards in lockstep.
+
+    In every step, the policies of all boards of the batch act concurrently, so the requests of model policies
+    overlap. An episode ends when it succeeds, no robot has battery left, the policy stops all robots or after
+    `max_steps`.
+    """
+
+    def __init__(self, create_episode: Callable[[int], Episode], max_steps: int = 100, on_step: Optional[Callable[[int, Board], None]] = None):
+        self._create_episode = create_episode
+        self._max_steps = max_steps
+        self._on_step = on_step
+
+    async def run(self, episodes: int, batch_size: int = 64) -> List[EpisodeResult]:
+        results: List[EpisodeResult] = []
+        for start in range(0, episodes, batch_size):
+            results.extend(await self._run_batch(range(start, min(start + batch_size, episodes))))
+        return results
+
+    async def _run_batch(self, numbers: range) -> List[EpisodeResult]:
+        active: List[Tuple[int, Episode]] = [(number, self._create_episode(number)) for number in numbers]
+        failed_moves = dict.fromkeys(numbers, 0)
+        results: List[EpisodeResult] = []
+        for step in range(1, self._max_steps + 1):
+            if not active:
+                break
+            observations = [episode.board.observe_all() for _, episode in active]
+            moves = await asyncio.gather(*(episode.policy.act(observed) for (_, episode), observed in zip(active, observations)))
+            still_active = []
+            for (number, episode), observed, directions in zip(active, observations, moves):
+                board = episode.board
+                for observation, direction in zip(observed, directions):
+                    if direction is not None and not board.move_robot(observation.robot_name, direction).success:
+                        failed_moves[number] += 1
+                if self._on_step is not None:
+                    self._on_step(number, board)
+                success = episode.is_success(board)
+                stopped = all(direction is None for direction in directions)
+                exhausted = all(robot.battery <= 0 for robot in board.robots)
+                if success or stopped or exhausted or step == self._max_steps:
+                    battery_left = sum(robot.battery for robot in board.robots)
+                    results.append(EpisodeResult(number, step, success, battery_left, failed_moves[number]))
+                else:
+                    still_active.append((number, episode))
+            active = still_active
+        return sorted(results, key=lambda result: result.episode)
+
+class DiffRenderer:
+    """Draws a board in a terminal. After the first frame, it only redraws the fields whose robot changed and the
+    status lines below the board, instead of clearing the console and printing the whole board."""
+
+    def __init__(self, stream: TextIO = sys.stdout):
+        self._stream = stream
+        self._board: Optional[Board] = None
+        self._fields: Dict[Tuple[int, int], str] = {}
+
+    def draw(self, board: Board):
+        fields = {(robot.position_x, robot.position_y): robot.name for robot in board.robots}
+        if board is not self._board:
+            # Clear the screen and draw the whole board once.
+            parts = ["\x1b[2J\x1b[H", board.render(), "\n"]
+            self._board = board
+        else:
+            parts = [_move_to(x, y) + "-" for x, y in self._fields.keys() - fields.keys()]
+            parts += [_move_to(x, y) + name for (x, y), name in fields.items() if self._fields.get((x, y)) != name]
+        self._fields = fields
+        # Rewrite the status lines below the board.
+        parts.append(f"\x1b[{board.height + 1};1H\x1b[J")
+        if board.last_event:
+            parts.append(board.last_event.message + "\n")
+        for observation in board.observe_all():
+            parts.append(f"Robot {observation.robot_name} is at {observation.position_x} {observation.position_y} with {observation.battery} battery left.\n")
+            parts.append(render_observation(observation) + "\n")
+        self._stream.write("".join(parts))
+        self._stream.flush()
+
+def _move_to(x: int, y: int) -> str:
+    # Every field of the board takes two columns, terminal rows and columns start at 1.
+    return f"\x1b[{y + 1};{2 * x + 1}H"